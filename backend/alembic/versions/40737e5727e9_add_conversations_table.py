@@ -0,0 +1,72 @@
+"""add conversations summary table
+
+Revision ID: 40737e5727e9
+Revises: 5f98e9a8164b
+Create Date: 2026-10-19 10:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '40737e5727e9'
+down_revision: Union[str, Sequence[str], None] = '5f98e9a8164b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('conversations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_low_id', sa.Integer(), nullable=False),
+    sa.Column('user_high_id', sa.Integer(), nullable=False),
+    sa.Column('last_message_id', sa.Integer(), nullable=True),
+    sa.Column('last_message_text', sa.String(length=255), nullable=True, comment='마지막 메시지 미리보기'),
+    sa.Column('last_message_at', sa.DateTime(), nullable=True),
+    sa.Column('unread_count_low', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('unread_count_high', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('last_read_id_low', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('last_read_id_high', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_low_id'], ['users.id'], name=op.f('fk_conversations_user_low_id_users'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_high_id'], ['users.id'], name=op.f('fk_conversations_user_high_id_users'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['last_message_id'], ['chat_messages.id'], name=op.f('fk_conversations_last_message_id_chat_messages'), ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_conversations')),
+    sa.UniqueConstraint('user_low_id', 'user_high_id', name='uq_conversation_pair')
+    )
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_conversations_id'), ['id'], unique=False)
+        batch_op.create_index('ix_conversations_low_last_at', ['user_low_id', 'last_message_at'], unique=False)
+        batch_op.create_index('ix_conversations_high_last_at', ['user_high_id', 'last_message_at'], unique=False)
+
+    # 기존 채팅 내역으로 대화방 요약 채우기 (기존 메시지는 모두 읽은 것으로 간주)
+    op.execute("""
+        INSERT INTO conversations
+            (user_low_id, user_high_id, last_message_id,
+             unread_count_low, unread_count_high, last_read_id_low, last_read_id_high)
+        SELECT LEAST(sender_id, receiver_id), GREATEST(sender_id, receiver_id), MAX(id),
+               0, 0, MAX(id), MAX(id)
+        FROM chat_messages
+        GROUP BY LEAST(sender_id, receiver_id), GREATEST(sender_id, receiver_id)
+    """)
+    op.execute("""
+        UPDATE conversations c
+        JOIN chat_messages m ON m.id = c.last_message_id
+        SET c.last_message_text = LEFT(m.message, 255),
+            c.last_message_at = m.created_at,
+            c.updated_at = NOW()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.drop_index('ix_conversations_high_last_at')
+        batch_op.drop_index('ix_conversations_low_last_at')
+        batch_op.drop_index(batch_op.f('ix_conversations_id'))
+
+    op.drop_table('conversations')
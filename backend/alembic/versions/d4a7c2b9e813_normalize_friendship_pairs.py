@@ -0,0 +1,96 @@
+"""normalize friendship pairs (user_low_id, user_high_id)
+
+Revision ID: d4a7c2b9e813
+Revises: c3d81f0a5e62
+Create Date: 2026-10-19 15:21:47.093512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a7c2b9e813'
+down_revision: Union[str, Sequence[str], None] = 'c3d81f0a5e62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DELETE_CHUNK_SIZE = 500
+
+
+def _dedupe_pairs(bind) -> None:
+    """
+    같은 유저 쌍의 중복 행 정리
+    - ACCEPTED 행을 우선 보존, 상태가 같으면 먼저 생성된(id가 작은) 행 보존
+    """
+    rows = bind.execute(sa.text(
+        "SELECT id, user_low_id, user_high_id, status FROM friendships ORDER BY id"
+    )).fetchall()
+
+    keep = {}
+    duplicate_ids = []
+    for row_id, low, high, status in rows:
+        pair = (low, high)
+        kept = keep.get(pair)
+        if kept is None:
+            keep[pair] = (row_id, status)
+        elif status == 'ACCEPTED' and kept[1] != 'ACCEPTED':
+            duplicate_ids.append(kept[0])
+            keep[pair] = (row_id, status)
+        else:
+            duplicate_ids.append(row_id)
+
+    for start in range(0, len(duplicate_ids), DELETE_CHUNK_SIZE):
+        chunk = duplicate_ids[start:start + DELETE_CHUNK_SIZE]
+        bind.execute(
+            sa.text("DELETE FROM friendships WHERE id IN :ids").bindparams(sa.bindparam('ids', expanding=True)),
+            {"ids": chunk}
+        )
+    if duplicate_ids:
+        print(f"[Migration] friendships: removed {len(duplicate_ids)} duplicate pair rows")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 1. 컬럼 추가 (백필 전이므로 nullable)
+    with op.batch_alter_table('friendships', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('user_low_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('user_high_id', sa.Integer(), nullable=True))
+
+    # 2. 백필: requester/addressee를 정렬된 쌍으로
+    bind = op.get_bind()
+    bind.execute(sa.text(
+        "UPDATE friendships SET "
+        "user_low_id = CASE WHEN requester_id < addressee_id THEN requester_id ELSE addressee_id END, "
+        "user_high_id = CASE WHEN requester_id < addressee_id THEN addressee_id ELSE requester_id END"
+    ))
+
+    # 3. 중복 쌍 정리 (유니크 제약 생성 전)
+    _dedupe_pairs(bind)
+
+    # 4. NOT NULL + 유니크/조회 인덱스 + FK
+    with op.batch_alter_table('friendships', schema=None) as batch_op:
+        batch_op.alter_column('user_low_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('user_high_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_unique_constraint('uq_friendship_pair', ['user_low_id', 'user_high_id'])
+        batch_op.create_index('ix_friendships_high_low', ['user_high_id', 'user_low_id'], unique=False)
+        batch_op.create_index('ix_friendships_addressee_status', ['addressee_id', 'status'], unique=False)
+        batch_op.create_index('ix_friendships_requester_status', ['requester_id', 'status'], unique=False)
+        batch_op.create_foreign_key(op.f('fk_friendships_user_low_id_users'), 'users', ['user_low_id'], ['id'])
+        batch_op.create_foreign_key(op.f('fk_friendships_user_high_id_users'), 'users', ['user_high_id'], ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # 중복 제거된 행은 복구하지 않음
+    with op.batch_alter_table('friendships', schema=None) as batch_op:
+        batch_op.drop_constraint(op.f('fk_friendships_user_high_id_users'), type_='foreignkey')
+        batch_op.drop_constraint(op.f('fk_friendships_user_low_id_users'), type_='foreignkey')
+        batch_op.drop_index('ix_friendships_requester_status')
+        batch_op.drop_index('ix_friendships_addressee_status')
+        batch_op.drop_index('ix_friendships_high_low')
+        batch_op.drop_constraint('uq_friendship_pair', type_='unique')
+        batch_op.drop_column('user_high_id')
+        batch_op.drop_column('user_low_id')
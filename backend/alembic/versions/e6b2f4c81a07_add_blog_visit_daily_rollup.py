@@ -0,0 +1,55 @@
+"""add blog_visit_daily rollup table
+
+Revision ID: e6b2f4c81a07
+Revises: d4a7c2b9e813
+Create Date: 2026-10-19 16:40:05.227381
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b2f4c81a07'
+down_revision: Union[str, Sequence[str], None] = 'd4a7c2b9e813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('blog_visit_daily',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('visit_date', sa.Date(), nullable=False),
+    sa.Column('uv', sa.Integer(), nullable=False, comment='해당 일자 순방문자 수'),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], name=op.f('fk_blog_visit_daily_owner_id_users')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_blog_visit_daily')),
+    sa.UniqueConstraint('owner_id', 'visit_date', name='uq_blog_visit_daily')
+    )
+    with op.batch_alter_table('blog_visit_daily', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_blog_visit_daily_id'), ['id'], unique=False)
+
+    with op.batch_alter_table('blog_visit_logs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_blog_visit_logs_visit_date'), ['visit_date'], unique=False)
+
+    # 기존 원본 로그로 일별 집계 채우기 (로그 1행 = 해당 일자 순방문자 1명)
+    op.execute("""
+        INSERT INTO blog_visit_daily (owner_id, visit_date, uv)
+        SELECT owner_id, visit_date, COUNT(*)
+        FROM blog_visit_logs
+        GROUP BY owner_id, visit_date
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('blog_visit_logs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_blog_visit_logs_visit_date'))
+
+    with op.batch_alter_table('blog_visit_daily', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_blog_visit_daily_id'))
+
+    op.drop_table('blog_visit_daily')
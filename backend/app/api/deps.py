@@ -1,12 +1,14 @@
-from typing import Generator, Optional
+from typing import AsyncGenerator, Generator, Optional, Tuple
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials 
-from jose import jwt, JWTError
+from jose import JWTError
 from sqlalchemy.orm import Session
-from typing import Generator, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import auth_cache
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.core.security import decode_token
+from app.db.session import SessionLocal, AsyncSessionLocal
 from app.models.user import User 
 
 # HTTPBearer를 auto_error=False로 설정 (헤더 없어도 에러 안 냄)
@@ -19,12 +21,12 @@ def get_db() -> Generator:
     finally:
         db.close()
 
-def get_current_user(
+def _resolve_user_id(
     request: Request,
-    db: Session = Depends(get_db),
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
-) -> User:
-    
+    credentials: Optional[HTTPAuthorizationCredentials]
+) -> Tuple[int, int]:
+    """요청에서 토큰을 찾아 검증하고 (user_id(sub), token_version(ver))을 반환 (동기/비동기 의존성 공용)"""
+
     # 🍪 1. Authorization 헤더 먼저 확인, 없으면 쿠키에서 찾기
     token = None
     if credentials:
@@ -40,36 +42,126 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    return _decode_user_token(token)
+
+
+def _decode_user_token(token: str) -> Tuple[int, int]:
+    """토큰 문자열 검증 → (user_id(sub), token_version(ver)) (HTTP/WebSocket 공용)"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="자격 증명을 검증할 수 없습니다.",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    if not token:
-        raise credentials_exception
-    
     try:
-        # 2. 토큰 디코딩
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
-        )
+        # 2. 토큰 디코딩 (검증 결과는 토큰 만료 시각까지 메모이제이션)
+        payload = decode_token(token)
         
-        # 3. 토큰 안의 내용(sub) 꺼내기
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
+        # 3. 토큰 안의 내용(sub, ver) 꺼내기
+        user_id = int(payload["sub"])
+        token_version = int(payload.get("ver", 0))
             
-    except JWTError:
+    except (JWTError, KeyError, TypeError, ValueError):
         # 토큰 형식이 잘못되었거나, 만료되었거나, 서명이 안 맞을 때
         raise credentials_exception
+
+    return user_id, token_version
+
+
+def _is_valid_user(user: Optional[User], token_version: int) -> bool:
+    """유저가 존재하고(탈퇴 처리 중이 아니고), 토큰 버전이 현재 버전과 같은지 (버전이 오르면 이전 토큰은 거부)"""
+    return (
+        user is not None
+        and user.is_active is not False
+        and (user.token_version or 0) == token_version
+    )
+
+
+def _user_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="자격 증명을 검증할 수 없습니다.",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def get_current_user(
+    request: Request,
+    db: Session = Depends(get_db),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+) -> User:
+    user_id, token_version = _resolve_user_id(request, credentials)
+
+    # 4. 캐시 히트 시 SELECT 없이 요청 세션에 붙여서 반환
+    cached = auth_cache.get_user(user_id, token_version)
+    if cached is not None:
+        return auth_cache.attach(db, cached)
         
-    # 4. DB에서 유저 찾기
+    # 5. DB에서 유저 찾기
     user = db.query(User).filter(User.id == user_id).first()
     
+    if not _is_valid_user(user, token_version):
+        raise _user_not_found()
+
+    auth_cache.set_user(user)
+    return user
+
+
+def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    """ADMIN_USERNAMES에 등록된 GitHub 계정만 허용"""
+    if current_user.username not in settings.ADMIN_USERNAMES:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="관리자 권한이 필요합니다.")
+    return current_user
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """비동기 세션 (async 엔드포인트 전용, DB 대기 중 이벤트 루프를 막지 않음)"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def _load_valid_user_async(db: AsyncSession, user_id: int, token_version: int) -> Optional[User]:
+    """캐시 → DB 순으로 유저 조회 후 토큰 버전/탈퇴 여부 확인 (유효하지 않으면 None)"""
+    cached = await auth_cache.get_user_async(user_id, token_version)
+    if cached is not None:
+        return await auth_cache.attach_async(db, cached)
+
+    user = await db.get(User, user_id)
+
+    if not _is_valid_user(user, token_version):
+        return None
+
+    await auth_cache.set_user_async(user)
+    return user
+
+
+async def get_current_user_async(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+) -> User:
+    """get_current_user의 비동기 버전 (반환된 User는 get_async_db 세션에 속함)"""
+    user_id, token_version = _resolve_user_id(request, credentials)
+
+    user = await _load_valid_user_async(db, user_id, token_version)
     if user is None:
-        raise credentials_exception
-        
+        raise _user_not_found()
     return user
+
+
+async def get_websocket_user_id(token: Optional[str]) -> Optional[int]:
+    """
+    WebSocket 핸드셰이크 인증 (채팅/프레즌스/realtime 공용)
+    - HTTP 의존성과 같은 검증: 서명/만료 + 토큰 버전(ver) + 탈퇴 처리 중 여부 (auth_cache 경유)
+    - 인증 실패 시 None (호출 측에서 1008로 종료)
+    """
+    if not token:
+        return None
+    try:
+        user_id, token_version = _decode_user_token(token)
+    except HTTPException:
+        return None
+
+    async with AsyncSessionLocal() as db:
+        user = await _load_valid_user_async(db, user_id, token_version)
+    return user_id if user is not None else None
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.api.deps import get_current_admin
+from app.core import deploy_timing
+from app.core.socket_manager import manager
+from app.models.user import User
+
+router = APIRouter()
+
+
+# [GET] /api/v1/admin/deploy/timings
+@router.get("/deploy/timings")
+def get_deploy_timings(current_user: User = Depends(get_current_admin)):
+    """
+    배포 단계별 최근 소요 시간 p50/p95 (느린 단계 순)
+    - deploy.*: 배포 전체 / avatar, render_*, deploy_tree, pages: 배포 단계
+    - git.*: 로컬 git 명령 / github_api.*: GitHub API 호출 / task.*: Celery 작업 실행 시간
+    """
+    try:
+        stages = deploy_timing.summary()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Timing store unavailable: {e}")
+    return {
+        "stages": dict(sorted(stages.items(), key=lambda item: item[1]["p95_ms"], reverse=True)),
+    }
+
+
+# [GET] /api/v1/admin/deploy/artifact-cache
+@router.get("/deploy/artifact-cache")
+def get_artifact_cache_stats(current_user: User = Depends(get_current_admin)):
+    """테마 variant 아티팩트 캐시 적중률/디스크 사용량 (디스크는 이 API 서버 기준)"""
+    from app.services.blog.artifact_cache import get_artifact_cache
+    return get_artifact_cache().stats()
+
+
+# [GET] /api/v1/admin/realtime/stats
+@router.get("/realtime/stats")
+def get_connection_stats(current_user: User = Depends(get_current_admin)):
+    """
+    WebSocket 연결 현황 (이 API 프로세스 기준)
+    - 활성 소켓 수, 온라인 유저 수, 채팅방 수, 연결당 메모리(RSS 기준)
+    """
+    return manager.get_stats()
@@ -1,21 +1,16 @@
-from fastapi import APIRouter, Depends, BackgroundTasks, Response
-from sqlalchemy.orm import Session
-from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException, Request, Response
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
 from app.services.github.github_service import GitHubService
-from app.crud import crud_user, crud_avatar
+from app.crud import crud_user
 from app.core import security
 from app.schemas.user import UserResponse
-from app.models.avatar import Avatar, AvatarMeta, GrowthStage, MatchType
-
-
-from app.models.dashboard import UserDashboard
-from app.services import quest_service
-from app.utils.datetime_utils import now_utc, now_kst
-
-# [New] 선물 관련 임포트
-from app.models.gift import DailyGift
+from app.models.user import User
+from app.services import post_login_service
 from app.services.gift_service_logic import generate_and_save_gift
 
 router = APIRouter()
@@ -26,81 +21,30 @@ async def login_github(
     code: str, 
     background_tasks: BackgroundTasks,
     redirect_uri: str = None, # [Add] 프론트에서 전달받은 리다이렉트 주소
-    db: Session = Depends(deps.get_db)
+    db: AsyncSession = Depends(deps.get_async_db)
 ):
+    """
+    GitHub 로그인 (신원 확인 + 기본 아바타 보장 + 토큰 발급만 응답 전에 처리)
+    - 대시보드 초기화, 출석 체크, 선물 생성, GitHub 통계 갱신은 로그인 후속 작업으로 분리
+    - 후속 작업 결과(출석 알림 등)는 GET /auth/login/followup으로 조회
+    """
     # 1. GitHub Token & Info
     tokens = await GitHubService.get_token(code, redirect_uri)
     github_info = await GitHubService.get_user_info(tokens["access_token"])
     
     # 2. User Create/Update
-    user = crud_user.create_or_update_user(db, github_info, tokens)
-    
-    # 3. Dashboard Init
-    dashboard = db.query(UserDashboard).filter(UserDashboard.user_id == user.id).first()
-    if not dashboard:
-        dashboard = UserDashboard(
-            user_id=user.id,
-            total_visitors=0,
-            today_visitors=0,
-            tech_stack=[], 
-            github_stats={},
-            last_github_updated_at=now_utc()
-        )
-        db.add(dashboard)
-        db.commit()
-        db.refresh(dashboard)
-
-    # 4. [New] 기본 아바타(알) 생성 - 404 방지 및 초기 상태 부여
-    avatar = crud_avatar.get_avatar_by_user_id(db, user.id)
-    if not avatar:
-        # DEFAULT 메타가 있는지 확인 (없으면 생성 - 시드 미실행 대비)
-        default_meta = crud_avatar.get_meta_by_match_type(db, MatchType.DEFAULT)
-        if not default_meta:
-            default_meta = AvatarMeta(match_type=MatchType.DEFAULT, name="알")
-            db.add(default_meta)
-            db.commit()
-            db.refresh(default_meta)
-
-            
-        avatar = Avatar(
-            user_id=user.id,
-            avatar_meta_id=default_meta.id,
-            level=1,
-            exp=0,
-            growth_stage=GrowthStage.EGG
-        )
-
-        db.add(avatar)
-        db.commit()
-        db.refresh(avatar)
-
-    # 5. [Background] GitHub Stats Sync
-
-    background_tasks.add_task(
-        GitHubService.fetch_and_update_github_stats, 
-        db, user.id, tokens["access_token"]
-    )
+    user = await crud_user.create_or_update_user_async(db, github_info, tokens)
+    if user is None:
+        # 탈퇴 작업이 끝나면 같은 GitHub 계정으로 새로 가입 가능
+        raise HTTPException(status_code=409, detail="탈퇴 처리 중인 계정입니다. 잠시 후 다시 시도해주세요.")
 
-    # ============================================================================
-    # 5. [Fixed] 데일리 선물 즉시 생성 (FastAPI BackgroundTasks 사용)
-    # ============================================================================
-    today_str = now_kst().strftime("%Y-%m-%d")
-    existing_gift = db.query(DailyGift).filter(
-        DailyGift.user_id == user.id,
-        DailyGift.target_date == today_str
-    ).first()
+    # 3. 기본 아바타(알) 조회/생성 - 로그인 직후 아바타 API 404 방지 (신규 유저만 INSERT)
+    avatar = await post_login_service.ensure_avatar_async(db, user.id)
 
-    if not existing_gift:
-        # Celery 대신 FastAPI 자체 백그라운드 태스크 사용 (더 안정적)
-        # generate_and_save_gift는 async 함수이므로 add_task가 잘 처리함
-        print(f"🎁 Triggering instant gift generation for {user.username}...")
-        background_tasks.add_task(generate_and_save_gift, user.id)
-    # ============================================================================
-
-    # 6. Token Issue
-    access_token = security.create_access_token(user.id)
+    # 4. Token Issue
+    access_token = security.create_access_token(user.id, user.token_version)
     
-    # 7. Cookie
+    # 5. Cookie
     response.set_cookie(
         key="access_token",
         value=access_token,
@@ -110,39 +54,59 @@ async def login_github(
         max_age=60 * 60 * 24 * 30 
     )
     
-    # 8. Avatar & Quest Check
-    avatar = crud_avatar.get_avatar_by_user_id(db, user.id)
+    # 6. Response
     has_avatar = avatar is not None
-    
-    quest_result = None
-    if has_avatar:
-        quest_result = quest_service.auto_check_in_user(db, user.id)
-    
-    # 9. Response
     result = {
         "access_token": access_token,
         "token_type": "bearer",
         "user": UserResponse.model_validate(user),
         "has_avatar": has_avatar
     }
-    
     if avatar:
-        result["avatar"] = {
-            "level": avatar.level,
-            "exp": avatar.exp,
-            "growth_stage": avatar.growth_stage.value,
-            "avatar_name": avatar.meta.name,
-            "match_type": avatar.meta.match_type.value
-        }
-    
-    if quest_result:
-        result["quest_check_in"] = quest_result
+        result["avatar"] = post_login_service.serialize_avatar(avatar)
+
+    # 7. [Post-login] 후속 작업 예약 (Celery 장애 시 자체 세션의 BackgroundTasks로 대체)
+    user_id = user.id
+    if not await post_login_service.schedule(user_id):
+        background_tasks.add_task(post_login_service.run_post_login_in_new_session, user_id)
+        # generate_and_save_gift는 오늘 선물이 이미 있으면 건너뜀
+        background_tasks.add_task(generate_and_save_gift, user_id)
     
     return result
 
+
+@router.get("/login/followup")
+async def login_followup(current_user: User = Depends(deps.get_current_user_async)):
+    """
+    로그인 후속 작업 결과 조회 (PENDING이면 잠시 후 다시 요청)
+    - quest_check_in: 출석 체크 결과 (기존 로그인 응답의 quest_check_in과 같은 형태)
+    """
+    try:
+        result = await post_login_service.get_result(current_user.id)
+    except Exception as e:
+        print(f"⚠️ [PostLogin] result fetch failed: {e}")
+        result = None
+    return result or {"status": "UNKNOWN"}
+
 @router.post("/logout")
-async def logout(response: Response):
-    """로그아웃 - 쿠키 만료"""
+async def logout(
+    request: Request,
+    response: Response,
+    all_devices: bool = False,
+    db: AsyncSession = Depends(deps.get_async_db),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(deps.security)
+):
+    """
+    로그아웃 - 쿠키 만료
+    - all_devices=true면 다른 기기에 발급된 토큰까지 모두 무효화 (유효한 토큰 필수, 없으면 401)
+    """
+    if all_devices:
+        # get_current_user_async와 같은 방식으로 토큰 확인 (헤더 → 쿠키)
+        user_id, token_version = deps._resolve_user_id(request, credentials)
+        if await deps._load_valid_user_async(db, user_id, token_version) is None:
+            raise deps._user_not_found()
+        await crud_user.revoke_tokens_async(db, user_id)
+
     response.delete_cookie(
         key="access_token",
         httponly=True,
@@ -23,7 +23,7 @@ def create_my_avatar(
 
     
     # 🎯 신규 유저: 아바타 생성 시점에도 출석 체크 (첫 보상 지급)
-    quest_service.auto_check_in_user(db, current_user.id)
+    quest_service.auto_check_in_user(db, current_user.id, new_avatar)
     
     return AvatarResponse(
         id=new_avatar.id,
@@ -51,13 +51,14 @@ def read_my_avatar(
     from sqlalchemy import func
     
     today_kst = get_kst_date()
-    today_quests = db.query(UserQuest).join(Quest).filter(
+    # 오늘 수령한 퀘스트 보상 합계 (퀘스트별 lazy load 없이 SUM 1회)
+    today_exp = db.query(func.coalesce(func.sum(Quest.exp_reward), 0)).join(
+        UserQuest, UserQuest.quest_id == Quest.id
+    ).filter(
         UserQuest.user_id == current_user.id,
         UserQuest.status == QuestStatus.CLAIMED,
         func.date(UserQuest.completed_at) == today_kst
-    ).all()
-    
-    today_exp = sum(uq.quest.exp_reward for uq in today_quests)
+    ).scalar()
 
     return AvatarResponse(
         id=avatar.id,
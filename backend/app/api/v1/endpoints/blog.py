@@ -1,20 +1,23 @@
 import logging
-import base64
+import httpx
 from typing import List, Optional, Literal
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, UploadFile, File, Form, Header
 from sqlalchemy.orm import Session
 from celery.result import AsyncResult
 from github import Github, GithubException
 from pydantic import BaseModel
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_user, get_current_user_async, get_db
 from app.models.user import User
 from app.core.security import decrypt_token
 from app.services.ai.ai_posting_service import AiPostingService 
 from app.services.blog.blog_info_service import BlogInfoService
 from app.services.ai.docs_generator import DocsGeneratorService
+from app.services.blog import deploy_coordinator, image_pipeline
+from app.services.blog.git_data_api import GitDataApiError
+from app.services.github.github_writer import GithubWriter, run_blocking
 # [Workers]
 from app.worker import (
     task_deploy_chirpy, 
@@ -87,7 +90,8 @@ def check_blog_exists(
 def deploy_main_blog(
     request: BlogCreateMain,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Deploy Main Blog (Chirpy Theme) with Force Option"""
     user_token = decrypt_token(current_user.github_access_token)
@@ -102,7 +106,10 @@ def deploy_main_blog(
             repo = github_user.get_repo(repo_name)
             
             # 이미 존재함
-            if request.is_force:
+            if request.is_update:
+                # 테마/설정 변경: 기존 히스토리 위에 바뀐 파일만 커밋 (포스트 유지)
+                logger.info(f"Repo {repo_name} exists. Updating changed files only.")
+            elif request.is_force:
                 # [수정] 삭제(delete) 대신 통과시킵니다. (403 Permission Error 방지)
                 # 서비스 레이어의 git push --force가 내용을 덮어씁니다.
                 logger.info(f"Repo {repo_name} exists. Proceeding to overwrite due to is_force=True.")
@@ -146,12 +153,18 @@ def deploy_main_blog(
             "avatar_url": request.avatar_url 
         }
 
-        task = task_deploy_chirpy.delay(user_token, repo_name, user_info)
+        # 같은 요청의 중복 제출(더블클릭 등)은 기존 작업으로 합침
+        task_id, duplicate = deploy_coordinator.submit(
+            task_deploy_chirpy, (user_token, repo_name, user_info),
+            user_id=current_user.id, kind="chirpy", repo_full_name=f"{username}/{repo_name}",
+            payload={**user_info, "update": request.is_update}, client_key=idempotency_key,
+            kwargs={"update": request.is_update}
+        )
 
         return BlogDeployResponse(
-            task_id=task.id,
+            task_id=task_id,
             status="processing",
-            message=f"Deployment started for {repo_name}.",
+            message=f"Deployment {'already in progress' if duplicate else 'started'} for {repo_name}.",
             result_url=f"https://{username}.github.io"
         )
         
@@ -167,7 +180,8 @@ def deploy_main_blog(
 def deploy_docs_site(
     request: BlogCreateDocs,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Deploy Documentation Site (Docs Theme) with Force Option"""
     user_token = decrypt_token(current_user.github_access_token)
@@ -191,7 +205,7 @@ def deploy_docs_site(
         except GithubException:
             branch_exists = False
 
-        if branch_exists:
+        if branch_exists and not request.is_update:
             if request.is_force:
                 # 강제 모드: 브랜치 삭제 시도 (refs/heads/gh-pages)
                 try:
@@ -206,12 +220,17 @@ def deploy_docs_site(
                     detail=f"Documentation site (gh-pages) already exists in '{request.target_repo}'."
                 )
 
-        task = task_deploy_docs.delay(user_token, request.target_repo, project_info)
+        task_id, duplicate = deploy_coordinator.submit(
+            task_deploy_docs, (user_token, request.target_repo, project_info),
+            user_id=current_user.id, kind="docs", repo_full_name=request.target_repo,
+            payload={**project_info, "update": request.is_update}, client_key=idempotency_key,
+            kwargs={"update": request.is_update}
+        )
         
         return BlogDeployResponse(
-            task_id=task.id,
+            task_id=task_id,
             status="processing",
-            message=f"Deployment started for {request.target_repo}.",
+            message=f"Deployment {'already in progress' if duplicate else 'started'} for {request.target_repo}.",
             result_url=""
         )
     except HTTPException as he:
@@ -238,7 +257,7 @@ def get_task_status(task_id: str):
 # ========================================================================
 
 @router.get("/blogs", response_model=List[BlogRepoInfo])
-async def get_blogs(current_user: User = Depends(get_current_user)):
+async def get_blogs(current_user: User = Depends(get_current_user_async)):
     """Discover user's blogs (github.io or gh-pages branches)"""
     token = decrypt_token(current_user.github_access_token)
     service = BlogInfoService(token)
@@ -250,7 +269,7 @@ async def get_blog_structure(
     repo: str = Query(..., description="Target Repo Name"),
     branch: str = Query(..., description="Target Branch"),
     theme: str = Query(..., description="Theme Type (chirpy | docs)"),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     [최적화됨] 카테고리 목록과 포스트 리스트를 한 번에 조회하고 Redis에 캐싱합니다.
@@ -266,7 +285,7 @@ async def get_blog_structure(
 @router.post("/reorder", status_code=200)
 async def reorder_posts(
     request: ReorderRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     [Docs 전용] 포스트 순서 변경 (nav_order 재정렬)
@@ -286,24 +305,27 @@ async def get_post_content(
     repo: str = Query(...),
     path: str = Query(...),
     branch: str = Query(...),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_async)
 ):
     """Fetch raw markdown content and SHA for editing"""
     token = decrypt_token(current_user.github_access_token)
     
-    # Direct usage of GithubClient + Httpx for raw content fetch
-    import httpx
+    # 공용 GitHub 클라이언트 (전용 스레드풀에서 실행, 커넥션 재사용)
+    try:
+        file = await run_blocking(GithubWriter(token).get_file, repo, path, branch)
+    except GitDataApiError as e:
+        # 권한 문제(401/403)는 403, 그 외 GitHub 오류는 502 (404는 get_file이 None으로 반환)
+        logger.warning(f"Post content fetch failed ({repo}/{path}): {e}")
+        if e.status_code in (401, 403):
+            raise HTTPException(status_code=403, detail="GitHub 저장소에 접근할 권한이 없습니다.")
+        raise HTTPException(status_code=502, detail="GitHub에서 파일을 가져오지 못했습니다.")
+    except httpx.HTTPError as e:
+        logger.warning(f"Post content fetch failed ({repo}/{path}): {e}")
+        raise HTTPException(status_code=502, detail="GitHub에서 파일을 가져오지 못했습니다.")
+    if file is None:
+        raise HTTPException(status_code=404, detail="File not found")
     
-    url = f"https://api.github.com/repos/{repo}/contents/{path}?ref={branch}"
-    async with httpx.AsyncClient(headers={"Authorization": f"token {token}"}) as ac:
-        resp = await ac.get(url)
-        if resp.status_code != 200:
-            raise HTTPException(status_code=404, detail="File not found")
-        
-        data = resp.json()
-        content = base64.b64decode(data['content']).decode('utf-8')
-        
-        return PostContentResponse(content=content, sha=data['sha'])
+    return PostContentResponse(content=file.text, sha=file.sha)
 
 
 # ========================================================================
@@ -341,43 +363,18 @@ def generate_draft(
 async def upload_blog_image(
     repo_name: str = Form(...),
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     이미지를 GitHub 레포지토리의 assets/img/posts/ 폴더에 업로드
+    * 반응형 WebP 변형 + 원본 포맷 + LQIP(블러 미리보기)를 한 커밋으로 업로드
+    * 같은 이미지를 다시 올리면 GitHub 호출 없이 이전 경로 반환
     """
     token = decrypt_token(current_user.github_access_token)
-    g = Github(token)
     
     try:
-        repo = g.get_repo(repo_name)
         content = await file.read()
-        
-        # 1. 파일 경로 설정 (assets/img/posts/오늘날짜/파일명)
-        from app.utils.datetime_utils import now_kst
-        today_str = now_kst().strftime("%Y/%m/%d")
-        file_path = f"assets/img/posts/{today_str}/{file.filename}"
-        
-        # 2. GitHub에 파일 생성 (덮어쓰기 로직)
-        commit_msg = f"Upload image: {file.filename} (via Eggit)"
-        
-        try:
-            contents = repo.get_contents(file_path)
-            repo.update_file(file_path, commit_msg, content, contents.sha)
-        except:
-            repo.create_file(file_path, commit_msg, content)
-
-        # 3. 반환
-        final_path = f"/{file_path}"
-        
-        # LQIP (Base64 Preview) - 간단히 앞부분만 인코딩 (속도 최적화)
-        lqip_data = base64.b64encode(content[:1024]).decode('utf-8')
-        
-        return {
-            "path": final_path,
-            "alt": file.filename.split('.')[0],
-            "lqip": f"data:{file.content_type};base64,{lqip_data}" 
-        }
+        return await image_pipeline.upload_image(token, repo_name, content, file.filename)
 
     except Exception as e:
         logger.error(f"Image upload error: {e}")
@@ -438,7 +435,8 @@ async def upload_blog_image(
 @router.post("/upload", response_model=AsyncTaskResponse)
 def upload_post(
     request: FinalPostRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """
     [Final Step] 작성/수정된 글을 GitHub에 업로드 (Async)
@@ -446,11 +444,16 @@ def upload_post(
     """
     token = decrypt_token(current_user.github_access_token)
     
-    # [핵심] user_id 전달
-    task = task_post_to_blog.delay(token, request.model_dump(), current_user.id)
+    # [핵심] user_id 전달 (같은 글의 중복 제출은 기존 작업으로 합침)
+    post_data = request.model_dump()
+    task_id, _ = deploy_coordinator.submit(
+        task_post_to_blog, (token, post_data, current_user.id),
+        user_id=current_user.id, kind="post", repo_full_name=request.blog_repo.strip(),
+        payload=post_data, client_key=idempotency_key
+    )
     
     return AsyncTaskResponse(
-        task_id=task.id,
+        task_id=task_id,
         status="processing",
         message=f"Uploading post '{request.title}' to {request.blog_repo}..."
     )
\ No newline at end of file
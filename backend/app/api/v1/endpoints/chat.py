@@ -1,20 +1,19 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
-import json
 
 from app.api import deps
-from app.core.socket_manager import manager
+from app.core.socket_manager import manager, CLOSE_CODE_TRY_AGAIN_LATER
 from app.models.chat import ChatMessage
 from app.models.user import User
 from app.models.friend import Friendship, FriendStatus
-from jose import jwt, JWTError
-from app.core.config import settings
 from app.db.session import SessionLocal
-from app.utils.friendship_utils import check_friendship
+from app.utils.friendship_utils import check_friendship, check_friendship_async
+from app.services import chat_service
 
 router = APIRouter()
 
@@ -36,30 +35,108 @@ class SendMessageRequest(BaseModel):
     text: str
 
 
+# 대화방 요약 응답 스키마 (받은편지함)
+class ConversationSummaryResponse(BaseModel):
+    friend_id: int
+    friend_username: str
+    friend_avatar_url: Optional[str] = None
+    last_message_id: Optional[int] = None
+    last_message_text: Optional[str] = None
+    last_message_at: Optional[str] = None
+    unread_count: int = 0
+    last_read_message_id: int = 0
+
+
+# 읽음 처리 요청 스키마 (last_message_id 없으면 마지막 메시지까지 읽음)
+class MarkReadRequest(BaseModel):
+    last_message_id: Optional[int] = None
+
+
+# 받은편지함 조회 (GET /api/v1/chat/conversations)
+@router.get("/conversations", response_model=List[ConversationSummaryResponse])
+def get_conversations(
+    skip: int = 0,
+    limit: int = 50,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    from app.utils.datetime_utils import to_iso8601
+    conversations = chat_service.get_inbox(db, current_user.id, skip=skip, limit=limit)
+    return [
+        ConversationSummaryResponse(**{**c, "last_message_at": to_iso8601(c["last_message_at"])})
+        for c in conversations
+    ]
+
+
+# 전체 안 읽은 메시지 수 (GET /api/v1/chat/unread-count)
+@router.get("/unread-count")
+def get_unread_count(
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    return {"unread_count": chat_service.get_total_unread(db, current_user.id)}
+
+
+# 읽음 처리 (POST /api/v1/chat/{friend_id}/read)
+@router.post("/{friend_id}/read")
+async def mark_messages_read(
+    friend_id: int,
+    request: Optional[MarkReadRequest] = None,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
+):
+    up_to = request.last_message_id if request else None
+    conversation = await db.run_sync(chat_service.mark_as_read, current_user.id, friend_id, up_to)
+    if not conversation:
+        return {"friend_id": friend_id, "last_read_message_id": 0, "unread_count": 0}
+
+    is_low = conversation.user_low_id == current_user.id
+    last_read_id = conversation.last_read_id_low if is_low else conversation.last_read_id_high
+    unread_count = conversation.unread_count_low if is_low else conversation.unread_count_high
+
+    # 상대방에게 읽음 알림 (읽음 표시 갱신용)
+    if manager.is_user_online(friend_id):
+        read_receipt = {
+            "type": "messages_read",
+            "reader_id": current_user.id,
+            "last_read_message_id": last_read_id
+        }
+        for friend_ws in list(manager.user_connections.get(friend_id, set())):
+            await manager.send_payload(friend_ws, read_receipt)
+
+    return {
+        "friend_id": friend_id,
+        "last_read_message_id": last_read_id,
+        "unread_count": unread_count
+    }
+
+
 # 채팅 내역 조회 (GET /api/v1/chat/{friend_id}/messages)
 @router.get("/{friend_id}/messages", response_model=List[FrontendMessageResponse])
-def get_chat_messages(
+async def get_chat_messages(
     friend_id: int,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
 ):
     # 1. 친구 관계 확인
-    if not check_friendship(db, current_user.id, friend_id):
+    if not await check_friendship_async(db, current_user.id, friend_id):
         raise HTTPException(status_code=403, detail="친구 관계가 아니므로 채팅 내역을 볼 수 없습니다.")
     
     # 2. 친구 정보 가져오기
-    friend = db.query(User).filter(User.id == friend_id).first()
-    friend_username = friend.username if friend else "Unknown"
+    friend_username = await db.scalar(select(User.username).where(User.id == friend_id))
+    friend_username = friend_username or "Unknown"
     
     # 3. 대화 내역 조회
-    messages = db.query(ChatMessage).filter(
-        or_(
-            (ChatMessage.sender_id == current_user.id) & (ChatMessage.receiver_id == friend_id),
-            (ChatMessage.sender_id == friend_id) & (ChatMessage.receiver_id == current_user.id)
-        )
-    ).order_by(ChatMessage.created_at.asc()).offset(skip).limit(limit).all()
+    messages = (await db.scalars(
+        select(ChatMessage).where(
+            or_(
+                (ChatMessage.sender_id == current_user.id) & (ChatMessage.receiver_id == friend_id),
+                (ChatMessage.sender_id == friend_id) & (ChatMessage.receiver_id == current_user.id)
+            )
+        ).order_by(ChatMessage.created_at.asc()).offset(skip).limit(limit)
+    )).all()
     
     # 4. 프론트엔드 형식으로 변환
     from app.utils.datetime_utils import to_iso8601
@@ -86,15 +163,8 @@ def send_message(
     if not check_friendship(db, current_user.id, request.friendId):
         raise HTTPException(status_code=403, detail="친구 관계가 아니므로 메시지를 보낼 수 없습니다.")
     
-    # 2. 메시지 저장
-    new_message = ChatMessage(
-        sender_id=current_user.id,
-        receiver_id=request.friendId,
-        message=request.text
-    )
-    db.add(new_message)
-    db.commit()
-    db.refresh(new_message)
+    # 2. 메시지 저장 (대화방 요약/안 읽은 수 함께 갱신)
+    new_message = chat_service.send_message(db, current_user.id, request.friendId, request.text)
     
     # 3. 응답 반환
     from app.utils.datetime_utils import to_iso8601
@@ -130,19 +200,16 @@ async def chat_endpoint(
         await websocket.close(code=1008)
         return
     
-    # WebSocket에서는 Depends를 사용하면 세션 관리가 제대로 안되므로 직접 생성
-    db = SessionLocal()
-    
-    # 1. 토큰 검증 및 내 ID 찾기
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: int = int(payload.get("sub"))
-        print(f"[WebSocket] 토큰 검증 성공: user_id={user_id}")
-    except (JWTError, ValueError) as e:
-        print(f"[WebSocket] 토큰 검증 실패: {e}")
-        db.close()
+    # 1. 토큰 검증 및 내 ID 찾기 (토큰 버전/탈퇴 여부 포함)
+    user_id = await deps.get_websocket_user_id(token)
+    if user_id is None:
+        print(f"[WebSocket] 토큰 검증 실패")
         await websocket.close(code=1008)  # 인증 실패
         return
+    print(f"[WebSocket] 토큰 검증 성공: user_id={user_id}")
+
+    # WebSocket에서는 Depends를 사용하면 세션 관리가 제대로 안되므로 직접 생성
+    db = SessionLocal()
 
     # 2. 친구 관계 확인
     if not check_friendship(db, user_id, friend_id):
@@ -154,91 +221,53 @@ async def chat_endpoint(
     print(f"[WebSocket] 친구 관계 확인 완료, 채팅방 입장")
     db.close()  # 초기 확인용 세션 닫기
 
-    # 3. 방에 입장 (accept는 이미 했으므로 manager에서는 accept 호출 안함)
-    room_id = manager.get_room_id(user_id, friend_id)
-    manager.rooms[room_id].append((user_id, websocket))
-    
-    # 사용자를 온라인 상태로 등록
-    manager.add_user_connection(user_id, websocket)
-    
-    print(f"[WebSocket] User {user_id} joined room {room_id}. Room size: {len(manager.rooms[room_id])}")
+    # 3. 사용자를 온라인 상태로 등록 (연결 수 제한 초과 시 거절)
+    if not manager.add_user_connection(user_id, websocket):
+        await websocket.close(code=CLOSE_CODE_TRY_AGAIN_LATER)
+        return
+
+    # 방에 입장 (accept는 이미 했으므로 manager에서는 accept 호출 안함)
+    manager.join_room(websocket, user_id, friend_id)
+    sender_username = None
 
     try:
         while True:
             # 4. 클라이언트로부터 메시지 수신 (대기)
             data = await websocket.receive_text()
+            manager.touch(websocket)
+
+            # Heartbeat(pong) 프레임은 메시지로 저장하지 않음
+            if manager.is_heartbeat_frame(data):
+                continue
             
             # 5. DB에 메시지 저장 (매 메시지마다 새 세션 사용)
             db = SessionLocal()
             try:
-                new_message = ChatMessage(
-                    sender_id=user_id,
-                    receiver_id=friend_id,
-                    message=data
-                )
-                db.add(new_message)
-                db.commit()
-                db.refresh(new_message)  # DB에서 생성된 id, created_at 가져오기
+                # 메시지 저장 + 대화방 요약 갱신 (id, created_at 포함)
+                new_message = chat_service.send_message(db, user_id, friend_id, data)
                 
-                # 보낸 사람 정보 조회
-                sender_user = db.query(User).filter(User.id == user_id).first()
-                sender_username = sender_user.username if sender_user else "Unknown"
+                # 보낸 사람 정보 조회 (연결당 1회)
+                if sender_username is None:
+                    sender_user = db.query(User).filter(User.id == user_id).first()
+                    sender_username = sender_user.username if sender_user else "Unknown"
 
                 from app.utils.datetime_utils import to_iso8601
-                # 6-1. 보낸 사람(나)에게 전송할 메시지
-                message_for_sender = {
+                payload = {
                     "id": new_message.id,
                     "text": new_message.message,
-                    "sender": "me",
-                    "timestamp": to_iso8601(new_message.created_at),
-                }
-                
-                # 6-2. 받는 사람에게 전송할 메시지
-                message_for_receiver = {
-                    "id": new_message.id,
-                    "text": new_message.message,
-                    "sender": sender_username,  # 보낸 사람의 username
                     "timestamp": to_iso8601(new_message.created_at),
                 }
             finally:
                 db.close()
             
-            # 7. 각 사용자에게 맞는 메시지 전송
-            room_id = manager.get_room_id(user_id, friend_id)
-            sent_to_ws = set() # 중복 전송 방지
-            
-            for uid, ws in manager.rooms.get(room_id, []):
-                try:
-                    if uid == user_id:
-                        await ws.send_text(json.dumps(message_for_sender))
-                    else:
-                        await ws.send_text(json.dumps(message_for_receiver))
-                    sent_to_ws.add(ws)
-                except Exception as e:
-                    print(f"메시지 전송 실패 (user {uid}): {e}")
-
-            # 8. 상대방의 다른 모든 연결(Presence 등)에게도 글로벌 알림 전송 (배경 알림용)
-            if manager.is_user_online(friend_id):
-                from app.utils.datetime_utils import now_utc, to_iso8601
-                global_notification = {
-                    "type": "new_message",
-                    "sender_id": user_id,
-                    "sender_username": sender_username,
-                    "text": data, # 원본 메시지
-                    "timestamp": to_iso8601(now_utc())
-                }
-                friend_connections = manager.user_connections.get(friend_id, set())
-                for friend_ws in friend_connections:
-                    if friend_ws not in sent_to_ws: # 이미 채팅방에서 받았으면 제외
-                        try:
-                            await friend_ws.send_text(json.dumps(global_notification))
-                        except:
-                            pass
+            # 6. 방 참여자에게 전송 (보낸 사람은 "me", 받는 사람은 username)
+            # 7. 상대방의 다른 모든 연결(Presence 등)에게도 글로벌 알림 전송 (배경 알림용)
+            await manager.deliver_chat_message(user_id, friend_id, sender_username, payload)
 
     except WebSocketDisconnect:
         print(f"[WebSocket] User {user_id} disconnected")
     except Exception as e:
         print(f"[WebSocket] Error: {e}")
     finally:
-        manager.disconnect(user_id, friend_id)
+        manager.disconnect(user_id, friend_id, websocket)
         manager.remove_user_connection(user_id, websocket)
\ No newline at end of file
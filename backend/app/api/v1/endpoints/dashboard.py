@@ -1,37 +1,42 @@
 from fastapi import APIRouter, Depends, Request, BackgroundTasks
-from sqlalchemy.orm import Session
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
-from app.services import dashboard_service, tracking_service
+from app.core.config import settings
+from app.services import dashboard_service, github_stats_service, tracking_service
 
 router = APIRouter()
 
 # 1. 대시보드 조회 API (Auth Required)
 @router.get("/summary")
-def get_dashboard(
+async def get_dashboard(
     user_id: int = None,
-    db: Session = Depends(deps.get_db),
-    current_user = Depends(deps.get_current_user)
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user = Depends(deps.get_current_user_async)
 ):
     from app.models.user import User
     
     # 1. 대상 유저 결정 (특정 유저 ID가 있으면 그 유저, 없으면 나 자신)
     if user_id:
-        target_user = db.query(User).filter(User.id == user_id).first()
+        target_user = await db.get(User, user_id)
         if not target_user:
             from fastapi import HTTPException
             raise HTTPException(status_code=404, detail="User not found")
     else:
         target_user = current_user
 
-    return dashboard_service.get_combined_dashboard(db, target_user)
+    # 최근 활동 유저로 기록 (sweeper가 GitHub 통계를 미리 갱신)
+    await github_stats_service.mark_active(current_user.id)
+
+    return await dashboard_service.get_combined_dashboard(db, target_user)
 
 # 2. 방문자 트래킹 API (Public, No Auth)
+# - DB를 건드리지 않고 Redis에만 기록 (중복 제거 + 카운트), DB 반영은 Celery beat가 주기적으로 일괄 처리
 @router.post("/visit")
-def track_visit(
+async def track_visit(
     request: Request,
     payload: dict,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(deps.get_db)
 ):
     # payload: { "repo_owner": "username", "is_test": boolean }
     repo_owner = payload.get("repo_owner")
@@ -44,17 +49,23 @@ def track_visit(
         print(f"🧪 Test visit from localhost for {repo_owner}")
         return {"status": "success", "mode": "test"}
 
-    # 실제 로직은 백그라운드로 넘겨서 빠른 응답 보장
     client_ip = request.client.host
     # 프록시(Nginx 등) 사용 시 헤더 확인 필요
     if request.headers.get("X-Forwarded-For"):
         client_ip = request.headers.get("X-Forwarded-For").split(",")[0]
 
+    if settings.VISIT_INGEST_REDIS_ENABLED:
+        try:
+            await tracking_service.record_visit(repo_owner, client_ip)
+            return {"status": "success"}
+        except RedisError as e:
+            print(f"⚠️ Visit ingest via Redis failed, falling back to DB: {e}")
+
+    # Redis 미사용/장애 시: 응답 후 백그라운드에서 자체 세션으로 DB에 기록
     background_tasks.add_task(
-        tracking_service.process_visit_log, 
-        db, 
-        repo_owner, 
+        tracking_service.process_visit_log_in_new_session,
+        repo_owner,
         client_ip
     )
 
-    return {"status": "success"}
\ No newline at end of file
+    return {"status": "success"}
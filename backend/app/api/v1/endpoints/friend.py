@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from typing import List
 
 from app.api import deps
 from app.models.user import User
 from app.models.friend import Friendship, FriendStatus
 from app.schemas.friend import FriendRequestCreate, FriendResponse, FriendInfo, PendingRequestInfo, SentRequestInfo
-from app.utils.friendship_utils import get_accepted_friendships, get_accepted_friendship
+from app.utils.friendship_utils import get_accepted_friendship, get_friendship, select_accepted_friend_users
 
 # [Config] 친구 요청을 자동으로 수락할 관리자(봇) ID 목록
 # 이 리스트에 포함된 ID로 친구 요청을 보내면 즉시 '수락' 처리됩니다.
@@ -32,13 +34,8 @@ def send_friend_request(
     if target_user.id == current_user.id:
         raise HTTPException(status_code=400, detail="나 자신에게는 친구 요청을 보낼 수 없습니다.")
 
-    # 3. 이미 친구 관계나 요청이 있는지 확인
-    existing = db.query(Friendship).filter(
-        or_(
-            (Friendship.requester_id == current_user.id) & (Friendship.addressee_id == target_user.id),
-            (Friendship.requester_id == target_user.id) & (Friendship.addressee_id == current_user.id)
-        )
-    ).first()
+    # 3. 이미 친구 관계나 요청이 있는지 확인 (정렬된 쌍 유니크 인덱스 조회)
+    existing = get_friendship(db, current_user.id, target_user.id)
 
     if existing:
         msg = "이미 친구 사이입니다." if existing.status == FriendStatus.ACCEPTED else "이미 친구 요청을 보냈거나 받았습니다."
@@ -56,7 +53,12 @@ def send_friend_request(
         status=initial_status
     )
     db.add(new_friendship)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # 양쪽에서 동시에 요청한 경우 (uq_friendship_pair 위반)
+        db.rollback()
+        raise HTTPException(status_code=400, detail="이미 친구 요청을 보냈거나 받았습니다.")
     db.refresh(new_friendship)
     
     return new_friendship
@@ -121,59 +123,53 @@ def reject_friend_request(
 
 # 친구 목록 조회 (GET /api/v1/friends)
 @router.get("", response_model=List[FriendInfo])
-def get_friend_list(
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+async def get_friend_list(
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
 ):
-    # ACCEPTED 상태인 친구 관계 조회 - friendship_utils 사용
-    friendships = get_accepted_friendships(db, current_user.id)
+    # ACCEPTED 상태인 친구의 User를 JOIN으로 한 번에 조회 - friendship_utils 사용
+    friend_users = (await db.scalars(select_accepted_friend_users(current_user.id))).all()
     
     # ConnectionManager를 사용하여 온라인 상태 확인
     from app.core.socket_manager import manager
     
-    friends = []
-    for fs in friendships:
-        # 상대방의 user_id 찾기
-        friend_id = fs.addressee_id if fs.requester_id == current_user.id else fs.requester_id
-        friend_user = db.query(User).filter(User.id == friend_id).first()
-        
-        if friend_user:
-            friends.append(FriendInfo(
-                user_id=friend_user.id,
-                username=friend_user.username,
-                nickname=getattr(friend_user, 'nickname', None),
-                is_online=manager.is_user_online(friend_user.id)  # 온라인 상태 확인
-            ))
-    
-    return friends
+    return [
+        FriendInfo(
+            user_id=friend_user.id,
+            username=friend_user.username,
+            nickname=getattr(friend_user, 'nickname', None),
+            is_online=manager.is_user_online(friend_user.id)  # 온라인 상태 확인
+        )
+        for friend_user in friend_users
+    ]
 
 
 # 받은 친구 요청 목록 (GET /api/v1/friends/pending)
 @router.get("/pending", response_model=List[PendingRequestInfo])
-def get_pending_requests(
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+async def get_pending_requests(
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
 ):
-    # 내가 받은 PENDING 상태의 친구 요청 조회
-    pending_requests = db.query(Friendship).filter(
-        Friendship.addressee_id == current_user.id,
-        Friendship.status == FriendStatus.PENDING
-    ).all()
-    
-    result = []
-    for req in pending_requests:
-        requester = db.query(User).filter(User.id == req.requester_id).first()
-        
-        if requester:
-            result.append(PendingRequestInfo(
-                friendship_id=req.id,
-                requester_id=requester.id,
-                requester_username=requester.username,
-                requester_nickname=getattr(requester, 'nickname', None),
-                created_at=req.created_at
-            ))
-    
-    return result
+    # 내가 받은 PENDING 상태의 친구 요청 + 요청자 정보 (JOIN 1회)
+    rows = (await db.execute(
+        select(Friendship, User).join(
+            User, User.id == Friendship.requester_id
+        ).where(
+            Friendship.addressee_id == current_user.id,
+            Friendship.status == FriendStatus.PENDING
+        ).order_by(Friendship.id)
+    )).all()
+    
+    return [
+        PendingRequestInfo(
+            friendship_id=req.id,
+            requester_id=requester.id,
+            requester_username=requester.username,
+            requester_nickname=getattr(requester, 'nickname', None),
+            created_at=req.created_at
+        )
+        for req, requester in rows
+    ]
 
 
 # 친구 삭제 (DELETE /api/v1/friends/{friend_user_id})
@@ -198,30 +194,30 @@ def delete_friend(
 
 # 내가 보낸 친구 요청 목록 (GET /api/v1/friends/sent)
 @router.get("/sent", response_model=List[SentRequestInfo])
-def get_sent_requests(
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+async def get_sent_requests(
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
 ):
-    # 내가 보낸 PENDING 상태의 친구 요청 조회
-    sent_requests = db.query(Friendship).filter(
-        Friendship.requester_id == current_user.id,
-        Friendship.status == FriendStatus.PENDING
-    ).all()
-    
-    result = []
-    for req in sent_requests:
-        addressee = db.query(User).filter(User.id == req.addressee_id).first()
-        
-        if addressee:
-            result.append(SentRequestInfo(
-                friendship_id=req.id,
-                addressee_id=addressee.id,
-                addressee_username=addressee.username,
-                addressee_nickname=getattr(addressee, 'nickname', None),
-                created_at=req.created_at
-            ))
-    
-    return result
+    # 내가 보낸 PENDING 상태의 친구 요청 + 상대방 정보 (JOIN 1회)
+    rows = (await db.execute(
+        select(Friendship, User).join(
+            User, User.id == Friendship.addressee_id
+        ).where(
+            Friendship.requester_id == current_user.id,
+            Friendship.status == FriendStatus.PENDING
+        ).order_by(Friendship.id)
+    )).all()
+    
+    return [
+        SentRequestInfo(
+            friendship_id=req.id,
+            addressee_id=addressee.id,
+            addressee_username=addressee.username,
+            addressee_nickname=getattr(addressee, 'nickname', None),
+            created_at=req.created_at
+        )
+        for req, addressee in rows
+    ]
 
 
 # 보낸 친구 요청 취소 (DELETE /api/v1/friends/{friendship_id}/cancel)
@@ -52,25 +52,22 @@ def get_guestbook_list(
     db: Session = Depends(deps.get_db)
 ):
     try:
-        entries = db.query(Guestbook).filter(Guestbook.owner_id == owner_id).order_by(Guestbook.is_pinned.desc(), Guestbook.created_at.desc()).all()
+        # 방명록 + 작성자 이름을 OUTER JOIN 1회로 조회 (항목별 author lazy load 제거)
+        rows = db.query(Guestbook, User.username).outerjoin(
+            User, User.id == Guestbook.author_id
+        ).filter(
+            Guestbook.owner_id == owner_id
+        ).order_by(Guestbook.is_pinned.desc(), Guestbook.created_at.desc()).all()
         
         result = []
-        for e in entries:
-            # 안전하게 데이터 매핑
-            author_name = "Unknown"
-            try:
-                if e.author:
-                    author_name = e.author.username
-            except Exception as author_err:
-                print(f"Error accessing author for guestbook {e.id}: {author_err}")
-                
+        for e, author_username in rows:
             resp = GuestbookResponse(
                 id=e.id,
                 owner_id=e.owner_id,
                 author_id=e.author_id,
                 content=e.content,
                 created_at=to_iso8601(e.created_at),
-                author_name=author_name,
+                author_name=author_username or "Unknown",
                 is_pinned=e.is_pinned
             )
             result.append(resp)
@@ -1,11 +1,9 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from jose import jwt, JWTError
-from app.core.config import settings
-from app.core.socket_manager import manager
+from app.core.socket_manager import manager, CLOSE_CODE_TRY_AGAIN_LATER, CHANNEL_PRESENCE
 from app.db.session import SessionLocal
 from app.models.friend import Friendship, FriendStatus
 from app.utils.friendship_utils import get_friend_ids
-import json
+from app.api import deps
 
 router = APIRouter()
 
@@ -14,9 +12,11 @@ router = APIRouter()
 async def presence_endpoint(
     websocket: WebSocket,
     token: str = None,
+    encoding: str = None,
 ):
     """
     실시간 온라인 상태 업데이트를 위한 WebSocket 엔드포인트
+    - encoding: json(기본) / compact / msgpack (app.core.wire_format 참고)
     """
     # 먼저 연결 수락
     await websocket.accept()
@@ -34,56 +34,47 @@ async def presence_endpoint(
         await websocket.close(code=1008)
         return
     
-    # 토큰 검증
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: int = int(payload.get("sub"))
-        print(f"[Presence] 토큰 검증 성공: user_id={user_id}")
-    except (JWTError, ValueError) as e:
-        print(f"[Presence] 토큰 검증 실패: {e}")
+    # 토큰 검증 (토큰 버전/탈퇴 여부 포함)
+    user_id = await deps.get_websocket_user_id(token)
+    if user_id is None:
+        print(f"[Presence] 토큰 검증 실패")
         await websocket.close(code=1008)
         return
+    print(f"[Presence] 토큰 검증 성공: user_id={user_id}")
     
-    # 사용자를 온라인 상태로 등록
-    manager.add_user_connection(user_id, websocket)
+    # 사용자를 온라인 상태로 등록 (연결 수 제한 초과 시 거절)
+    if not manager.add_user_connection(user_id, websocket, encoding=encoding):
+        await websocket.close(code=CLOSE_CODE_TRY_AGAIN_LATER)
+        return
     
     # 친구 목록 조회 - friendship_utils 사용
+    # (세션은 조회 직후 반납: 브로드캐스트 await 동안 커넥션을 점유하면 접속 폭주 시 풀이 고갈됨)
     db = SessionLocal()
     try:
         friend_ids = get_friend_ids(db, user_id)
-        
-        # 친구들에게 내가 온라인 상태임을 알림
-        online_notification = json.dumps({
-            "type": "user_online",
-            "user_id": user_id
-        })
-        
-        for friend_id in friend_ids:
-            # 친구가 온라인이면 알림 전송
-            if manager.is_user_online(friend_id):
-                friend_connections = manager.user_connections.get(friend_id, set())
-                for friend_ws in friend_connections:
-                    try:
-                        await friend_ws.send_text(online_notification)
-                    except Exception as e:
-                        print(f"[Presence] 친구 {friend_id}에게 온라인 알림 실패: {e}")
-        
-        # 현재 온라인인 친구 목록 전송
-        online_friends = [fid for fid in friend_ids if manager.is_user_online(fid)]
-        initial_status = json.dumps({
-            "type": "initial_status",
-            "online_friends": online_friends
-        })
-        await websocket.send_text(initial_status)
-        
     finally:
         db.close()
+
+    # 친구들에게 내가 온라인 상태임을 알림 (온라인인 친구의 연결에만 전송)
+    await manager.send_to_users(
+        friend_ids, {"type": "user_online", "user_id": user_id}, CHANNEL_PRESENCE
+    )
+
+    # 현재 온라인인 친구 목록 전송
+    online_friends = [fid for fid in friend_ids if manager.is_user_online(fid)]
+    await manager.send_payload(websocket, {
+        "type": "initial_status",
+        "online_friends": online_friends
+    })
     
     try:
         # 연결 유지 (ping-pong 또는 메시지 수신 대기)
         while True:
-            # 클라이언트로부터 메시지 수신
-            data = await websocket.receive_text()
+            # 클라이언트로부터 메시지 수신 (pong 포함 모든 프레임이 생존 신호)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            manager.touch(websocket)
             # presence 엔드포인트는 단순히 연결 유지만 하므로 메시지 처리 불필요
             
     except WebSocketDisconnect:
@@ -98,19 +89,9 @@ async def presence_endpoint(
         db = SessionLocal()
         try:
             friend_ids = get_friend_ids(db, user_id)
-            
-            offline_notification = json.dumps({
-                "type": "user_offline",
-                "user_id": user_id
-            })
-            
-            for friend_id in friend_ids:
-                if manager.is_user_online(friend_id):
-                    friend_connections = manager.user_connections.get(friend_id, set())
-                    for friend_ws in friend_connections:
-                        try:
-                            await friend_ws.send_text(offline_notification)
-                        except Exception as e:
-                            print(f"[Presence] 친구 {friend_id}에게 오프라인 알림 실패: {e}")
         finally:
             db.close()
+
+        await manager.send_to_users(
+            friend_ids, {"type": "user_offline", "user_id": user_id}, CHANNEL_PRESENCE
+        )
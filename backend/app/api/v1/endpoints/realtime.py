@@ -0,0 +1,259 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from starlette.concurrency import run_in_threadpool
+
+from app.api import deps
+from app.core import wire_format
+from app.core.socket_manager import (
+    manager, CLOSE_CODE_TRY_AGAIN_LATER, CHANNEL_PRESENCE, CHANNEL_NOTIFICATIONS
+)
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.services import chat_service
+from app.utils.friendship_utils import get_friend_ids
+
+router = APIRouter()
+
+# 하나의 소켓으로 채팅/프레즌스/알림/작업 이벤트를 모두 처리하는 멀티플렉스 엔드포인트
+#
+# [Client -> Server]
+#   {"type": "subscribe",   "channel": "presence"}
+#   {"type": "subscribe",   "channel": "notifications"}
+#   {"type": "subscribe",   "channel": "chat",  "friend_id": 2}
+#   {"type": "subscribe",   "channel": "tasks", "task_id": "..."}
+#   {"type": "unsubscribe", ...subscribe와 동일한 필드}
+#   {"type": "chat.send", "friend_id": 2, "text": "..."}
+#   {"type": "pong"}
+#
+# [Server -> Client]
+#   {"type": "ready", "user_id": 1, "username": "..."}
+#   {"type": "subscribed" | "unsubscribed", "channel": "...", ...}
+#   {"type": "initial_status" | "user_online" | "user_offline", "channel": "presence", ...}
+#   {"type": "chat.message", "friend_id": 2, "id": .., "text": .., "sender": .., "timestamp": ..}
+#   {"type": "new_message", "channel": "notifications", ...}
+#   {"type": "task.status", "channel": "tasks", "task_id": "...", "status": "SUCCESS"}
+#   {"type": "error", "message": "...", "ref": "<요청 type>"}
+#
+# [Encoding] /realtime/ws?encoding=json|compact|msgpack
+#   - json    : 기본값, 위 형식 그대로
+#   - compact : 최상위 키를 짧은 키로 치환한 JSON (type -> t, channel -> c, ... / wire_format.SHORT_KEYS)
+#   - msgpack : compact와 같은 키를 MessagePack 바이너리 프레임으로 전송
+#   클라이언트 -> 서버 프레임도 같은 인코딩을 사용 (바이너리 프레임은 msgpack으로 해석)
+
+
+def _load_connection_context(user_id: int):
+    """연결 시 1회: 유저 정보와 친구 ID 집합 로드"""
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            return None, set()
+        return user.username, set(get_friend_ids(db, user_id))
+    finally:
+        db.close()
+
+
+def _reload_friend_ids(user_id: int) -> set:
+    db = SessionLocal()
+    try:
+        return set(get_friend_ids(db, user_id))
+    finally:
+        db.close()
+
+
+def _save_chat_message(sender_id: int, receiver_id: int, text: str) -> dict:
+    db = SessionLocal()
+    try:
+        from app.utils.datetime_utils import to_iso8601
+        new_message = chat_service.send_message(db, sender_id, receiver_id, text)
+        return {
+            "id": new_message.id,
+            "text": new_message.message,
+            "timestamp": to_iso8601(new_message.created_at),
+        }
+    finally:
+        db.close()
+
+
+def _get_task_state(task_id: str) -> str:
+    from celery.result import AsyncResult
+    from app.worker import celery_app
+    return AsyncResult(task_id, app=celery_app).state
+
+
+@router.websocket("/ws")
+async def realtime_endpoint(
+    websocket: WebSocket,
+    token: str = None,
+    encoding: str = None,
+):
+    await websocket.accept()
+    encoding = wire_format.normalize_encoding(encoding)
+
+    # 토큰 가져오기: 쿼리 파라미터 우선, 없으면 쿠키에서
+    if not token:
+        token = websocket.cookies.get("access_token")
+    if not token:
+        await websocket.close(code=1008)
+        return
+
+    # 1. 인증 (연결당 1회, 토큰 버전/탈퇴 여부 포함)
+    user_id = await deps.get_websocket_user_id(token)
+    if user_id is None:
+        print(f"[Realtime] 토큰 검증 실패")
+        await websocket.close(code=1008)
+        return
+
+    # 2. 유저 정보 & 친구 목록 로드 (연결당 1회, 이후 구독 검증은 메모리에서)
+    username, friend_ids = await run_in_threadpool(_load_connection_context, user_id)
+    if username is None:
+        await websocket.close(code=1008)
+        return
+
+    if not manager.add_user_connection(user_id, websocket, multiplexed=True, encoding=encoding):
+        await websocket.close(code=CLOSE_CODE_TRY_AGAIN_LATER)
+        return
+
+    was_online = len(manager.user_connections.get(user_id, ())) > 1
+    async def send(payload: dict):
+        await manager.send_payload(websocket, payload)
+
+    await send({"type": "ready", "user_id": user_id, "username": username, "encoding": encoding})
+
+    # 처음 온라인이 된 경우에만 친구들에게 알림
+    if not was_online:
+        await manager.send_to_users(
+            friend_ids, {"type": "user_online", "user_id": user_id}, CHANNEL_PRESENCE
+        )
+
+    async def send_error(message: str, ref: str = None):
+        await send({"type": "error", "message": message, "ref": ref})
+
+    async def is_friend(friend_id: int) -> bool:
+        nonlocal friend_ids
+        if friend_id in friend_ids:
+            return True
+        # 연결 이후 새로 친구가 된 경우를 위해 1회 재조회
+        friend_ids = await run_in_threadpool(_reload_friend_ids, user_id)
+        return friend_id in friend_ids
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            manager.touch(websocket)
+
+            data = message.get("bytes")
+            if data is None:
+                data = message.get("text") or ""
+            try:
+                frame = wire_format.decode(data, encoding)
+            except ValueError:
+                await send_error("Invalid frame")
+                continue
+            if not isinstance(frame, dict):
+                await send_error("Frame must be an object")
+                continue
+
+            frame_type = frame.get("type")
+            channel = frame.get("channel")
+
+            if frame_type in ("pong", "ping"):
+                continue
+
+            # -------------------------------------------------
+            # 구독 / 구독 해제
+            # -------------------------------------------------
+            if frame_type in ("subscribe", "unsubscribe"):
+                subscribing = frame_type == "subscribe"
+
+                if channel in (CHANNEL_PRESENCE, CHANNEL_NOTIFICATIONS):
+                    if subscribing:
+                        manager.subscribe_channel(websocket, channel)
+                    else:
+                        manager.unsubscribe_channel(websocket, channel)
+                    await send({"type": f"{frame_type}d", "channel": channel})
+
+                    # 프레즌스 구독 시 현재 온라인 친구 목록 전송
+                    if subscribing and channel == CHANNEL_PRESENCE:
+                        online_friends = [fid for fid in friend_ids if manager.is_user_online(fid)]
+                        await send({
+                            "type": "initial_status",
+                            "channel": CHANNEL_PRESENCE,
+                            "online_friends": online_friends
+                        })
+
+                elif channel == "chat":
+                    try:
+                        friend_id = int(frame.get("friend_id"))
+                    except (TypeError, ValueError):
+                        await send_error("friend_id is required", frame_type)
+                        continue
+                    if subscribing:
+                        if not await is_friend(friend_id):
+                            await send_error("친구 관계가 아니므로 채팅방에 입장할 수 없습니다.", frame_type)
+                            continue
+                        manager.join_room(websocket, user_id, friend_id)
+                    else:
+                        manager.disconnect(user_id, friend_id, websocket)
+                    await send({"type": f"{frame_type}d", "channel": "chat", "friend_id": friend_id})
+
+                elif channel == "tasks":
+                    task_id = frame.get("task_id")
+                    if not task_id:
+                        await send_error("task_id is required", frame_type)
+                        continue
+                    if not subscribing:
+                        manager.unsubscribe_task(websocket, task_id)
+                        await send({"type": "unsubscribed", "channel": "tasks", "task_id": task_id})
+                        continue
+
+                    manager.subscribe_task(websocket, task_id)
+                    await send({"type": "subscribed", "channel": "tasks", "task_id": task_id})
+                    # 구독 전에 이미 끝난 작업이면 현재 상태를 바로 전달
+                    try:
+                        state = await run_in_threadpool(_get_task_state, task_id)
+                        if state != "PENDING":
+                            await manager.publish_task_event({"task_id": task_id, "status": state})
+                    except Exception as e:
+                        print(f"[Realtime] Task state lookup failed: {e}")
+
+                else:
+                    await send_error(f"Unknown channel: {channel}", frame_type)
+
+            # -------------------------------------------------
+            # 채팅 전송
+            # -------------------------------------------------
+            elif frame_type == "chat.send":
+                text = frame.get("text")
+                try:
+                    friend_id = int(frame.get("friend_id"))
+                except (TypeError, ValueError):
+                    await send_error("friend_id is required", frame_type)
+                    continue
+                if not isinstance(text, str) or not text.strip():
+                    await send_error("text is required", frame_type)
+                    continue
+                if not await is_friend(friend_id):
+                    await send_error("친구 관계가 아니므로 메시지를 보낼 수 없습니다.", frame_type)
+                    continue
+
+                message_payload = await run_in_threadpool(_save_chat_message, user_id, friend_id, text)
+                await manager.deliver_chat_message(user_id, friend_id, username, message_payload)
+
+            else:
+                await send_error(f"Unknown frame type: {frame_type}", frame_type)
+
+    except WebSocketDisconnect:
+        print(f"[Realtime] User {user_id} disconnected")
+    except Exception as e:
+        print(f"[Realtime] Error: {e}")
+    finally:
+        manager.leave_all_rooms(websocket)
+        manager.remove_user_connection(user_id, websocket)
+
+        # 마지막 연결이 끊긴 경우에만 친구들에게 오프라인 알림
+        if not manager.is_user_online(user_id):
+            await manager.send_to_users(
+                friend_ids, {"type": "user_offline", "user_id": user_id}, CHANNEL_PRESENCE
+            )
@@ -1,28 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from app.api.deps import get_db, get_current_user
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.api.deps import get_async_db, get_current_user_async
 from app.core.security import decrypt_token
+from app.core import auth_cache
+from app.crud import crud_user
+from app.services import account_deletion_service
 from app.services.github.github_service import GitHubService
 from app.models.user import User
-from app.models.friend import Friendship
-from app.models.chat import ChatMessage
-from app.models.avatar import Avatar
-from app.models.quest import UserQuest
-from app.models.guestbook import Guestbook
-from app.models.visit import UserVisit
-from app.models.calendar import Calendar
-from app.models.gift import DailyGift
-from app.models.gift import DailyGift
-from app.models.checkin import DailyCheckinLog
-from app.models.dashboard import BlogPost, UserDashboard, BlogVisitLog
 
 router = APIRouter()
 
 @router.get("/me")
 async def read_users_me(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
 ):
     encrypted_gh_token = current_user.github_access_token
     github_raw_data = None
@@ -48,14 +40,11 @@ async def read_users_me(
 
 @router.patch("/tutorial/complete")
 async def complete_tutorial(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """튜토리얼 완료 상태로 변경"""
-    current_user.tutorial_completed = True
-    db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
+    await crud_user.set_tutorial_completed_async(db, current_user, True)
     return {
         "message": "Tutorial marked as completed",
         "tutorial_completed": current_user.tutorial_completed
@@ -64,10 +53,10 @@ async def complete_tutorial(
 @router.get("/by-username/{username}")
 async def read_user_by_username(
     username: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    user = db.query(User).filter(User.username == username).first()
+    user = await db.scalar(select(User).where(User.username == username))
     if not user:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
     
@@ -83,10 +72,10 @@ async def read_user_by_username(
 @router.get("/{user_id}")
 async def read_user_by_id(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
     
@@ -101,52 +90,42 @@ async def read_user_by_id(
 
 @router.delete("/me")
 async def delete_user_account(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user_id = current_user.id
+    """
+    회원 탈퇴 접수
+    - 계정 비활성화 + 기존 토큰 무효화까지만 요청 안에서 처리
+    - 연관 데이터 삭제는 Celery 작업이 테이블별로 나눠서 진행 (대량 데이터 유저도 요청 타임아웃/테이블 락 없음)
+    """
     try:
-        # 1. 연관 데이터 삭제 (순서 준수: FK 제약 조건)
-        db.query(DailyCheckinLog).filter(DailyCheckinLog.user_id == user_id).delete()
-        db.query(DailyGift).filter(DailyGift.user_id == user_id).delete()
-        db.query(UserQuest).filter(UserQuest.user_id == user_id).delete()
-        db.query(Calendar).filter(Calendar.user_id == user_id).delete()
-        
-        # [Fix] 대시보드 및 블로그 관련 데이터 삭제
-        db.query(BlogPost).filter(BlogPost.user_id == user_id).delete()
-        db.query(UserDashboard).filter(UserDashboard.user_id == user_id).delete()
-        db.query(BlogVisitLog).filter(BlogVisitLog.owner_id == user_id).delete()
-        db.query(UserVisit).filter(or_(UserVisit.visitor_id == user_id, UserVisit.owner_id == user_id)).delete()
-        db.query(Guestbook).filter(Guestbook.owner_id == user_id).delete()
-        db.query(ChatMessage).filter(or_(ChatMessage.sender_id == user_id, ChatMessage.receiver_id == user_id)).delete()
-        db.query(Friendship).filter(or_(Friendship.requester_id == user_id, Friendship.addressee_id == user_id)).delete()
-        db.query(Avatar).filter(Avatar.user_id == user_id).delete()
-        
-        # 2. 유저 삭제
-        db.delete(current_user)
-        db.commit()
-        return {"message": "회원 탈퇴가 완료되었습니다."}
+        user_id = current_user.id
+        job = await db.run_sync(account_deletion_service.request_deletion, current_user)
+        # 탈퇴한 유저의 토큰이 캐시로 계속 통과하지 않도록 즉시 무효화
+        await auth_cache.invalidate_user_async(user_id)
+        # 예약 실패 시에도 작업은 DB에 남아 있어 sweeper가 재예약
+        await run_in_threadpool(account_deletion_service.enqueue, job["job_id"])
+        return {"message": "회원 탈퇴 요청이 접수되었습니다. 데이터는 순차적으로 삭제됩니다.", "deletion": job}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"회원 탈퇴 에러: {str(e)}")
         raise HTTPException(status_code=500, detail=f"에러 발생: {str(e)}")
 
 @router.post("/tutorial/reset")
 async def reset_tutorial(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     튜토리얼 진행 상태를 초기화합니다.
     사용자가 튜토리얼을 다시 진행할 수 있도록 tutorial_completed를 False로 설정합니다.
     """
     try:
-        current_user.tutorial_completed = False
-        db.commit()
+        await crud_user.set_tutorial_completed_async(db, current_user, False)
         return {
             "message": "튜토리얼이 초기화되었습니다.",
             "tutorial_completed": False
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"튜토리얼 초기화 실패: {str(e)}")
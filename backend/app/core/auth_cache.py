@@ -0,0 +1,212 @@
+"""
+인증 유저(principal) 캐시
+
+get_current_user는 거의 모든 인증 요청에서 호출되므로, 매 요청마다
+users 테이블을 조회하지 않도록 짧은 TTL의 캐시를 둡니다.
+
+- 1단계: 프로세스 로컬 LRU (크기 제한 + TTL)
+- 2단계: Redis (AUTH_CACHE_REDIS_ENABLED=true 일 때만, 워커/인스턴스 간 공유)
+
+캐시 키는 user_id, 값에는 token_version을 함께 저장해 토큰 버전이 다르면 미스로 처리합니다.
+프로필/토큰 변경(crud_user), 회원 탈퇴 시 invalidate_user로 즉시 무효화합니다.
+
+⚠️ 무효화는 호출한 프로세스의 로컬 캐시와 Redis(사용 시)에만 즉시 반영됩니다.
+   다른 API 프로세스의 로컬 캐시에 남은 항목은 지워지지 않으므로, 그 프로세스에서는
+   토큰 폐기(버전 증가)/탈퇴가 최대 AUTH_CACHE_TTL_SECONDS 뒤에 반영됩니다 (AUTH_CACHE_REDIS_ENABLED와 무관).
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import orjson
+from sqlalchemy import DateTime
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.user import User
+from app.utils.ttl_cache import TTLCache
+
+REDIS_KEY_PREFIX = "eggit:auth:user:"
+
+
+_local_cache = TTLCache(settings.AUTH_CACHE_MAX_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+
+# 통계 (/admin/realtime/stats 등에서 확인용)
+stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "invalidations": 0}
+
+_USER_COLUMNS = [column.key for column in User.__table__.columns]
+_DATETIME_COLUMNS = {column.key for column in User.__table__.columns if isinstance(column.type, DateTime)}
+
+_redis_client = None
+_async_redis_client = None
+
+
+def _get_redis():
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=0.2)
+    return _redis_client
+
+
+def _get_async_redis():
+    global _async_redis_client
+    if _async_redis_client is None:
+        import redis.asyncio as redis
+        _async_redis_client = redis.from_url(settings.REDIS_URL, socket_timeout=0.2)
+    return _async_redis_client
+
+
+# =========================================================
+# 직렬화 (User <-> dict)
+# =========================================================
+
+def _snapshot(user: User) -> Dict[str, Any]:
+    return {key: getattr(user, key) for key in _USER_COLUMNS}
+
+
+def _dumps(snapshot: Dict[str, Any]) -> bytes:
+    return orjson.dumps(snapshot)
+
+
+def _loads(raw: bytes) -> Dict[str, Any]:
+    snapshot = orjson.loads(raw)
+    for key in _DATETIME_COLUMNS:
+        if snapshot.get(key):
+            snapshot[key] = datetime.fromisoformat(snapshot[key])
+    return snapshot
+
+
+def _matches(snapshot: Optional[Dict[str, Any]], token_version: int) -> bool:
+    return snapshot is not None and (snapshot.get("token_version") or 0) == token_version
+
+
+def _detached_user(snapshot: Dict[str, Any]) -> User:
+    """
+    캐시된 컬럼 값으로 'DB에서 방금 읽은 것과 같은' detached User 생성
+    이후 session.merge(load=False)로 SELECT 없이 요청 세션에 붙입니다.
+    """
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+
+def attach(db: Session, snapshot: Dict[str, Any]) -> User:
+    return db.merge(_detached_user(snapshot), load=False)
+
+
+async def attach_async(db: AsyncSession, snapshot: Dict[str, Any]) -> User:
+    return await db.merge(_detached_user(snapshot), load=False)
+
+
+# =========================================================
+# 조회 / 저장 / 무효화
+# =========================================================
+
+def get_user(user_id: int, token_version: int) -> Optional[Dict[str, Any]]:
+    """캐시된 유저 스냅샷 조회 (토큰 버전이 다르면 None)"""
+    if not settings.AUTH_CACHE_ENABLED:
+        return None
+
+    snapshot = _local_cache.get(user_id)
+    if _matches(snapshot, token_version):
+        stats["local_hits"] += 1
+        return snapshot
+
+    if settings.AUTH_CACHE_REDIS_ENABLED:
+        try:
+            raw = _get_redis().get(f"{REDIS_KEY_PREFIX}{user_id}")
+        except Exception as e:
+            print(f"[AuthCache] Redis get 실패: {e}")
+            raw = None
+        if raw:
+            snapshot = _loads(raw)
+            if _matches(snapshot, token_version):
+                _local_cache.set(user_id, snapshot)
+                stats["redis_hits"] += 1
+                return snapshot
+
+    stats["misses"] += 1
+    return None
+
+
+async def get_user_async(user_id: int, token_version: int) -> Optional[Dict[str, Any]]:
+    """get_user의 비동기 버전 (Redis 조회 중 이벤트 루프를 막지 않음)"""
+    if not settings.AUTH_CACHE_ENABLED:
+        return None
+
+    snapshot = _local_cache.get(user_id)
+    if _matches(snapshot, token_version):
+        stats["local_hits"] += 1
+        return snapshot
+
+    if settings.AUTH_CACHE_REDIS_ENABLED:
+        try:
+            raw = await _get_async_redis().get(f"{REDIS_KEY_PREFIX}{user_id}")
+        except Exception as e:
+            print(f"[AuthCache] Redis get 실패: {e}")
+            raw = None
+        if raw:
+            snapshot = _loads(raw)
+            if _matches(snapshot, token_version):
+                _local_cache.set(user_id, snapshot)
+                stats["redis_hits"] += 1
+                return snapshot
+
+    stats["misses"] += 1
+    return None
+
+
+def set_user(user: User):
+    if not settings.AUTH_CACHE_ENABLED:
+        return
+    snapshot = _snapshot(user)
+    _local_cache.set(user.id, snapshot)
+    if settings.AUTH_CACHE_REDIS_ENABLED:
+        try:
+            _get_redis().set(
+                f"{REDIS_KEY_PREFIX}{user.id}", _dumps(snapshot),
+                ex=settings.AUTH_CACHE_REDIS_TTL_SECONDS
+            )
+        except Exception as e:
+            print(f"[AuthCache] Redis set 실패: {e}")
+
+
+async def set_user_async(user: User):
+    if not settings.AUTH_CACHE_ENABLED:
+        return
+    snapshot = _snapshot(user)
+    _local_cache.set(user.id, snapshot)
+    if settings.AUTH_CACHE_REDIS_ENABLED:
+        try:
+            await _get_async_redis().set(
+                f"{REDIS_KEY_PREFIX}{user.id}", _dumps(snapshot),
+                ex=settings.AUTH_CACHE_REDIS_TTL_SECONDS
+            )
+        except Exception as e:
+            print(f"[AuthCache] Redis set 실패: {e}")
+
+
+def invalidate_user(user_id: int):
+    """유저 정보/토큰이 바뀌었을 때 호출 (로컬 + Redis 삭제)"""
+    _local_cache.pop(user_id)
+    stats["invalidations"] += 1
+    if settings.AUTH_CACHE_REDIS_ENABLED:
+        try:
+            _get_redis().delete(f"{REDIS_KEY_PREFIX}{user_id}")
+        except Exception as e:
+            print(f"[AuthCache] Redis delete 실패: {e}")
+
+
+async def invalidate_user_async(user_id: int):
+    _local_cache.pop(user_id)
+    stats["invalidations"] += 1
+    if settings.AUTH_CACHE_REDIS_ENABLED:
+        try:
+            await _get_async_redis().delete(f"{REDIS_KEY_PREFIX}{user_id}")
+        except Exception as e:
+            print(f"[AuthCache] Redis delete 실패: {e}")
+
+
+def get_stats() -> dict:
+    return {**stats, "local_size": len(_local_cache)}
@@ -1,3 +1,4 @@
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 # 앱 설정값 지정
@@ -15,6 +16,8 @@ class Settings(BaseSettings):
 # .env 기반 설정
 # ================================================
     DATABASE_URL: str
+    # 비동기 엔진 접속 주소 (없으면 DATABASE_URL의 드라이버만 async 드라이버로 교체)
+    ASYNC_DATABASE_URL: Optional[str] = None
 
     SECRET_KEY: str 
     ALGORITHM: str = "HS256" 
@@ -30,9 +33,102 @@ class Settings(BaseSettings):
     CELERY_RESULT_BACKEND: str = "redis://redis:6379/0"
 
     REDIS_URL: str = "redis://redis:6379/1"
+
+    # DB 커넥션 풀 & SQL 로그
+    DB_ECHO: bool = False              # 실행 SQL 로그 출력 (개발용, 운영에서는 False)
+    DB_POOL_SIZE: int = 10             # 동기 엔진 (threadpool 엔드포인트 & Celery)
+    DB_MAX_OVERFLOW: int = 20
+    ASYNC_DB_POOL_SIZE: int = 20       # 비동기 엔진 (async 엔드포인트)
+    ASYNC_DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 10          # 커넥션 대기 최대 시간(초)
+    DB_POOL_RECYCLE: int = 1800        # MySQL wait_timeout 이전에 커넥션 재생성(초)
+
+    # 인증 캐시 (get_current_user의 유저 조회 & JWT 검증 결과)
+    AUTH_CACHE_ENABLED: bool = True
+    AUTH_CACHE_TTL_SECONDS: int = 30          # 로컬 LRU 항목 유지 시간 (다른 프로세스의 토큰 폐기/탈퇴 반영 최대 지연)
+    AUTH_CACHE_MAX_SIZE: int = 10000          # 로컬 LRU 최대 유저 수
+    AUTH_CACHE_REDIS_ENABLED: bool = False    # 인스턴스 간 공유 캐시 (Redis) 사용 여부
+    AUTH_CACHE_REDIS_TTL_SECONDS: int = 300
+    JWT_CACHE_MAX_SIZE: int = 10000           # 검증 완료된 토큰 메모이제이션 개수 (만료 시각까지 유지)
+
+    # 블로그 방문 로그 보존 기간 (일별 집계는 영구 보존, 원본 로그만 정리)
+    VISIT_LOG_RETENTION_DAYS: int = 30
+    # 블로그 방문 수집 (Redis에 모았다가 주기적으로 DB에 일괄 반영)
+    VISIT_INGEST_REDIS_ENABLED: bool = True
+    VISIT_DEDUP_MODE: str = "hll"             # hll: HyperLogLog(오차 ~0.8%, 고정 메모리) / set: 정확한 중복 제거
+    VISIT_FLUSH_INTERVAL_SECONDS: int = 30
+    VISIT_FLUSH_ORPHAN_SECONDS: int = 300     # 이 시간보다 오래 남은 flushing 배치는 중단된 실행의 잔여분으로 보고 회수
+
+    # GitHub 통계 갱신 (대시보드는 캐시를 즉시 반환, 갱신은 Celery)
+    GITHUB_STATS_TTL_SECONDS: int = 3600              # 이 시간이 지나면 갱신 예약
+    GITHUB_STATS_LOCK_SECONDS: int = 120              # 유저별 갱신 락 / 예약 중복 제거 유지 시간
+    GITHUB_STATS_ACTIVE_WINDOW_SECONDS: int = 86400   # sweeper가 사전 갱신할 '최근 활동' 기준
+    GITHUB_STATS_SWEEP_INTERVAL_SECONDS: int = 600
+    GITHUB_STATS_SWEEP_BATCH_SIZE: int = 200
+
+    # 로그인 후속 작업 (대시보드/아바타 초기화, 출석, 선물) 결과 보관 시간
+    POST_LOGIN_RESULT_TTL_SECONDS: int = 3600
+
+    # 퀘스트 카탈로그 메모리 캐시 재적재 주기 (다른 프로세스의 동기화 반영)
+    QUEST_CATALOG_TTL_SECONDS: int = 300
+
+    # 회원 탈퇴 (비동기 삭제 작업)
+    ACCOUNT_DELETION_CHUNK_SIZE: int = 1000           # 한 트랜잭션에서 삭제할 최대 행 수 (락 유지 시간 제한)
+    ACCOUNT_DELETION_STALE_SECONDS: int = 600         # 이 시간 동안 진행이 없으면 재개 대상
+    ACCOUNT_DELETION_MAX_ATTEMPTS: int = 5
+    ACCOUNT_DELETION_SWEEP_INTERVAL_SECONDS: int = 300
+
+    # WebSocket 연결 관리 (Heartbeat & 제한)
+    WS_HEARTBEAT_INTERVAL_SECONDS: int = 25   # 서버 -> 클라이언트 ping 주기
+    WS_IDLE_TIMEOUT_SECONDS: int = 75         # 이 시간 동안 수신이 없으면 연결 정리
+    WS_MAX_CONNECTIONS_PER_USER: int = 8      # 유저당 최대 동시 소켓 수
+    WS_MAX_CONNECTIONS: int = 10000           # 프로세스당 최대 동시 소켓 수
+
     # Template Paths (User constraint)
     CHIRPY_TEMPLATE_PATH: str = "./templates/eggit_blog_theme"
     DOCS_TEMPLATE_PATH: str = "./templates/eggit_docs_theme"
+    # 템플릿 오브젝트 저장소 (테마를 한 번만 해시해 두는 로컬 bare 저장소, 워커 간 공유 가능)
+    TEMPLATE_STORE_DIR: str = "/tmp/eggit_template_store"
+    TEMPLATE_STORE_GC_INTERVAL_SECONDS: int = 6 * 3600   # update 배포가 받아온 유저 저장소 오브젝트 정리 주기
+    TEMPLATE_STORE_GC_PRUNE: str = "1.hour.ago"          # 이보다 최근 오브젝트는 진행 중인 배포가 쓸 수 있어 유지
+    # 배포 백엔드: "git" (로컬 오브젝트 저장소 + push) / "api" (Git Data API, git 바이너리 불필요)
+    DEPLOY_BACKEND: str = "git"
+    DEPLOY_API_CONCURRENCY: int = 8                   # Git Data API blob 동시 업로드 수
+    GITHUB_API_URL: str = "https://api.github.com"    # 테스트 시 로컬 가짜 API 서버로 교체
+    # 배포/포스팅 조율 (저장소별 락, 중복 제출 제거)
+    DEPLOY_REPO_LOCK_SECONDS: int = 900               # 저장소별 락 최대 유지 시간 (워커 비정상 종료 대비)
+    DEPLOY_LOCK_WAIT_SECONDS: int = 5                 # 락 대기 후에도 못 잡으면 retry로 미룸
+    DEPLOY_LOCK_RETRY_SECONDS: int = 15
+    DEPLOY_IDEMPOTENCY_TTL_SECONDS: int = 600         # 같은 요청 재제출을 기존 작업으로 합치는 시간
+    DEPLOY_RENDER_CACHE_SIZE: int = 512               # 렌더링된 _config.yml/SCSS 캐시 항목 수 (워커 프로세스별 LRU)
+    # 테마 variant별 렌더링 결과 (디스크, 내용 주소 + LRU 삭제)
+    DEPLOY_ARTIFACT_CACHE_DIR: str = "/tmp/eggit_artifacts"
+    DEPLOY_ARTIFACT_CACHE_QUOTA_MB: int = 256
+    # 배포 단계별 소요 시간 (Redis 누적 → /metrics, 관리자 API p50/p95)
+    DEPLOY_TIMING_RECENT: int = 500                   # 단계별 p50/p95 계산에 쓰는 최근 기록 수
+    OTEL_EXPORTER_OTLP_ENDPOINT: Optional[str] = None # 예: http://localhost:4318 (설정 시 OpenTelemetry 트레이스 전송)
+    OTEL_SERVICE_NAME: str = "eggit-backend"
+    # 관리자 API 접근 허용 GitHub 계정
+    ADMIN_USERNAMES: List[str] = []
+
+    # 블로그 이미지 업로드 (리사이즈/WebP/LQIP, 내용 해시 중복 제거)
+    BLOG_IMAGE_DIR: str = "assets/img/posts"
+    BLOG_IMAGE_WIDTHS: List[int] = [480, 960, 1600]   # 반응형 WebP 너비 (최댓값 = 원본 보관 최대 너비)
+    BLOG_IMAGE_WEBP_QUALITY: int = 80
+    BLOG_IMAGE_LQIP_WIDTH: int = 24
+    BLOG_IMAGE_WORKERS: int = 2                       # 이미지 처리 전용 스레드 수
+    BLOG_IMAGE_DEDUP_TTL_SECONDS: int = 60 * 60 * 24 * 30
+
+    # GitHub 쓰기 전용 스레드풀 (async 라우트에서 이벤트 루프를 막지 않도록)
+    GITHUB_IO_THREADS: int = 16
+
+    # 이벤트 루프 지연 감시 (기준 이상 막히면 막고 있는 호출 스택을 로그로 남김)
+    LOOP_LAG_MONITOR_ENABLED: bool = True
+    LOOP_LAG_THRESHOLD_MS: int = 200
+    LOOP_LAG_INTERVAL_MS: int = 100
+
+    # 포스팅 업로드용 저장소 메타데이터 캐시 (login/브랜치/파일 SHA, 쓰기 충돌 시 무효화)
+    REPO_META_TTL_SECONDS: int = 60 * 60
     
     OPENAI_API_KEY: str
     OPENAI_API_BASE: str = "https://api.openai.com/v1"
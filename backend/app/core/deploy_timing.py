@@ -0,0 +1,203 @@
+"""
+배포 파이프라인 단계별 소요 시간 (span)
+
+- span("avatar") 처럼 단계를 감싸면 소요 시간을 기록
+  - Redis에 누적 (API/워커 프로세스 공용, 워커는 prefork라 프로세스별 메모리로는 모을 수 없음)
+    - 히스토그램 버킷 카운터: eggit:deploytiming:hist:{단계} → /metrics 에서 Prometheus 히스토그램으로 노출
+    - 최근 값 목록: eggit:deploytiming:recent:{단계} (DEPLOY_TIMING_RECENT개) → 관리자 API의 p50/p95
+  - OTEL_EXPORTER_OTLP_ENDPOINT가 있고 opentelemetry 패키지가 설치되어 있으면 같은 span을 트레이스로도 전송
+- deploy_trace(...): 배포 1건 안의 span을 모아 종료 시 구조화 로그 1줄로 출력
+- Redis 장애 시 기록은 건너뜀 (배포에는 영향 없음)
+"""
+import contextvars
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+KEY_PREFIX = "eggit:deploytiming"
+STAGES_KEY = f"{KEY_PREFIX}:stages"
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+_redis_client = None
+_tracer = None
+_tracer_ready = False
+_tracer_lock = threading.Lock()
+_current_trace: contextvars.ContextVar[Optional[List[Tuple[str, float, bool]]]] = contextvars.ContextVar(
+    "deploy_trace", default=None
+)
+
+
+def _get_redis():
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True, socket_timeout=0.5)
+    return _redis_client
+
+
+def _get_tracer():
+    """OTLP 수집기가 설정된 경우에만 (패키지가 없으면 경고 후 비활성)"""
+    global _tracer, _tracer_ready
+    if _tracer_ready:
+        return _tracer
+    with _tracer_lock:
+        if not _tracer_ready:
+            if settings.OTEL_EXPORTER_OTLP_ENDPOINT:
+                try:
+                    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+                    from opentelemetry.sdk.resources import Resource
+                    from opentelemetry.sdk.trace import TracerProvider
+                    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+                    provider = TracerProvider(resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME}))
+                    provider.add_span_processor(BatchSpanProcessor(
+                        OTLPSpanExporter(endpoint=f"{settings.OTEL_EXPORTER_OTLP_ENDPOINT.rstrip('/')}/v1/traces")
+                    ))
+                    _tracer = provider.get_tracer("eggit.deploy")
+                except ImportError:
+                    print("⚠️ [DeployTiming] opentelemetry-sdk / exporter-otlp not installed. Tracing disabled.")
+            _tracer_ready = True
+    return _tracer
+
+
+def record(stage: str, seconds: float, ok: bool = True):
+    try:
+        pipe = _get_redis().pipeline(transaction=False)
+        hist_key = f"{KEY_PREFIX}:hist:{stage}"
+        for bound in BUCKETS:
+            if seconds <= bound:
+                pipe.hincrby(hist_key, f"le:{bound}", 1)
+        pipe.hincrby(hist_key, "count", 1)
+        pipe.hincrbyfloat(hist_key, "sum", seconds)
+        if not ok:
+            pipe.hincrby(hist_key, "errors", 1)
+        recent_key = f"{KEY_PREFIX}:recent:{stage}"
+        pipe.lpush(recent_key, round(seconds * 1000, 1))
+        pipe.ltrim(recent_key, 0, settings.DEPLOY_TIMING_RECENT - 1)
+        pipe.sadd(STAGES_KEY, stage)
+        pipe.execute()
+    except Exception:
+        pass
+
+
+@contextmanager
+def span(stage: str, **attributes) -> Iterator[None]:
+    """단계 소요 시간 기록 (예외가 나도 기록하고 그대로 다시 발생)"""
+    tracer = _get_tracer()
+    otel_span = tracer.start_as_current_span(stage, attributes=attributes) if tracer else None
+    if otel_span is not None:
+        otel_span.__enter__()
+    started = time.perf_counter()
+    exc_info = (None, None, None)
+    try:
+        yield
+    except BaseException as e:
+        exc_info = (type(e), e, e.__traceback__)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        ok = exc_info[0] is None
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.append((stage, elapsed, ok))
+        record(stage, elapsed, ok)
+        if otel_span is not None:
+            otel_span.__exit__(*exc_info)
+
+
+@contextmanager
+def deploy_trace(kind: str, repo: str) -> Iterator[None]:
+    """배포 1건 전체 span + 종료 시 단계별 소요 시간 구조화 로그"""
+    stages: List[Tuple[str, float, bool]] = []
+    token = _current_trace.set(stages)
+    started = time.perf_counter()
+    ok = True
+    try:
+        with span(f"deploy.{kind}", repo=repo):
+            yield
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        _current_trace.reset(token)
+        # 같은 단계(예: github_api.GET 여러 번)는 횟수/합계로 묶음 (처음 나온 순서 유지)
+        merged: Dict[str, Dict[str, float]] = {}
+        for stage, elapsed, stage_ok in stages:
+            entry = merged.setdefault(stage, {"ms": 0.0, "count": 0, "errors": 0})
+            entry["ms"] = round(entry["ms"] + elapsed * 1000, 1)
+            entry["count"] += 1
+            entry["errors"] += 0 if stage_ok else 1
+        print("[DeployTiming] " + json.dumps({
+            "kind": kind,
+            "repo": repo,
+            "ok": ok,
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+            "stages": merged,
+        }, ensure_ascii=False))
+
+
+# =========================================================
+# 조회 (관리자 API, /metrics)
+# =========================================================
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summary() -> Dict[str, Dict[str, float]]:
+    """단계별 최근 DEPLOY_TIMING_RECENT회의 p50/p95/max (ms) + 누적 횟수/실패 수"""
+    redis_client = _get_redis()
+    stages = sorted(redis_client.smembers(STAGES_KEY))
+    pipe = redis_client.pipeline(transaction=False)
+    for stage in stages:
+        pipe.lrange(f"{KEY_PREFIX}:recent:{stage}", 0, -1)
+        pipe.hmget(f"{KEY_PREFIX}:hist:{stage}", "count", "errors")
+    results = pipe.execute()
+
+    report = {}
+    for i, stage in enumerate(stages):
+        values = sorted(float(v) for v in results[i * 2])
+        count, errors = results[i * 2 + 1]
+        if not values:
+            continue
+        report[stage] = {
+            "samples": len(values),
+            "p50_ms": _percentile(values, 0.5),
+            "p95_ms": _percentile(values, 0.95),
+            "max_ms": values[-1],
+            "total_count": int(count or 0),
+            "errors": int(errors or 0),
+        }
+    return report
+
+
+class RedisHistogramCollector:
+    """prometheus_client용 collector (Redis에 누적된 버킷을 히스토그램으로 노출)"""
+
+    def collect(self):
+        from prometheus_client.core import CounterMetricFamily, HistogramMetricFamily
+
+        histogram = HistogramMetricFamily(
+            "eggit_deploy_stage_seconds", "Deploy pipeline stage duration", labels=["stage"]
+        )
+        errors = CounterMetricFamily("eggit_deploy_stage_errors", "Deploy pipeline stage failures", labels=["stage"])
+        try:
+            redis_client = _get_redis()
+            stages = sorted(redis_client.smembers(STAGES_KEY))
+            pipe = redis_client.pipeline(transaction=False)
+            for stage in stages:
+                pipe.hgetall(f"{KEY_PREFIX}:hist:{stage}")
+            for stage, data in zip(stages, pipe.execute()):
+                buckets = [(str(bound), int(data.get(f"le:{bound}", 0))) for bound in BUCKETS]
+                buckets.append(("+Inf", int(data.get("count", 0))))
+                histogram.add_metric([stage], buckets, float(data.get("sum", 0)))
+                errors.add_metric([stage], int(data.get("errors", 0)))
+        except Exception as e:
+            print(f"⚠️ [DeployTiming] metrics collect failed: {e}")
+        yield histogram
+        yield errors
@@ -0,0 +1,76 @@
+"""
+이벤트 루프 지연(lag) 감시
+
+async 라우트 안의 동기 호출(PyGithub, requests, 무거운 CPU 작업 등)은 이벤트 루프 전체를 멈춥니다.
+
+- heartbeat 코루틴: LOOP_LAG_INTERVAL_MS마다 깨어나 예정 시각과 실제 시각의 차이(lag)를 측정
+- watchdog 스레드: heartbeat가 LOOP_LAG_THRESHOLD_MS 이상 늦어지면 그 순간 루프 스레드의 스택을 기록
+  → 루프를 막고 있는 콜백(파일/줄 번호)을 바로 확인 가능 (asyncio debug 모드 없이)
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from app.core.config import settings
+
+_STACK_LIMIT = 12
+
+
+class LoopLagMonitor:
+    def __init__(self, threshold_ms: Optional[int] = None, interval_ms: Optional[int] = None):
+        self.threshold = (threshold_ms or settings.LOOP_LAG_THRESHOLD_MS) / 1000
+        self.interval = (interval_ms or settings.LOOP_LAG_INTERVAL_MS) / 1000
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    async def run(self):
+        """lifespan에서 create_task로 실행 (취소되면 watchdog도 종료)"""
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+        try:
+            while True:
+                expected = time.monotonic() + self.interval
+                await asyncio.sleep(self.interval)
+                now = time.monotonic()
+                lag = now - expected
+                self._last_beat = now
+                if lag > self.max_lag:
+                    self.max_lag = lag
+                if lag >= self.threshold:
+                    self.stalls += 1
+                    print(f"⚠️ [LoopMonitor] Event loop lag {lag * 1000:.0f}ms (threshold {self.threshold * 1000:.0f}ms)")
+        finally:
+            self._stop.set()
+
+    def _watch(self):
+        """heartbeat가 멈춘 동안 루프 스레드 스택을 한 번 기록 (같은 정지 구간은 중복 기록하지 않음)"""
+        reported_beat = None
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._last_beat
+            if beat == reported_beat or time.monotonic() - beat < self.threshold + self.interval:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            reported_beat = beat
+            stack = "".join(traceback.format_stack(frame, limit=_STACK_LIMIT))
+            print(f"⚠️ [LoopMonitor] Event loop blocked for >{(time.monotonic() - beat) * 1000:.0f}ms. Blocking call stack:\n{stack}")
+
+    def snapshot(self) -> dict:
+        return {
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "stalls": self.stalls,
+            "threshold_ms": round(self.threshold * 1000),
+        }
+
+
+monitor = LoopLagMonitor()
@@ -1,6 +1,8 @@
+import time
 from datetime import datetime, timedelta, timezone
 from jose import jwt
 from app.core.config import settings
+from app.utils.ttl_cache import TTLCache
 from cryptography.fernet import Fernet
 
 # 설정 파일에서 키를 가져와 Fernet 객체 생성 (이게 '자물쇠'이자 '열쇠'입니다) (암호화 객체)
@@ -10,17 +12,31 @@ fernet = Fernet(settings.ENCRYPTION_KEY)
 # 1. 브라우저 제공용 (JWT) 
 # ==========================================
 
+# 검증에 성공한 토큰의 payload를 만료 시각까지 재사용 (매 요청 HMAC 검증 생략)
+_verified_tokens = TTLCache(settings.JWT_CACHE_MAX_SIZE, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
 # JWT 토큰 생성
-def create_access_token(subject: str | int) -> str:
+# ver: 유저의 token_version (버전을 올리면 이전에 발급된 토큰은 모두 무효)
+def create_access_token(subject: str | int, token_version: int = 0) -> str:
     from app.utils.datetime_utils import now_utc
     expire = now_utc() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {"exp": expire, "sub": str(subject), "ver": token_version}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-# 브라우저 JWT 검증
+# 브라우저 JWT 검증 (실패 시 JWTError)
 def decode_token(token: str):
-    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    payload = _verified_tokens.get(token)
+    if payload is not None:
+        return payload
+
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        remaining = exp - time.time()
+        if remaining > 0:
+            _verified_tokens.set(token, payload, ttl=remaining)
+    return payload
 
 # ==========================================
 # 2. DB 저장용 (GitHub Token) - Fernet 암호화 O
@@ -1,18 +1,71 @@
-from typing import List, Dict, Set
+import asyncio
+import json
+import os
+import resource
+import time
+from typing import List, Dict, Set, Optional
 from fastapi import WebSocket
 from collections import defaultdict
 
+from app.core.config import settings
+from app.core import wire_format
+from app.core.wire_format import ENCODING_JSON, FrameCache
+
+# Heartbeat 프레임 (서버 ping -> 클라이언트 pong)
+PING_FRAME = json.dumps({"type": "ping"})
+PONG_FRAME = json.dumps({"type": "pong"})
+# 인코딩별 ping 프레임 (매 sweep마다 직렬화하지 않도록 미리 생성)
+PING_FRAMES = {
+    encoding: wire_format.encode({"type": "ping"}, encoding)
+    for encoding in wire_format.SUPPORTED_ENCODINGS
+}
+
+# 연결 수 제한 초과 시 close code (Try Again Later)
+CLOSE_CODE_TRY_AGAIN_LATER = 1013
+# 유휴/무응답 연결 정리 시 close code (Going Away)
+CLOSE_CODE_GOING_AWAY = 1001
+
+# Celery 워커 -> API 프로세스 작업 상태 이벤트 채널 (Redis Pub/Sub)
+TASK_EVENTS_CHANNEL = "eggit:task_events"
+
+# 멀티플렉스 소켓이 구독할 수 있는 채널
+CHANNEL_PRESENCE = "presence"
+CHANNEL_NOTIFICATIONS = "notifications"
+
+
+def _current_rss_bytes() -> int:
+    """현재 프로세스 RSS(byte) 조회 (/proc 미지원 환경에서는 최대 RSS로 대체)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
 
 class ConnectionManager:
     def __init__(self):
         # 방(room) 별로 연결된 웹소켓들을 관리
         # Key: room_id (str), Value: List of (user_id, websocket) tuples
         self.rooms: Dict[str, List[tuple]] = defaultdict(list)
-        
+
         # 사용자별 활성 연결 추적 (온라인 상태 확인용)
         # Key: user_id (int), Value: Set of WebSocket connections
         self.user_connections: Dict[int, Set[WebSocket]] = defaultdict(set)
 
+        # 소켓별 메타데이터 (Heartbeat & 정리 & 구독 관리용)
+        # Key: WebSocket, Value: {"user_id", "rooms", "channels", "multiplexed", "encoding", "connected_at", "last_seen"}
+        self.connection_meta: Dict[WebSocket, dict] = {}
+
+        # 작업(Celery task) 상태 구독자
+        # Key: task_id (str), Value: Set of WebSocket connections
+        self.task_subscribers: Dict[str, Set[WebSocket]] = defaultdict(set)
+
+        self.reaped_count = 0
+        self.rejected_count = 0
+
+        # 소켓이 없을 때의 RSS (연결당 메모리 = 증가분 / 소켓 수), 서버 시작 시 mark_baseline_rss로 다시 기록
+        self.baseline_rss = _current_rss_bytes()
+
     def get_room_id(self, user_id: int, friend_id: int) -> str:
         """두 유저 간의 고유한 room_id 생성 (항상 같은 ID가 되도록 정렬)"""
         ids = sorted([user_id, friend_id])
@@ -20,21 +73,46 @@ class ConnectionManager:
 
     async def connect(self, websocket: WebSocket, user_id: int, friend_id: int):
         await websocket.accept()
+        self.join_room(websocket, user_id, friend_id)
+
+    def join_room(self, websocket: WebSocket, user_id: int, friend_id: int):
+        """이미 accept된 소켓을 채팅방에 입장시킴"""
         room_id = self.get_room_id(user_id, friend_id)
+        meta = self.connection_meta.get(websocket)
+        if meta is not None:
+            if room_id in meta["rooms"]:
+                return
+            meta["rooms"].add(room_id)
         self.rooms[room_id].append((user_id, websocket))
         print(f"User {user_id} joined room {room_id}. Room size: {len(self.rooms[room_id])}")
 
-    def disconnect(self, user_id: int, friend_id: int):
+    def disconnect(self, user_id: int, friend_id: int, websocket: Optional[WebSocket] = None):
         room_id = self.get_room_id(user_id, friend_id)
-        # 해당 user_id의 연결을 찾아서 제거
+        self._leave_room(room_id, user_id, websocket)
+
+    def _leave_room(self, room_id: str, user_id: int, websocket: Optional[WebSocket] = None):
+        if websocket is not None and websocket in self.connection_meta:
+            self.connection_meta[websocket]["rooms"].discard(room_id)
+        if room_id not in self.rooms:
+            return
+        # 소켓이 주어지면 해당 소켓만, 아니면 해당 user_id의 연결 모두 제거
         self.rooms[room_id] = [
-            (uid, ws) for uid, ws in self.rooms[room_id] if uid != user_id
+            (uid, ws) for uid, ws in self.rooms[room_id]
+            if not (uid == user_id and (websocket is None or ws is websocket))
         ]
         print(f"User {user_id} left room {room_id}. Room size: {len(self.rooms[room_id])}")
         # 방이 비었으면 삭제
         if not self.rooms[room_id]:
             del self.rooms[room_id]
 
+    def leave_all_rooms(self, websocket: WebSocket):
+        """소켓이 입장한 모든 채팅방에서 퇴장 (멀티플렉스 소켓 정리용)"""
+        meta = self.connection_meta.get(websocket)
+        if not meta:
+            return
+        for room_id in list(meta["rooms"]):
+            self._leave_room(room_id, meta["user_id"], websocket)
+
     async def send_to_room(self, message: str, user_id: int, friend_id: int):
         """같은 방에 있는 모든 사람에게 메시지 전송 (자신 포함)"""
         room_id = self.get_room_id(user_id, friend_id)
@@ -43,30 +121,330 @@ class ConnectionManager:
                 await websocket.send_text(message)
             except Exception as e:
                 print(f"Error sending message to user {uid}: {e}")
-    
+
     # === 온라인 상태 추적 메서드 ===
-    
-    def add_user_connection(self, user_id: int, websocket: WebSocket):
-        """사용자의 WebSocket 연결 추가 (온라인 상태 추적)"""
+
+    def add_user_connection(
+        self,
+        user_id: int,
+        websocket: WebSocket,
+        multiplexed: bool = False,
+        encoding: str = ENCODING_JSON,
+    ) -> bool:
+        """
+        사용자의 WebSocket 연결 추가 (온라인 상태 추적)
+        - 유저당/프로세스당 연결 수 제한을 넘으면 등록하지 않고 False 반환
+        - multiplexed: 채팅/프레즌스/알림을 한 소켓에서 처리하는 멀티플렉스 연결 여부
+        - encoding: 연결 시 협상한 프레임 인코딩 (json / compact / msgpack)
+        """
+        if websocket in self.connection_meta:
+            return True
+        if len(self.connection_meta) >= settings.WS_MAX_CONNECTIONS:
+            self.rejected_count += 1
+            print(f"User {user_id} rejected: process connection limit ({settings.WS_MAX_CONNECTIONS}) reached")
+            return False
+        if len(self.user_connections.get(user_id, ())) >= settings.WS_MAX_CONNECTIONS_PER_USER:
+            self.rejected_count += 1
+            print(f"User {user_id} rejected: per-user connection limit ({settings.WS_MAX_CONNECTIONS_PER_USER}) reached")
+            return False
+
+        now = time.monotonic()
+        self.connection_meta[websocket] = {
+            "user_id": user_id,
+            "rooms": set(),
+            "channels": set(),
+            "multiplexed": multiplexed,
+            "encoding": wire_format.normalize_encoding(encoding),
+            "connected_at": now,
+            "last_seen": now,
+        }
         self.user_connections[user_id].add(websocket)
         print(f"User {user_id} connected. Total connections: {len(self.user_connections[user_id])}")
-    
+        return True
+
     def remove_user_connection(self, user_id: int, websocket: WebSocket):
         """사용자의 WebSocket 연결 제거"""
+        meta = self.connection_meta.pop(websocket, None)
+        if meta:
+            for task_id in meta.get("task_ids", ()):
+                self._drop_task_subscriber(task_id, websocket)
         if user_id in self.user_connections:
             self.user_connections[user_id].discard(websocket)
             # 연결이 모두 끊기면 사전에서 제거
             if not self.user_connections[user_id]:
                 del self.user_connections[user_id]
             print(f"User {user_id} disconnected. Remaining connections: {len(self.user_connections.get(user_id, []))}")
-    
+
     def is_user_online(self, user_id: int) -> bool:
         """사용자가 온라인 상태인지 확인"""
         return user_id in self.user_connections and len(self.user_connections[user_id]) > 0
-    
+
     def get_online_users(self) -> List[int]:
         """현재 온라인 상태인 모든 사용자 ID 목록 반환"""
         return list(self.user_connections.keys())
 
+    # === 멀티플렉스 구독 & 전송 ===
+
+    def is_multiplexed(self, websocket: WebSocket) -> bool:
+        meta = self.connection_meta.get(websocket)
+        return bool(meta and meta["multiplexed"])
+
+    def subscribe_channel(self, websocket: WebSocket, channel: str):
+        meta = self.connection_meta.get(websocket)
+        if meta:
+            meta["channels"].add(channel)
+
+    def unsubscribe_channel(self, websocket: WebSocket, channel: str):
+        meta = self.connection_meta.get(websocket)
+        if meta:
+            meta["channels"].discard(channel)
+
+    def wants(self, websocket: WebSocket, channel: str) -> bool:
+        """소켓이 해당 채널 이벤트를 받아야 하는지 (레거시 소켓은 모두 수신)"""
+        meta = self.connection_meta.get(websocket)
+        if not meta or not meta["multiplexed"]:
+            return True
+        return channel in meta["channels"]
+
+    def encoding_of(self, websocket: WebSocket) -> str:
+        meta = self.connection_meta.get(websocket)
+        return meta["encoding"] if meta else ENCODING_JSON
+
+    async def _safe_send(self, websocket: WebSocket, message: wire_format.Frame) -> bool:
+        """프레임 전송 (bytes는 바이너리 프레임, str은 텍스트 프레임)"""
+        try:
+            if isinstance(message, bytes):
+                await websocket.send_bytes(message)
+            else:
+                await websocket.send_text(message)
+            return True
+        except Exception as e:
+            print(f"Error sending message: {e}")
+            return False
+
+    async def send_payload(self, websocket: WebSocket, payload: dict) -> bool:
+        """단일 소켓에 해당 소켓의 인코딩으로 payload 전송"""
+        return await self._safe_send(websocket, wire_format.encode(payload, self.encoding_of(websocket)))
+
+    async def send_to_users(self, user_ids, payload: dict, channel: str):
+        """여러 유저의 모든 연결에 채널 이벤트 전송 (인코딩별로 한 번만 직렬화)"""
+        frames = FrameCache({**payload, "channel": channel})
+        for uid in user_ids:
+            for ws in list(self.user_connections.get(uid, ())):
+                if self.wants(ws, channel):
+                    await self._safe_send(ws, frames.get(self.encoding_of(ws)))
+
+    async def deliver_chat_message(self, sender_id: int, receiver_id: int, sender_username: str, payload: dict):
+        """
+        채팅 메시지를 방 참여자에게 전달하고, 방 밖에 있는 수신자의 다른 연결에는 알림 전송
+        - payload: {"id", "text", "timestamp"}
+        - 레거시 채팅 소켓은 기존 형식, 멀티플렉스 소켓은 type/friend_id 포함 형식으로 전송
+        """
+        room_id = self.get_room_id(sender_id, receiver_id)
+        sent_to_ws = set()  # 중복 전송 방지
+        # (보낸 사람 여부, 멀티플렉스 여부) 별 프레임 캐시
+        variants: Dict[tuple, FrameCache] = {}
+
+        for uid, ws in list(self.rooms.get(room_id, [])):
+            is_sender = uid == sender_id
+            multiplexed = self.is_multiplexed(ws)
+            frames = variants.get((is_sender, multiplexed))
+            if frames is None:
+                body = {**payload, "sender": "me" if is_sender else sender_username}
+                if multiplexed:
+                    body = {
+                        "type": "chat.message",
+                        "friend_id": receiver_id if is_sender else sender_id,
+                        **body,
+                    }
+                frames = variants[(is_sender, multiplexed)] = FrameCache(body)
+            if await self._safe_send(ws, frames.get(self.encoding_of(ws))):
+                sent_to_ws.add(ws)
+
+        # 상대방의 다른 모든 연결(Presence 등)에게도 글로벌 알림 전송 (배경 알림용)
+        if self.is_user_online(receiver_id):
+            from app.utils.datetime_utils import now_utc, to_iso8601
+            global_notification = FrameCache({
+                "type": "new_message",
+                "channel": CHANNEL_NOTIFICATIONS,
+                "sender_id": sender_id,
+                "sender_username": sender_username,
+                "text": payload["text"],  # 원본 메시지
+                "timestamp": to_iso8601(now_utc())
+            })
+            for friend_ws in list(self.user_connections.get(receiver_id, set())):
+                if friend_ws not in sent_to_ws and self.wants(friend_ws, CHANNEL_NOTIFICATIONS):
+                    await self._safe_send(friend_ws, global_notification.get(self.encoding_of(friend_ws)))
+
+    # === 작업(Task) 이벤트 ===
+
+    def subscribe_task(self, websocket: WebSocket, task_id: str):
+        meta = self.connection_meta.get(websocket)
+        if not meta:
+            return
+        meta.setdefault("task_ids", set()).add(task_id)
+        self.task_subscribers[task_id].add(websocket)
+
+    def _drop_task_subscriber(self, task_id: str, websocket: WebSocket):
+        subscribers = self.task_subscribers.get(task_id)
+        if subscribers is None:
+            return
+        subscribers.discard(websocket)
+        if not subscribers:
+            del self.task_subscribers[task_id]
+
+    def unsubscribe_task(self, websocket: WebSocket, task_id: str):
+        meta = self.connection_meta.get(websocket)
+        if meta:
+            meta.get("task_ids", set()).discard(task_id)
+        self._drop_task_subscriber(task_id, websocket)
+
+    async def publish_task_event(self, event: dict):
+        """작업 상태 이벤트를 구독 중인 소켓에 전달 (완료 상태면 구독 해제)"""
+        task_id = event.get("task_id")
+        subscribers = self.task_subscribers.get(task_id)
+        if not subscribers:
+            return
+        frames = FrameCache({"type": "task.status", "channel": "tasks", **event})
+        for ws in list(subscribers):
+            await self._safe_send(ws, frames.get(self.encoding_of(ws)))
+        if event.get("status") in ("SUCCESS", "FAILURE", "REVOKED"):
+            for ws in list(subscribers):
+                self.unsubscribe_task(ws, task_id)
+
+    async def task_event_listener(self):
+        """
+        Redis Pub/Sub으로 워커의 작업 상태 이벤트를 받아 구독 소켓에 전달 (lifespan에서 시작)
+        - Redis 연결이 끊기면 잠시 후 재연결
+        """
+        import redis.asyncio as redis
+
+        while True:
+            client = None
+            try:
+                client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+                pubsub = client.pubsub()
+                await pubsub.subscribe(TASK_EVENTS_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        await self.publish_task_event(json.loads(message["data"]))
+                    except ValueError:
+                        continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[TaskEvents] Listener error: {e}. Reconnecting in 5s...")
+                await asyncio.sleep(5)
+            finally:
+                if client is not None:
+                    try:
+                        await client.aclose()
+                    except Exception:
+                        pass
+
+    # === Heartbeat & 유휴 연결 정리 ===
+
+    def touch(self, websocket: WebSocket):
+        """클라이언트로부터 프레임을 받을 때마다 호출 (마지막 수신 시각 갱신)"""
+        meta = self.connection_meta.get(websocket)
+        if meta:
+            meta["last_seen"] = time.monotonic()
+
+    @staticmethod
+    def is_heartbeat_frame(data: str) -> bool:
+        """클라이언트가 보낸 pong(또는 ping) 프레임인지 확인 (compact 인코딩의 "t" 키 포함)"""
+        if len(data) > 32 or not data.startswith("{"):
+            return False
+        try:
+            frame = json.loads(data)
+            return (frame.get("type") or frame.get("t")) in ("pong", "ping")
+        except (ValueError, AttributeError):
+            return False
+
+    async def _evict(self, websocket: WebSocket, reason: str):
+        """유휴/무응답 소켓을 추적 목록에서 제거하고 닫음"""
+        meta = self.connection_meta.get(websocket)
+        if not meta:
+            return
+        user_id = meta["user_id"]
+        self.leave_all_rooms(websocket)
+        self.remove_user_connection(user_id, websocket)
+        self.reaped_count += 1
+        print(f"User {user_id} socket reaped ({reason})")
+        try:
+            await asyncio.wait_for(websocket.close(code=CLOSE_CODE_GOING_AWAY), timeout=5)
+        except Exception:
+            pass
+
+    async def _ping(self, websocket: WebSocket):
+        try:
+            frame = PING_FRAMES[self.encoding_of(websocket)]
+            if isinstance(frame, bytes):
+                await asyncio.wait_for(websocket.send_bytes(frame), timeout=5)
+            else:
+                await asyncio.wait_for(websocket.send_text(frame), timeout=5)
+        except Exception:
+            await self._evict(websocket, "ping failed")
+
+    async def sweep(self):
+        """유휴 소켓 정리 + 살아있는 소켓에 ping 전송 (1회)"""
+        now = time.monotonic()
+        idle_timeout = settings.WS_IDLE_TIMEOUT_SECONDS
+        stale, alive = [], []
+        for ws, meta in list(self.connection_meta.items()):
+            if now - meta["last_seen"] > idle_timeout:
+                stale.append(ws)
+            else:
+                alive.append(ws)
+
+        for ws in stale:
+            await self._evict(ws, "idle timeout")
+        if alive:
+            await asyncio.gather(*(self._ping(ws) for ws in alive))
+
+    async def heartbeat_loop(self):
+        """서버 수명 동안 주기적으로 sweep 실행 (lifespan에서 시작)"""
+        while True:
+            await asyncio.sleep(settings.WS_HEARTBEAT_INTERVAL_SECONDS)
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"[Heartbeat] Sweep failed: {e}")
+
+    def mark_baseline_rss(self):
+        """서버 시작 직후(앱/DB 초기화 후, 소켓 연결 전) RSS를 기준값으로 기록"""
+        self.baseline_rss = _current_rss_bytes()
+
+    def get_stats(self) -> dict:
+        """실시간 연결 통계 (소켓 수, 방 수, 연결당 메모리)"""
+        total = len(self.connection_meta)
+        rss = _current_rss_bytes()
+        return {
+            "connections": total,
+            "online_users": len(self.user_connections),
+            "rooms": len(self.rooms),
+            "room_members": sum(len(members) for members in self.rooms.values()),
+            "multiplexed_connections": sum(1 for meta in self.connection_meta.values() if meta["multiplexed"]),
+            "connections_by_encoding": {
+                encoding: sum(1 for meta in self.connection_meta.values() if meta["encoding"] == encoding)
+                for encoding in wire_format.SUPPORTED_ENCODINGS
+            },
+            "task_subscriptions": len(self.task_subscribers),
+            "reaped_total": self.reaped_count,
+            "rejected_total": self.rejected_count,
+            "rss_bytes": rss,
+            "baseline_rss_bytes": self.baseline_rss,
+            # 시작 시점 대비 RSS 증가분 / 소켓 수 (소켓 외 캐시 등의 증가분도 포함되는 근사치)
+            "rss_bytes_per_connection": max(rss - self.baseline_rss, 0) // total if total else None,
+            "limits": {
+                "max_connections": settings.WS_MAX_CONNECTIONS,
+                "max_connections_per_user": settings.WS_MAX_CONNECTIONS_PER_USER,
+                "heartbeat_interval_seconds": settings.WS_HEARTBEAT_INTERVAL_SECONDS,
+                "idle_timeout_seconds": settings.WS_IDLE_TIMEOUT_SECONDS,
+            },
+        }
+
 
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager()
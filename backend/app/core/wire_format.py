@@ -0,0 +1,106 @@
+"""
+실시간(WebSocket) 프레임 인코딩
+
+- json    : 기존과 동일한 JSON 텍스트 프레임 (기본값)
+- compact : 자주 반복되는 키를 짧은 키로 치환한 JSON 텍스트 프레임
+- msgpack : 짧은 키 + MessagePack 바이너리 프레임
+
+모든 인코딩은 orjson/ormsgpack으로 직렬화하며, 브로드캐스트 시에는
+인코딩별로 한 번만 직렬화한 결과를 모든 수신자에게 재사용합니다.
+"""
+from typing import Any, Dict, Union
+
+import orjson
+import ormsgpack
+
+ENCODING_JSON = "json"
+ENCODING_COMPACT = "compact"
+ENCODING_MSGPACK = "msgpack"
+SUPPORTED_ENCODINGS = (ENCODING_JSON, ENCODING_COMPACT, ENCODING_MSGPACK)
+
+# 긴 키 -> 짧은 키 (프레임 최상위 키에만 적용)
+SHORT_KEYS: Dict[str, str] = {
+    "type": "t",
+    "channel": "c",
+    "id": "i",
+    "text": "x",
+    "sender": "s",
+    "timestamp": "ts",
+    "user_id": "u",
+    "friend_id": "f",
+    "sender_id": "si",
+    "sender_username": "su",
+    "online_friends": "of",
+    "reader_id": "r",
+    "last_read_message_id": "lr",
+    "task_id": "k",
+    "status": "st",
+    "message": "m",
+    "ref": "rf",
+    "username": "un",
+}
+LONG_KEYS: Dict[str, str] = {short: long for long, short in SHORT_KEYS.items()}
+
+Frame = Union[str, bytes]
+
+
+def normalize_encoding(encoding: str = None) -> str:
+    """클라이언트가 요청한 인코딩 검증 (지원하지 않으면 json)"""
+    if encoding and encoding.lower() in SUPPORTED_ENCODINGS:
+        return encoding.lower()
+    return ENCODING_JSON
+
+
+def _shorten(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {SHORT_KEYS.get(key, key): value for key, value in payload.items()}
+
+
+def _expand(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {LONG_KEYS.get(key, key): value for key, value in payload.items()}
+
+
+def encode(payload: Dict[str, Any], encoding: str = ENCODING_JSON) -> Frame:
+    """
+    payload를 전송 프레임으로 직렬화
+    - json/compact: str (텍스트 프레임)
+    - msgpack: bytes (바이너리 프레임)
+    """
+    if encoding == ENCODING_MSGPACK:
+        return ormsgpack.packb(_shorten(payload))
+    if encoding == ENCODING_COMPACT:
+        return orjson.dumps(_shorten(payload)).decode()
+    return orjson.dumps(payload).decode()
+
+
+def decode(data: Frame, encoding: str = ENCODING_JSON) -> Any:
+    """
+    클라이언트 프레임을 dict로 역직렬화 (짧은 키는 긴 키로 복원)
+    - 바이너리 프레임은 msgpack, 텍스트 프레임은 JSON으로 해석
+    - 형식이 잘못되면 ValueError
+    """
+    if isinstance(data, (bytes, bytearray)):
+        try:
+            frame = ormsgpack.unpackb(data)
+        except ormsgpack.MsgpackDecodeError as e:
+            raise ValueError(str(e)) from e
+    else:
+        frame = orjson.loads(data)
+
+    if isinstance(frame, dict) and encoding != ENCODING_JSON:
+        return _expand(frame)
+    return frame
+
+
+class FrameCache:
+    """하나의 payload를 인코딩별로 한 번만 직렬화하기 위한 캐시 (브로드캐스트 1회 범위)"""
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.payload = payload
+        self._frames: Dict[str, Frame] = {}
+
+    def get(self, encoding: str) -> Frame:
+        frame = self._frames.get(encoding)
+        if frame is None:
+            frame = encode(self.payload, encoding)
+            self._frames[encoding] = frame
+        return frame
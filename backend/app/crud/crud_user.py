@@ -1,13 +1,17 @@
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.core.security import encrypt_token # <--- 방금 만든 함수 import
+from app.core import auth_cache
 from app.schemas.user import UserCreate
 from datetime import datetime, timedelta, timezone
 
 def get_by_github_id(db: Session, github_id: int):
     return db.query(User).filter(User.github_id == github_id).first()
 
-def create_or_update_user(db: Session, github_user: dict, tokens: dict):
+def _apply_github_profile(user: User, github_user: dict, tokens: dict) -> User:
+    """GitHub 프로필/토큰을 User에 반영 (user가 None이면 신규 생성)"""
     from app.utils.datetime_utils import now_utc
     # 1. 토큰 만료 시간 계산
     expires_in = tokens.get("expires_in") # 보통 초 단위
@@ -15,16 +19,13 @@ def create_or_update_user(db: Session, github_user: dict, tokens: dict):
     if expires_in:
         expires_at = now_utc() + timedelta(seconds=expires_in)
 
-    # 2. 이미 존재하는 유저인지 확인
-    user = get_by_github_id(db, github_id=github_user["id"])
-
     # [핵심] 저장하기 전에 암호화 수행!
     # DB에는 'gAAAAAB...' 처럼 알아볼 수 없는 문자가 저장됩니다.
     encrypted_access_token = encrypt_token(tokens["access_token"])
     encrypted_refresh_token = encrypt_token(tokens.get("refresh_token"))
     
     if user:
-        # 3-A. 존재하면 정보 업데이트 (프로필 변경, 새 토큰 저장)
+        # 존재하면 정보 업데이트 (프로필 변경, 새 토큰 저장)
         user.username = github_user["login"]
         user.email = github_user.get("email")
         user.avatar_url = github_user.get("avatar_url")
@@ -32,20 +33,71 @@ def create_or_update_user(db: Session, github_user: dict, tokens: dict):
         user.github_access_token = encrypted_access_token # 암호화된 값 저장
         user.github_refresh_token = encrypted_refresh_token
         user.github_token_expires_at = expires_at
-    else:
-        # 3-B. 없으면 신규 생성
-        user = User(
-            github_id=github_user["id"],
-            username=github_user["login"],
-            email=github_user.get("email"),
-            avatar_url=github_user["avatar_url"],
-
-            github_access_token=encrypted_access_token, # 암호화된 값 저장
-            github_refresh_token=encrypted_refresh_token,
-            github_token_expires_at=expires_at
-        )
+        return user
+
+    # 없으면 신규 생성
+    return User(
+        github_id=github_user["id"],
+        username=github_user["login"],
+        email=github_user.get("email"),
+        avatar_url=github_user["avatar_url"],
+
+        github_access_token=encrypted_access_token, # 암호화된 값 저장
+        github_refresh_token=encrypted_refresh_token,
+        github_token_expires_at=expires_at
+    )
+
+
+def create_or_update_user(db: Session, github_user: dict, tokens: dict):
+    # 이미 존재하는 유저인지 확인
+    user = get_by_github_id(db, github_id=github_user["id"])
+    is_new = user is None
+
+    user = _apply_github_profile(user, github_user, tokens)
+    if is_new:
         db.add(user)
     
     db.commit()
     db.refresh(user)
-    return user
\ No newline at end of file
+    # 프로필/토큰이 바뀌었으므로 인증 캐시 무효화
+    auth_cache.invalidate_user(user.id)
+    return user
+
+
+async def create_or_update_user_async(db: AsyncSession, github_user: dict, tokens: dict):
+    """
+    create_or_update_user의 비동기 버전 (로그인 엔드포인트용)
+    - 탈퇴 처리 중(비활성) 계정이면 갱신하지 않고 None 반환
+    """
+    user = await db.scalar(select(User).where(User.github_id == github_user["id"]))
+    is_new = user is None
+    if not is_new and user.is_active is False:
+        return None
+
+    user = _apply_github_profile(user, github_user, tokens)
+    if is_new:
+        db.add(user)
+
+    await db.commit()
+    await db.refresh(user)
+    await auth_cache.invalidate_user_async(user.id)
+    return user
+
+
+async def set_tutorial_completed_async(db: AsyncSession, user: User, completed: bool) -> User:
+    """튜토리얼 완료 여부 변경 (인증 캐시에 남은 이전 값 무효화)"""
+    user.tutorial_completed = completed
+    await db.commit()
+    await auth_cache.invalidate_user_async(user.id)
+    return user
+
+
+async def revoke_tokens_async(db: AsyncSession, user_id: int):
+    """
+    token_version을 올려 지금까지 발급된 모든 JWT를 무효화 (모든 기기 로그아웃)
+    """
+    await db.execute(
+        update(User).where(User.id == user_id).values(token_version=User.token_version + 1)
+    )
+    await db.commit()
+    await auth_cache.invalidate_user_async(user_id)
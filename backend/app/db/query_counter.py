@@ -0,0 +1,42 @@
+"""
+SQL 쿼리 카운터 (N+1 검출용)
+
+동기 엔진과 비동기 엔진에서 실행되는 모든 SQL을 세어,
+목록 API의 쿼리 수가 결과 개수에 비례해 늘어나지 않는지 확인할 때 사용합니다.
+
+    with count_queries() as counter:
+        client.get("/api/v1/friends")
+    assert counter.count <= 2, counter.statements
+"""
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy import event
+
+from app.db.session import engine, async_engine
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(*engines) -> Iterator[QueryCounter]:
+    """블록 안에서 실행된 SQL 수집 (엔진 미지정 시 동기/비동기 기본 엔진 모두)"""
+    targets = engines or (engine, async_engine.sync_engine)
+    counter = QueryCounter()
+    for target in targets:
+        event.listen(target, "before_cursor_execute", counter._on_execute)
+    try:
+        yield counter
+    finally:
+        for target in targets:
+            event.remove(target, "before_cursor_execute", counter._on_execute)
@@ -1,13 +1,58 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
+# 동기 드라이버 -> 비동기 드라이버 매핑 (ASYNC_DATABASE_URL 미지정 시 사용)
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def _pool_options(database_url: str, pool_size: int, max_overflow: int) -> dict:
+    """커넥션 풀 설정 (SQLite는 드라이버 기본 풀 사용)"""
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
+def get_async_database_url() -> str:
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
 # 1. 엔진 생성 (MySQL 연결)
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True, # 연결 끊김 방지
-    echo=True           # 실행되는 SQL을 로그로 출력 (개발용)
+    pool_pre_ping=True,      # 연결 끊김 방지
+    echo=settings.DB_ECHO,   # 실행되는 SQL을 로그로 출력 (DB_ECHO=true 일 때만)
+    **_pool_options(settings.DATABASE_URL, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
 )
 
 # 2. 세션 팩토리 생성 (실제 트랜잭션 관리자)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# 3. 비동기 엔진 & 세션 (async 엔드포인트용: DB 대기 중 이벤트 루프를 막지 않음)
+ASYNC_DATABASE_URL = get_async_database_url()
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    echo=settings.DB_ECHO,
+    **_pool_options(ASYNC_DATABASE_URL, settings.ASYNC_DB_POOL_SIZE, settings.ASYNC_DB_MAX_OVERFLOW)
+)
+
+# expire_on_commit=False: 커밋 후 속성 접근 시 암묵적 lazy load(동기 IO)가 일어나지 않도록
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
@@ -1,9 +1,12 @@
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.core.socket_manager import manager
+from app.core.loop_monitor import monitor as loop_monitor
 
 # [FIX] 파일명을 init_quest_data -> init_db_force 로 수정
 from init_db_force import init_default_quests 
@@ -24,9 +27,23 @@ async def lifespan(app: FastAPI):
         print("✅ [DB Init] All Data Synced Successfully.")
     except Exception as e:
         print(f"❌ [DB Init] Failed to sync data: {e}")
+
+    # 연결당 메모리 계산 기준 (소켓이 없는 시점의 RSS)
+    manager.mark_baseline_rss()
+
+    # 3. WebSocket Heartbeat (ping 전송 및 유휴 연결 정리)
+    heartbeat_task = asyncio.create_task(manager.heartbeat_loop())
+    # 4. 워커 작업 상태 이벤트 수신 (Redis Pub/Sub -> 구독 소켓)
+    task_events_task = asyncio.create_task(manager.task_event_listener())
+    # 5. 이벤트 루프 지연 감시 (동기 호출로 루프가 막히면 호출 스택 기록)
+    loop_monitor_task = asyncio.create_task(loop_monitor.run()) if settings.LOOP_LAG_MONITOR_ENABLED else None
     
     yield
     print("🛑 [Eggit Backend] Server Stopping...")
+    heartbeat_task.cancel()
+    task_events_task.cancel()
+    if loop_monitor_task:
+        loop_monitor_task.cancel()
 
 def get_application():
     _app = FastAPI(
@@ -62,6 +79,20 @@ def get_application():
 
 app = get_application()
 
+_metrics_registry = None
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus 수집용 (배포 단계별 소요 시간 히스토그램, 워커 기록 포함)"""
+    global _metrics_registry
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest
+    from app.core.deploy_timing import RedisHistogramCollector
+
+    if _metrics_registry is None:
+        _metrics_registry = CollectorRegistry()
+        _metrics_registry.register(RedisHistogramCollector())
+    return Response(generate_latest(_metrics_registry), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/")
 def health_check():
     return {"status": "ok", "message": "Eggit Backend is running!"}
\ No newline at end of file
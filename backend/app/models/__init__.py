@@ -2,11 +2,12 @@ from .base import Base
 from .user import User
 from .avatar import Avatar, AvatarMeta
 from .friend import Friendship, FriendStatus
-from .chat import ChatMessage
+from .chat import ChatMessage, Conversation
 from .quest import Quest, UserQuest, QuestFrequency, QuestStatus, QuestTitle
-from .dashboard import UserDashboard, BlogVisitLog, BlogPost
+from .dashboard import UserDashboard, BlogVisitLog, BlogVisitDaily, BlogPost
 from .calendar import Calendar
 from .guestbook import Guestbook
 from .visit import UserVisit
 from .gift import DailyGift
 from .checkin import DailyCheckinLog
+from .account_deletion import AccountDeletionJob, DeletionStatus
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Enum, Index
+from sqlalchemy.sql import func
+from app.models.base import Base
+import enum
+
+# 탈퇴 작업 상태
+class DeletionStatus(str, enum.Enum):
+    PENDING = "PENDING"       # 접수됨 (워커 대기)
+    RUNNING = "RUNNING"       # 삭제 진행 중
+    FAILED = "FAILED"         # 중간 실패 (재시도 시 current_step부터 이어서 진행)
+    COMPLETED = "COMPLETED"   # 유저 행까지 삭제 완료
+
+class AccountDeletionJob(Base):
+    """
+    [회원 탈퇴 작업]
+    - DELETE /users/me는 계정을 비활성화하고 이 작업만 등록
+    - 실제 데이터 삭제는 Celery 워커가 테이블별로 나눠서(chunk) 진행
+    - current_step/deleted_counts로 진행 상황을 기록해 중단되어도 이어서 재개
+    - 유저 행이 삭제된 뒤에도 기록이 남도록 user_id에 FK를 두지 않음
+    """
+    __tablename__ = "account_deletion_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+
+    status = Column(Enum(DeletionStatus), default=DeletionStatus.PENDING, nullable=False)
+    current_step = Column(String(50), nullable=True, comment="진행 중인 삭제 단계 (재개 지점)")
+    deleted_counts = Column(JSON, nullable=True, comment="단계별 삭제 행 수")
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now())
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # 재개 sweeper 조회용 (상태 + 마지막 진행 시각)
+        Index('ix_account_deletion_jobs_status_updated', 'status', 'updated_at'),
+    )
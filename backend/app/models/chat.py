@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.models.base import Base
@@ -20,4 +20,44 @@ class ChatMessage(Base):
 
     # 관계 설정
     sender = relationship("User", foreign_keys=[sender_id])
-    receiver = relationship("User", foreign_keys=[receiver_id])
\ No newline at end of file
+    receiver = relationship("User", foreign_keys=[receiver_id])
+
+
+class Conversation(Base):
+    """
+    [대화방 요약 테이블]
+    - 유저 쌍(작은 ID, 큰 ID)마다 1행만 유지
+    - 메시지 전송 시 같은 트랜잭션에서 갱신 (chat_messages 전체 스캔 없이 받은편지함 조회)
+    """
+    __tablename__ = "conversations"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # 항상 user_low_id < user_high_id 로 저장 (정렬된 쌍)
+    user_low_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_high_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    # 마지막 메시지 요약
+    last_message_id = Column(Integer, ForeignKey("chat_messages.id", ondelete="SET NULL"), nullable=True)
+    last_message_text = Column(String(255), nullable=True, comment="마지막 메시지 미리보기")
+    last_message_at = Column(DateTime, nullable=True)
+
+    # 각 측의 안 읽은 메시지 수
+    unread_count_low = Column(Integer, default=0, nullable=False)
+    unread_count_high = Column(Integer, default=0, nullable=False)
+
+    # 각 측이 마지막으로 읽은 메시지 ID (읽음 포인터)
+    last_read_id_low = Column(Integer, default=0, nullable=False)
+    last_read_id_high = Column(Integer, default=0, nullable=False)
+
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('user_low_id', 'user_high_id', name='uq_conversation_pair'),
+        # 받은편지함 조회용 (내 ID로 필터 + 최신순 정렬)
+        Index('ix_conversations_low_last_at', 'user_low_id', 'last_message_at'),
+        Index('ix_conversations_high_last_at', 'user_high_id', 'last_message_at'),
+    )
+
+    user_low = relationship("User", foreign_keys=[user_low_id])
+    user_high = relationship("User", foreign_keys=[user_high_id])
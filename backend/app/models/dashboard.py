@@ -60,6 +60,7 @@ class UserDashboard(Base):
     # 1. 블로그 방문자 통계
     # -------------------------------------------------------
     # help_text -> comment 로 변경
+    # [Deprecated] 방문자 수는 BlogVisitDaily 집계에서 계산 (컬럼은 하위 호환용으로만 유지)
     total_visitors = Column(Integer, default=0, comment="블로그 누적 순방문자 수(UV)")
     today_visitors = Column(Integer, default=0, comment="오늘 방문자 수 (자정 초기화 필요, 선택사항)")
 
@@ -88,8 +89,8 @@ class BlogVisitLog(Base):
     # 방문자 식별자
     visitor_ip_hash = Column(String(64), nullable=False)
     
-    # 방문 날짜
-    visit_date = Column(Date, default=func.current_date(), nullable=False)
+    # 방문 날짜 (index: 보존 기간 지난 로그 정리용)
+    visit_date = Column(Date, default=func.current_date(), nullable=False, index=True)
     
     # 생성 시간
     created_at = Column(DateTime, server_default=func.now())
@@ -97,4 +98,22 @@ class BlogVisitLog(Base):
     # [핵심] 중복 저장 방지
     __table_args__ = (
         UniqueConstraint('owner_id', 'visitor_ip_hash', 'visit_date', name='unique_daily_visit_log'),
-    )
\ No newline at end of file
+    )
+
+
+class BlogVisitDaily(Base):
+    """
+    [일별 방문자 집계 테이블]
+    - (owner_id, visit_date)당 1행, 순방문자 수(uv)를 원자적 UPSERT로 증가
+    - 대시보드의 오늘/이번 주/누적 방문자는 이 테이블에서 계산 (원본 로그는 보존 기간 후 삭제 가능)
+    """
+    __tablename__ = "blog_visit_daily"
+
+    id = Column(Integer, primary_key=True, index=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    visit_date = Column(Date, nullable=False)
+    uv = Column(Integer, default=0, nullable=False, comment="해당 일자 순방문자 수")
+
+    __table_args__ = (
+        UniqueConstraint('owner_id', 'visit_date', name='uq_blog_visit_daily'),
+    )
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, ForeignKey, Enum, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, Enum, DateTime, Index, UniqueConstraint
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from app.models.base import Base
 import enum
 
@@ -18,6 +18,11 @@ class Friendship(Base):
     requester_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     # 요청 받은 사람 (User ID)
     addressee_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    # 정렬된 유저 쌍 (항상 user_low_id < user_high_id, requester/addressee 지정 시 자동 설정)
+    # - 두 유저 간 관계는 (low, high) 유니크 인덱스 1회 조회로 확인
+    user_low_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_high_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     # 상태 (기본값: PENDING)
     status = Column(Enum(FriendStatus), default=FriendStatus.PENDING, nullable=False)
@@ -26,6 +31,22 @@ class Friendship(Base):
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
+    __table_args__ = (
+        UniqueConstraint('user_low_id', 'user_high_id', name='uq_friendship_pair'),
+        # 유저별 친구 목록 (low 쪽은 유니크 인덱스의 선두 컬럼으로 커버)
+        Index('ix_friendships_high_low', 'user_high_id', 'user_low_id'),
+        # 받은 요청 / 보낸 요청 목록
+        Index('ix_friendships_addressee_status', 'addressee_id', 'status'),
+        Index('ix_friendships_requester_status', 'requester_id', 'status'),
+    )
+
     # 관계 설정 (User 모델에서 접근할 때 사용)
     requester = relationship("User", foreign_keys=[requester_id])
-    addressee = relationship("User", foreign_keys=[addressee_id])
\ No newline at end of file
+    addressee = relationship("User", foreign_keys=[addressee_id])
+
+    @validates("requester_id", "addressee_id")
+    def _sync_user_pair(self, key, value):
+        other = self.addressee_id if key == "requester_id" else self.requester_id
+        if value is not None and other is not None:
+            self.user_low_id, self.user_high_id = min(value, other), max(value, other)
+        return value
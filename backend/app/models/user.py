@@ -19,6 +19,9 @@ class User(Base):
     
     is_active = Column(Boolean, default=True)
     tutorial_completed = Column(Boolean, default=False, nullable=False)
+
+    # JWT의 ver 클레임과 비교 (올리면 기존에 발급된 모든 토큰 무효화)
+    token_version = Column(Integer, default=0, nullable=False, server_default="0")
     
     # 최적화: 누적 방문자 수를 DB 컬럼으로 관리 (조회 성능 극대화)
     total_visits = Column(Integer, default=0, nullable=False)
@@ -54,6 +54,7 @@ class BlogCreateMain(BaseModel):
     author_email: Optional[EmailStr] = Field(None)
     theme_settings: Optional[ChirpyThemeSettings] = Field(default_factory=ChirpyThemeSettings)
     is_force: bool = Field(False, description="이미 존재할 경우 삭제 후 재생성 여부")
+    is_update: bool = Field(False, description="이미 존재할 경우 기존 히스토리 위에 바뀐 파일만 커밋 (테마/설정 변경)")
     avatar_url: Optional[str] = Field(None, description="커스텀 아바타 URL (미입력 시 GitHub 프로필 사용)")
 
 class BlogCreateDocs(BaseModel):
@@ -62,6 +63,7 @@ class BlogCreateDocs(BaseModel):
     description: Optional[str] = Field(None)
     theme_settings: Optional[DocsThemeSettings] = Field(default_factory=DocsThemeSettings)
     is_force: bool = Field(False, description="이미 존재할 경우 삭제 후 재생성 여부")
+    is_update: bool = Field(False, description="이미 존재할 경우 기존 히스토리 위에 바뀐 파일만 커밋 (AI 문서 재생성 없음)")
     
     @field_validator('target_repo')
     @classmethod
@@ -0,0 +1,231 @@
+"""
+회원 탈퇴 (비동기 삭제 작업)
+
+- 요청 경로(request_deletion): 계정 비활성화 + 토큰 무효화 + 작업 등록만 수행 (데이터 삭제 없음)
+- 워커(run_deletion_job): FK 순서대로 테이블별 삭제, 한 번에 최대 ACCOUNT_DELETION_CHUNK_SIZE행
+  - chunk 삭제와 진행 상황 기록을 같은 트랜잭션에서 커밋 → 어디서 중단돼도 current_step부터 재개
+  - OR 조건(보낸/받은 메시지 등)은 인덱스를 타는 단일 컬럼 단계로 분리
+- sweeper(resume_stalled_jobs): 멈춘/실패한 작업을 다시 예약
+"""
+import uuid
+from collections import namedtuple
+from datetime import timedelta
+from typing import List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import (
+    AccountDeletionJob, DeletionStatus, User, Avatar, Friendship, ChatMessage, Conversation,
+    UserQuest, UserDashboard, BlogVisitLog, BlogVisitDaily, BlogPost, Calendar, Guestbook,
+    UserVisit, DailyGift, DailyCheckinLog,
+)
+from app.utils.datetime_utils import now_utc, to_utc
+
+KEY_PREFIX = "eggit:account-deletion"
+
+# 토큰이 일치할 때만 락 해제 (다른 워커가 다시 잡은 락을 지우지 않도록)
+_RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# name: 진행 기록용 이름 / column: 탈퇴 유저 ID로 필터할 컬럼 / nullify: 삭제 대신 NULL로 변경
+DeletionStep = namedtuple("DeletionStep", ["name", "model", "column", "nullify"])
+
+# 삭제 순서 (FK 제약 조건 준수)
+# - 다른 유저에게 보이는 관계 데이터(친구/대화/방명록)를 먼저 정리
+# - conversations.last_message_id가 chat_messages를 참조하므로 대화방 -> 메시지 순
+# - users 행은 모든 단계가 끝난 뒤 마지막에 삭제
+DELETION_STEPS = [
+    DeletionStep("friendships_low", Friendship, Friendship.user_low_id, False),
+    DeletionStep("friendships_high", Friendship, Friendship.user_high_id, False),
+    DeletionStep("conversations_low", Conversation, Conversation.user_low_id, False),
+    DeletionStep("conversations_high", Conversation, Conversation.user_high_id, False),
+    DeletionStep("chat_messages_sent", ChatMessage, ChatMessage.sender_id, False),
+    DeletionStep("chat_messages_received", ChatMessage, ChatMessage.receiver_id, False),
+    DeletionStep("guestbooks_owned", Guestbook, Guestbook.owner_id, False),
+    DeletionStep("guestbooks_authored", Guestbook, Guestbook.author_id, True),  # 남의 방명록에 쓴 글은 작성자만 비움
+    DeletionStep("user_visits_made", UserVisit, UserVisit.visitor_id, False),
+    DeletionStep("user_visits_received", UserVisit, UserVisit.owner_id, False),
+    DeletionStep("blog_visit_logs", BlogVisitLog, BlogVisitLog.owner_id, False),
+    DeletionStep("blog_visit_daily", BlogVisitDaily, BlogVisitDaily.owner_id, False),
+    DeletionStep("blog_posts", BlogPost, BlogPost.user_id, False),
+    DeletionStep("user_dashboards", UserDashboard, UserDashboard.user_id, False),
+    DeletionStep("calendars", Calendar, Calendar.user_id, False),
+    DeletionStep("user_quests", UserQuest, UserQuest.user_id, False),
+    DeletionStep("daily_gifts", DailyGift, DailyGift.user_id, False),
+    DeletionStep("daily_checkin_logs", DailyCheckinLog, DailyCheckinLog.user_id, False),
+    DeletionStep("avatars", Avatar, Avatar.user_id, False),
+]
+USER_STEP = "users"
+
+_ACTIVE_STATUSES = (DeletionStatus.PENDING, DeletionStatus.RUNNING, DeletionStatus.FAILED)
+
+
+def _lock_key(job_id: int) -> str:
+    return f"{KEY_PREFIX}:lock:{job_id}"
+
+
+def _enqueue_deletion_task(job_id: int):
+    from app.worker import task_delete_account
+    task_delete_account.delay(job_id)
+
+
+def serialize_job(job: AccountDeletionJob) -> dict:
+    return {
+        "job_id": job.id,
+        "status": job.status.value,
+        "current_step": job.current_step,
+        "deleted_counts": job.deleted_counts or {},
+    }
+
+
+# =========================================================
+# API 프로세스 (요청 경로)
+# =========================================================
+
+def request_deletion(db: Session, user: User) -> dict:
+    """
+    탈퇴 접수: 계정 비활성화 + token_version 증가(기존 토큰 즉시 무효화) + 작업 등록
+    - 이미 진행 중인 작업이 있으면 그 작업을 반환 (중복 접수 방지)
+    - 커밋 후 직렬화한 작업 정보를 반환 (AsyncSession.run_sync 안에서 호출되므로)
+    """
+    job = db.query(AccountDeletionJob).filter(
+        AccountDeletionJob.user_id == user.id,
+        AccountDeletionJob.status.in_(_ACTIVE_STATUSES)
+    ).first()
+
+    db.execute(
+        update(User).where(User.id == user.id).values(
+            is_active=False, token_version=User.token_version + 1
+        )
+    )
+    if not job:
+        job = AccountDeletionJob(user_id=user.id, status=DeletionStatus.PENDING, deleted_counts={})
+        db.add(job)
+    db.commit()
+    return serialize_job(job)
+
+
+def enqueue(job_id: int) -> bool:
+    """
+    삭제 작업 예약 (브로커 장애 시 False - 작업은 DB에 남아 있으므로 sweeper가 나중에 재예약)
+    """
+    try:
+        _enqueue_deletion_task(job_id)
+        return True
+    except Exception as e:
+        print(f"⚠️ [AccountDeletion] enqueue failed for job {job_id}: {e}")
+        return False
+
+
+# =========================================================
+# Celery 워커
+# =========================================================
+
+def _delete_chunk(db: Session, step: DeletionStep, user_id: int, chunk_size: int) -> int:
+    """PK를 chunk_size개만 먼저 조회한 뒤 PK로 삭제(또는 NULL 처리) - 한 문장이 잡는 락 범위 제한"""
+    pk = step.model.id
+    ids = [row_id for (row_id,) in db.query(pk).filter(step.column == user_id).limit(chunk_size).all()]
+    if not ids:
+        return 0
+
+    query = db.query(step.model).filter(pk.in_(ids))
+    if step.nullify:
+        return query.update({step.column: None}, synchronize_session=False)
+    return query.delete(synchronize_session=False)
+
+
+def _remaining_steps(job: AccountDeletionJob) -> List[DeletionStep]:
+    """완료된 단계는 건너뛰고 current_step부터 재개"""
+    names = [step.name for step in DELETION_STEPS]
+    if job.current_step in names:
+        return DELETION_STEPS[names.index(job.current_step):]
+    if job.current_step == USER_STEP:
+        return []
+    return DELETION_STEPS
+
+
+def _record_progress(job: AccountDeletionJob, step_name: str, deleted: int = 0):
+    counts = dict(job.deleted_counts or {})
+    counts[step_name] = counts.get(step_name, 0) + deleted
+    job.deleted_counts = counts  # JSON 컬럼은 재할당해야 변경 감지
+    job.current_step = step_name
+    job.updated_at = now_utc()
+
+
+def run_deletion_job(db: Session, redis_client, job_id: int, chunk_size: Optional[int] = None) -> Optional[dict]:
+    """
+    탈퇴 작업 실행 (작업별 분산 락 보유 중에만, 다른 워커가 실행 중이면 None)
+    - 실패 시 FAILED로 기록하고 예외 전파 (완료된 chunk는 커밋되어 있으므로 재시도 시 이어서 진행)
+    """
+    chunk_size = chunk_size or settings.ACCOUNT_DELETION_CHUNK_SIZE
+    lock_token = uuid.uuid4().hex
+    if not redis_client.set(_lock_key(job_id), lock_token, nx=True, ex=settings.ACCOUNT_DELETION_STALE_SECONDS):
+        return None
+
+    try:
+        job = db.get(AccountDeletionJob, job_id)
+        if not job or job.status == DeletionStatus.COMPLETED:
+            return serialize_job(job) if job else None
+
+        job.status = DeletionStatus.RUNNING
+        job.attempts = (job.attempts or 0) + 1
+        job.updated_at = now_utc()
+        db.commit()
+
+        try:
+            for step in _remaining_steps(job):
+                _record_progress(job, step.name)
+                db.commit()
+                while True:
+                    deleted = _delete_chunk(db, step, job.user_id, chunk_size)
+                    if not deleted:
+                        break
+                    # chunk 삭제와 진행 기록을 한 트랜잭션으로 커밋
+                    _record_progress(job, step.name, deleted)
+                    db.commit()
+
+            # 모든 연관 데이터 삭제 후 유저 행 삭제
+            deleted = db.query(User).filter(User.id == job.user_id).delete(synchronize_session=False)
+            _record_progress(job, USER_STEP, deleted)
+            job.status = DeletionStatus.COMPLETED
+            job.last_error = None
+            job.finished_at = now_utc()
+            db.commit()
+            return serialize_job(job)
+        except Exception as e:
+            db.rollback()
+            job.status = DeletionStatus.FAILED
+            job.last_error = str(e)[:1000]
+            job.updated_at = now_utc()
+            db.commit()
+            raise
+    finally:
+        redis_client.eval(_RELEASE_LOCK_LUA, 1, _lock_key(job_id), lock_token)
+
+
+def resume_stalled_jobs(db: Session) -> List[int]:
+    """
+    ACCOUNT_DELETION_STALE_SECONDS 동안 진행이 없는 작업을 다시 예약
+    - PENDING: 예약 유실(브로커 장애 등) / RUNNING: 워커 중단 / FAILED: 재시도 (최대 ACCOUNT_DELETION_MAX_ATTEMPTS회)
+    """
+    stale_before = now_utc() - timedelta(seconds=settings.ACCOUNT_DELETION_STALE_SECONDS)
+    jobs = db.query(AccountDeletionJob).filter(
+        AccountDeletionJob.status.in_(_ACTIVE_STATUSES),
+        AccountDeletionJob.attempts < settings.ACCOUNT_DELETION_MAX_ATTEMPTS
+    ).order_by(AccountDeletionJob.id).all()
+
+    resumed = []
+    for job in jobs:
+        if job.updated_at and to_utc(job.updated_at) > stale_before:
+            continue
+        if enqueue(job.id):
+            job.updated_at = now_utc()  # 다음 sweep에서 중복 예약 방지
+            resumed.append(job.id)
+    db.commit()
+    return resumed
@@ -0,0 +1,217 @@
+"""
+렌더링된 템플릿 변형(variant) 아티팩트 캐시 (디스크, 같은 호스트의 워커 간 공유)
+
+기본값/인기 프리셋을 고른 유저가 많아 _config.yml/SCSS/CSS가 대부분 같은 내용으로 다시 렌더링됩니다.
+
+- variant: 테마 설정 등 유저와 무관한 입력 + 원본 템플릿 파일 blob SHA → SHA-256 키 (내용 주소)
+  - 결과 파일 묶음({경로: 내용})을 DEPLOY_ARTIFACT_CACHE_DIR/{키[:2]}/{키}.json 에 저장
+  - 유저별 값(제목/URL/이메일 등)은 자리표시자로 렌더링해 두고 배포 때 patch로 채움
+    - __EGGIT_x__: YAML 스칼라 전체 자리 → JSON 큰따옴표 표기로 교체 (따옴표/콜론/개행도 안전)
+    - __EGGIT_INLINE_x__: 문자열 안쪽 자리 (owner/repo 등 [A-Za-z0-9_.-]만 허용, 아니면 ValueError)
+- 메모리 LRU(render_cache) → 디스크 → 렌더링 순으로 조회
+- 디스크 용량이 DEPLOY_ARTIFACT_CACHE_QUOTA_MB를 넘으면 가장 오래 쓰이지 않은(mtime) 항목부터 삭제
+- 적중률: Redis 해시 eggit:artifacts:stats 에 종류별 memory_hit/disk_hit/miss 누적 (Redis 장애 시 프로세스 카운터만)
+"""
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional
+
+import orjson
+
+from app.core.config import settings
+from app.services.blog.render_cache import RenderCache, render_cache
+
+STATS_KEY = "eggit:artifacts:stats"
+_PLACEHOLDER = re.compile(r"__EGGIT_(INLINE_)?([a-z0-9_]+?)__")
+_INLINE_SAFE = re.compile(r"^[A-Za-z0-9_.-]*$")
+_OUTCOMES = ("memory_hit", "disk_hit", "miss")
+
+
+def placeholder(name: str, inline: bool = False) -> str:
+    return f"__EGGIT_{'INLINE_' if inline else ''}{name}__"
+
+
+def patch(text: str, values: Dict[str, Any]) -> str:
+    """variant 내용의 자리표시자를 유저별 값으로 교체"""
+    def replace(match: "re.Match") -> str:
+        inline, name = match.group(1), match.group(2)
+        value = values[name]
+        if inline:
+            if not _INLINE_SAFE.match(str(value)):
+                raise ValueError(f"unsafe inline value for {name}")
+            return str(value)
+        return json.dumps(value, ensure_ascii=False)
+    return _PLACEHOLDER.sub(replace, text)
+
+
+class ArtifactCache:
+    def __init__(self, root: Optional[str] = None, quota_bytes: Optional[int] = None):
+        self.root = os.path.abspath(root or settings.DEPLOY_ARTIFACT_CACHE_DIR)
+        self.quota_bytes = quota_bytes or settings.DEPLOY_ARTIFACT_CACHE_QUOTA_MB * 1024 * 1024
+        self._memory = render_cache
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(_OUTCOMES, 0))
+        self._bytes_written = 0
+        self._lock = threading.Lock()
+        self._redis = None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    # -----------------------------------------------------------------
+    # 조회/저장
+    # -----------------------------------------------------------------
+    def get_variant(
+        self, kind: str, source: str, inputs: Dict[str, Any], render: Callable[[], Dict[str, str]]
+    ) -> Dict[str, str]:
+        """
+        kind + source(원본 blob SHA) + inputs(유저와 무관한 값)로 렌더링된 파일 묶음
+        - render는 캐시에 없을 때만 호출 (자리표시자가 들어간 결과를 반환해야 함)
+        """
+        key = RenderCache.make_key(kind, source, inputs)
+        outcome = "memory_hit"
+
+        def load() -> str:
+            nonlocal outcome
+            raw = self._read(key)
+            if raw is not None:
+                outcome = "disk_hit"
+                return raw
+            outcome = "miss"
+            raw = orjson.dumps(render()).decode("utf-8")
+            self._write(key, raw)
+            return raw
+
+        files = orjson.loads(self._memory.get_or_render(key, load))
+        self._record(kind, outcome)
+        return files
+
+    def _read(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = f.read()
+            os.utime(path)  # LRU 기준 시각 갱신
+            return raw
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"⚠️ [ArtifactCache] read failed: {e}")
+            return None
+
+    def _write(self, key: str, raw: str):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(raw)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ [ArtifactCache] write failed: {e}")
+            return
+
+        with self._lock:
+            self._bytes_written += len(raw)
+            # 디스크 전체를 매번 훑지 않도록 쓴 양이 쿼터의 1/10을 넘을 때마다 확인
+            should_evict = self._bytes_written >= self.quota_bytes // 10
+            if should_evict:
+                self._bytes_written = 0
+        if should_evict:
+            self.evict()
+
+    def evict(self) -> int:
+        """쿼터 초과 시 mtime이 오래된 항목부터 쿼터의 90%까지 삭제 → 삭제한 항목 수"""
+        entries = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        if total <= self.quota_bytes:
+            return 0
+
+        removed = 0
+        target = int(self.quota_bytes * 0.9)
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        print(f"🧹 [ArtifactCache] evicted {removed} entries ({total / 1024 / 1024:.1f}MB left)")
+        return removed
+
+    # -----------------------------------------------------------------
+    # 적중률
+    # -----------------------------------------------------------------
+    def _get_redis(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True, socket_timeout=0.5)
+        return self._redis
+
+    def _record(self, kind: str, outcome: str):
+        with self._lock:
+            self._counts[kind][outcome] += 1
+        try:
+            self._get_redis().hincrby(STATS_KEY, f"{kind}:{outcome}", 1)
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """종류별 memory_hit/disk_hit/miss/hit_rate (Redis 누적값, 실패 시 현재 프로세스 값) + 디스크 사용량"""
+        counts: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(_OUTCOMES, 0))
+        try:
+            for field, value in self._get_redis().hgetall(STATS_KEY).items():
+                kind, outcome = field.rsplit(":", 1)
+                counts[kind][outcome] = int(value)
+        except Exception:
+            with self._lock:
+                for kind, values in self._counts.items():
+                    counts[kind].update(values)
+
+        kinds = {}
+        for kind, values in counts.items():
+            total = sum(values.values())
+            hits = values["memory_hit"] + values["disk_hit"]
+            kinds[kind] = {**values, "hit_rate": round(hits / total, 4) if total else None}
+
+        disk_bytes = 0
+        disk_entries = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(".json"):
+                    disk_entries += 1
+                    try:
+                        disk_bytes += os.path.getsize(os.path.join(dirpath, name))
+                    except FileNotFoundError:
+                        pass
+        return {
+            "kinds": kinds,
+            "disk": {"entries": disk_entries, "bytes": disk_bytes, "quota_bytes": self.quota_bytes},
+            "memory": self._memory.snapshot(),
+        }
+
+
+_default_cache: Optional[ArtifactCache] = None
+
+
+def get_artifact_cache() -> ArtifactCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ArtifactCache()
+    return _default_cache
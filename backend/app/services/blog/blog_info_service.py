@@ -6,6 +6,8 @@ import json
 from typing import List, Optional, Dict, Any
 
 from app.services.github.github_client import GithubClient
+from app.services.github.github_writer import GithubWriter, run_blocking
+from app.services.blog import repo_metadata
 from app.schemas.blog import BlogRepoInfo, BlogPostItem, BlogStructureResponse
 from app.core.config import settings
 import redis.asyncio as redis 
@@ -17,6 +19,7 @@ redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
 
 class BlogInfoService:
     def __init__(self, token: str):
+        self.token = token
         self.client = GithubClient(token)
 
     # =================================================================
@@ -84,11 +87,13 @@ class BlogInfoService:
     # [New] Docs Full Parsing Logic (Title & NavOrder 기반)
     # --------------------------------------------------------------------------
     async def _analyze_docs_full_structure(self, repo_name: str, branch: str):
-        all_paths = await self.client.fetch_all_file_paths(repo_name, branch)
+        file_shas = await self.client.fetch_file_shas(repo_name, branch)
         
         # 1. 대상 파일 필터링 (.md 파일만, LICENSE/README 제외 가능성 있음)
         # index.md는 포함해야 홈 화면 수정 가능
-        target_files = [p for p in all_paths if p.endswith(".md")]
+        target_files = [p for p in file_shas if p.endswith(".md")]
+        # 포스팅 업로드 fast path용 (브랜치 확인/SHA 조회 생략)
+        await repo_metadata.seed_file_shas(redis_client, repo_name, branch, "docs", {p: file_shas[p] for p in target_files})
         
         # 2. 전체 파일 내용 병렬 다운로드 (필수: Title과 NavOrder를 알아야 함)
         tasks = [self.client.fetch_raw_content(repo_name, p, branch) for p in target_files]
@@ -155,7 +160,7 @@ class BlogInfoService:
                 path=path,
                 title=title,     # [중요] Front Matter의 Title 사용
                 category=category,
-                sha="unknown",
+                sha=file_shas[path],
                 date=None,
                 nav_order=nav_order, # [중요] 정렬용 키
                 is_index=is_index    # [New] 카테고리 식별용
@@ -172,21 +177,22 @@ class BlogInfoService:
         **주의:** 이 리스트에 없는 파일(다른 폴더/카테고리)은 건드리지 않음.
         """
         try:
-            # 동기식 Github 객체 생성 (Commit용) - 루프 밖에서 한 번만 생성
-            from github import Github
-            g = Github(self.client.token)
-            repo = g.get_repo(repo_name)
-
-            for index, path in enumerate(ordered_paths):
+            # 1. 파일 내용 + SHA를 동시에 조회 (GitHub 호출은 전용 스레드풀에서 실행 → 이벤트 루프 비차단)
+            writer = GithubWriter(self.token)
+            files = await asyncio.gather(*[
+                run_blocking(writer.get_file, repo_name, path, branch) for path in ordered_paths
+            ])
+
+            changes: Dict[str, bytes] = {}
+            for index, (path, file) in enumerate(zip(ordered_paths, files)):
                 new_order = index + 1
-                
-                # 1. 파일 내용 가져오기 (비동기 클라이언트 활용)
-                content = await self.client.fetch_raw_content(repo_name, path, branch)
-                if not content:
+
+                if file is None:
                     logger.warning(f"File not found during reorder: {path}")
                     continue
 
                 # 2. 기존 nav_order 값과 비교하여 다를 때만 업데이트 (API 호출 최소화)
+                content = file.text
                 current_meta = self._parse_front_matter(content)
                 current_order = current_meta.get("nav_order")
                 
@@ -195,21 +201,15 @@ class BlogInfoService:
                     continue # 변경 없음, Skip
 
                 # 3. 내용 수정
-                updated_content = self._update_front_matter_value(content, "nav_order", new_order)
-                
-                # 4. GitHub Commit
-                try:
-                    file = repo.get_contents(path, ref=branch)
-                    repo.update_file(
-                        path=path,
-                        message=f"Update nav_order: {current_order} -> {new_order}",
-                        content=updated_content,
-                        sha=file.sha,
-                        branch=branch
-                    )
-                    logger.info(f"✅ Updated {path}: nav_order {new_order}")
-                except Exception as commit_err:
-                    logger.error(f"Failed to update {path}: {commit_err}")
+                changes[path] = self._update_front_matter_value(content, "nav_order", new_order).encode("utf-8")
+
+            # 4. 변경된 파일 전체를 한 커밋으로
+            if changes:
+                await run_blocking(
+                    writer.commit_files, repo_name, changes, branch,
+                    f"Update nav_order ({len(changes)} files)"
+                )
+                logger.info(f"✅ Updated nav_order: {', '.join(changes)}")
 
             # 5. Redis 캐시 무효화 (구조가 바뀌었으므로)
             cache_key = f"blog_struct_v2:{repo_name}:{branch}"
@@ -252,8 +252,9 @@ class BlogInfoService:
     # Internal Logic: Chirpy (Front-matter 기반)
     # --------------------------------------------------------------------------
     async def _analyze_chirpy_structure(self, repo_name: str, branch: str):
-        all_files = await self.client.fetch_all_file_paths(repo_name, branch)
-        md_files = [f for f in all_files if f.startswith("_posts/") and f.endswith(".md")]
+        file_shas = await self.client.fetch_file_shas(repo_name, branch)
+        md_files = [f for f in file_shas if f.startswith("_posts/") and f.endswith(".md")]
+        await repo_metadata.seed_file_shas(redis_client, repo_name, branch, "chirpy", {f: file_shas[f] for f in md_files})
 
         tasks = [self.client.fetch_raw_content(repo_name, f, branch) for f in md_files]
         contents = await asyncio.gather(*tasks)
@@ -284,7 +285,7 @@ class BlogInfoService:
                 title=str(meta.get("title", path.split("/")[-1])),
                 category=primary_cat, # "Main/Sub" 형태
                 date=str(meta.get("date", ""))[:10],
-                sha="unknown",
+                sha=file_shas[path],
                 nav_order=None, # Chirpy는 nav_order 안 씀
                 is_index=False # [Added] 명시적 추가
             ))
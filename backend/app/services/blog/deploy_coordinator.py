@@ -0,0 +1,135 @@
+"""
+배포/포스팅 작업 조율 (Deploy Coordinator)
+
+- 멱등 제출(submit): 같은 유저가 같은 내용을 연달아 제출하면(더블클릭 등) 기존 작업 ID를 돌려주고 새로 예약하지 않음
+  - 키: Idempotency-Key 헤더가 있으면 그 값, 없으면 (유저, 종류, 저장소, 요청 내용) 해시
+  - 작업 ID를 미리 만들어 SET NX로 키를 선점한 요청만 apply_async
+- 저장소별 락(repo_lock): 같은 저장소에 대한 배포/포스팅은 한 번에 하나만 실행 (force push가 커밋을 덮어쓰는 경합 방지)
+  - 락을 못 잡은 작업은 잠시 기다린 뒤 Celery retry로 뒤로 미룸 (저장소별 직렬 실행)
+"""
+import hashlib
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import orjson
+
+from app.core.config import settings
+
+KEY_PREFIX = "eggit:deploy"
+
+# 토큰이 일치할 때만 락 해제 (다른 워커가 다시 잡은 락을 지우지 않도록)
+_RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_redis_client = None
+
+
+def _get_redis():
+    """API 프로세스용 (배포 엔드포인트는 sync 라우트 → 스레드풀에서 실행)"""
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True, socket_timeout=0.5)
+    return _redis_client
+
+
+def _lock_key(repo_full_name: str) -> str:
+    return f"{KEY_PREFIX}:lock:{repo_full_name.lower()}"
+
+
+def _idempotency_key(user_id: int, kind: str, key: str) -> str:
+    return f"{KEY_PREFIX}:idem:{user_id}:{kind}:{key}"
+
+
+def payload_digest(repo_full_name: str, payload: Dict[str, Any]) -> str:
+    """요청 내용 해시 (키 순서와 무관)"""
+    raw = orjson.dumps({"repo": repo_full_name.lower(), "payload": payload}, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(raw).hexdigest()
+
+
+# =========================================================
+# API 프로세스 (제출)
+# =========================================================
+
+def submit(
+    task,
+    args: tuple,
+    user_id: int,
+    kind: str,
+    repo_full_name: str,
+    payload: Dict[str, Any],
+    client_key: Optional[str] = None,
+    kwargs: Optional[dict] = None,
+) -> Tuple[str, bool]:
+    """
+    멱등 작업 예약 → (task_id, 중복 여부)
+    - 중복이면 예약하지 않고 먼저 제출된 작업 ID 반환
+    - Redis 장애 시에는 중복 제거 없이 그대로 예약
+    """
+    key = _idempotency_key(user_id, kind, client_key or payload_digest(repo_full_name, payload))
+    task_id = uuid.uuid4().hex
+    kwargs = {**(kwargs or {}), "idempotency_key": key}
+
+    try:
+        redis_client = _get_redis()
+        if not redis_client.set(key, task_id, nx=True, ex=settings.DEPLOY_IDEMPOTENCY_TTL_SECONDS):
+            existing = redis_client.get(key)
+            if existing:
+                return existing, True
+            redis_client.set(key, task_id, ex=settings.DEPLOY_IDEMPOTENCY_TTL_SECONDS)
+    except Exception as e:
+        print(f"⚠️ [Deploy] idempotency check failed ({kind} {repo_full_name}): {e}")
+        redis_client = None
+
+    try:
+        task.apply_async(args=args, kwargs=kwargs, task_id=task_id)
+    except Exception:
+        if redis_client is not None:
+            release_idempotency_key(redis_client, key)
+        raise
+    return task_id, False
+
+
+def release_idempotency_key(redis_client, key: Optional[str]):
+    """작업 종료(성공/최종 실패) 후 같은 요청을 다시 제출할 수 있도록 키 삭제"""
+    if not key:
+        return
+    try:
+        redis_client.delete(key)
+    except Exception as e:
+        print(f"⚠️ [Deploy] idempotency key release failed: {e}")
+
+
+# =========================================================
+# Celery 워커 (저장소별 직렬 실행)
+# =========================================================
+
+@contextmanager
+def repo_lock(redis_client, repo_full_name: str, wait_seconds: Optional[float] = None) -> Iterator[bool]:
+    """
+    저장소별 분산 락 (획득 여부를 yield, 못 잡았으면 호출 측에서 retry)
+    - wait_seconds 동안 짧게 폴링 (직전 작업이 곧 끝나는 흔한 경우는 retry 없이 바로 이어서 실행)
+    """
+    key = _lock_key(repo_full_name)
+    token = uuid.uuid4().hex
+    wait_seconds = settings.DEPLOY_LOCK_WAIT_SECONDS if wait_seconds is None else wait_seconds
+    deadline = time.monotonic() + wait_seconds
+
+    acquired = False
+    while True:
+        acquired = bool(redis_client.set(key, token, nx=True, ex=settings.DEPLOY_REPO_LOCK_SECONDS))
+        if acquired or time.monotonic() >= deadline:
+            break
+        time.sleep(0.5)
+
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            redis_client.eval(_RELEASE_LOCK_LUA, 1, key, token)
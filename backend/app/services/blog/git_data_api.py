@@ -0,0 +1,293 @@
+"""
+Git Data API 배포 백엔드 (로컬 git 없음)
+
+git 바이너리/쓰기 가능한 /tmp/원격 URL 토큰 없이 GitHub REST API만으로 배포합니다.
+(배포 워커를 상태 없는 컨테이너로 운영할 때 사용, DEPLOY_BACKEND="api" 또는 배포별 선택)
+
+1. 대상 브랜치의 현재 트리를 recursive로 조회 → 이미 있는 blob SHA 수집
+2. DeployTree(템플릿 + 유저별 파일)의 blob SHA를 로컬에서 계산 → 원격에 없는 blob만 동시 업로드
+3. 트리 1회 + 커밋 1회 생성 후 ref 갱신 (기존 git push --force와 같은 의미: 부모 없는 단일 커밋)
+
+update: 테마/설정 변경 재배포용. 원격 트리와 렌더링 결과를 경로별 (mode, blob SHA)로 비교해
+바뀐 경로만 base_tree 위에 올린 커밋을 기존 히스토리에 이어 붙임 (fast-forward, 유저 포스트 유지)
+"""
+import base64
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.core.deploy_timing import span
+from app.services.blog.template_store import DeployTree, git_blob_sha, template_blob_sha
+
+logger = logging.getLogger("BlogDeploy")
+
+class GitDataApiError(Exception):
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"GitHub API {status_code}: {message}")
+        self.status_code = status_code
+
+
+class _BlobEntry:
+    """트리에 들어갈 파일 1개 (내용은 업로드가 필요할 때만 읽음)"""
+    __slots__ = ("path", "mode", "sha", "content", "abs_path")
+
+    def __init__(self, path: str, mode: str, sha: str, content: Optional[bytes] = None, abs_path: Optional[str] = None):
+        self.path = path
+        self.mode = mode
+        self.sha = sha
+        self.content = content
+        self.abs_path = abs_path
+
+    def read(self) -> bytes:
+        if self.content is not None:
+            return self.content
+        with open(self.abs_path, "rb") as f:
+            return f.read()
+
+
+class GitDataApiDeployer:
+    """GitHub Git Data API로 DeployTree를 한 커밋으로 배포"""
+
+    def __init__(
+        self, token: str, api_url: Optional[str] = None, concurrency: Optional[int] = None,
+        client: Optional[httpx.Client] = None
+    ):
+        """client: 프로세스 공용 커넥션 풀을 쓸 때 전달 (인증 헤더는 요청마다 붙임, close하지 않음)"""
+        self.api_url = (api_url or settings.GITHUB_API_URL).rstrip("/")
+        self.concurrency = concurrency or settings.DEPLOY_API_CONCURRENCY
+        self.headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+        self._owns_client = client is None
+        self.client = client or httpx.Client(timeout=60.0)
+
+    def close(self):
+        if self._owns_client:
+            self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # -----------------------------------------------------------------
+    # HTTP
+    # -----------------------------------------------------------------
+    def _request(self, method: str, path: str, allow: Tuple[int, ...] = (), **kwargs) -> Optional[dict]:
+        """allow에 포함된 상태 코드는 예외 대신 None 반환"""
+        with span(f"github_api.{method}"):
+            res = self.client.request(method, f"{self.api_url}{path}", headers=self.headers, **kwargs)
+        if res.status_code in allow:
+            return None
+        if res.status_code >= 400:
+            try:
+                message = res.json().get("message", res.text)
+            except ValueError:
+                message = res.text
+            raise GitDataApiError(res.status_code, message)
+        return res.json() if res.content else {}
+
+    # -----------------------------------------------------------------
+    # 원격 상태 조회
+    # -----------------------------------------------------------------
+    def _get_branch_head(self, repo: str, branch: str) -> Optional[str]:
+        # 404: 브랜치 없음 / 409: 빈 저장소
+        data = self._request("GET", f"/repos/{repo}/git/ref/heads/{branch}", allow=(404, 409))
+        return data["object"]["sha"] if data else None
+
+    def _get_remote_tree(self, repo: str, commit_sha: str) -> Tuple[str, Dict[str, Tuple[str, str]]]:
+        """대상 커밋의 (트리 SHA, 경로 → (mode, blob SHA))"""
+        commit = self._request("GET", f"/repos/{repo}/git/commits/{commit_sha}")
+        tree = self._request("GET", f"/repos/{repo}/git/trees/{commit['tree']['sha']}", params={"recursive": "1"})
+        if tree.get("truncated"):
+            logger.warning(f"⚠️ {repo} 트리가 커서 일부만 조회됨 (나머지는 변경된 것으로 간주)")
+        blobs = {item["path"]: (item["mode"], item["sha"]) for item in tree.get("tree", []) if item.get("type") == "blob"}
+        return commit["tree"]["sha"], blobs
+
+    def _get_remote_blobs(self, repo: str, commit_sha: str) -> Set[str]:
+        """대상 커밋 트리에 이미 있는 blob SHA (업로드 생략 대상)"""
+        return {sha for _, sha in self._get_remote_tree(repo, commit_sha)[1].values()}
+
+    def get_default_branch(self, repo: str) -> str:
+        return self._request("GET", f"/repos/{repo}").get("default_branch") or "main"
+
+    def _get_default_head(self, repo: str) -> Optional[str]:
+        return self._get_branch_head(repo, self.get_default_branch(repo))
+
+    def _bootstrap_empty_repo(self, repo: str, branch: str):
+        """
+        빈 저장소는 Git Data API를 쓸 수 없으므로 Contents API로 배포 브랜치에 첫 커밋 생성 (배포 커밋으로 대체됨)
+        - 기본 브랜치는 건드리지 않음 (git push 백엔드와 같이 배포 브랜치만 생김)
+        """
+        self._request(
+            "PUT", f"/repos/{repo}/contents/README.md",
+            json={
+                "message": "Initialize repository",
+                "content": base64.b64encode(b"# Eggit\n").decode("ascii"),
+                "branch": branch,
+            }
+        )
+        logger.info(f"✅ 빈 저장소 초기화: {repo}@{branch}")
+
+    # -----------------------------------------------------------------
+    # 트리 조립
+    # -----------------------------------------------------------------
+    @staticmethod
+    def _collect_entries(tree: DeployTree) -> List[_BlobEntry]:
+        entries: Dict[str, _BlobEntry] = {}
+        for rel_path, abs_path in tree.iter_template_files():
+            if rel_path in tree.removed or rel_path in tree.files:
+                continue
+            mode = "100755" if os.access(abs_path, os.X_OK) else "100644"
+            entries[rel_path] = _BlobEntry(rel_path, mode, template_blob_sha(abs_path), abs_path=abs_path)
+        for path, content in tree.files.items():
+            entries[path] = _BlobEntry(path, "100644", git_blob_sha(content), content=content)
+        return [entries[path] for path in sorted(entries)]
+
+    def _create_blob(self, repo: str, entry: _BlobEntry) -> str:
+        data = self._request(
+            "POST", f"/repos/{repo}/git/blobs",
+            json={"content": base64.b64encode(entry.read()).decode("ascii"), "encoding": "base64"}
+        )
+        if data["sha"] != entry.sha:
+            raise GitDataApiError(500, f"blob SHA mismatch for {entry.path}")
+        return data["sha"]
+
+    def _upload_missing_blobs(self, repo: str, entries: List[_BlobEntry], remote_blobs: Set[str]) -> int:
+        """원격에 없는 blob만 SHA 기준으로 중복 제거 후 동시 업로드"""
+        missing: Dict[str, _BlobEntry] = {}
+        for entry in entries:
+            if entry.sha not in remote_blobs:
+                missing.setdefault(entry.sha, entry)
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                list(pool.map(lambda e: self._create_blob(repo, e), missing.values()))
+        return len(missing)
+
+    # -----------------------------------------------------------------
+    # 기존 브랜치에 파일 추가 커밋 (이미지 업로드 등)
+    # -----------------------------------------------------------------
+    def commit_files(
+        self, repo: str, files: Dict[str, bytes], branch: Optional[str] = None, message: str = "Upload by Eggit"
+    ) -> str:
+        """
+        브랜치 최신 커밋 위에 files만 추가/수정하는 커밋 1개 (여러 파일을 한 번에)
+        - fast-forward로만 ref 갱신, 그 사이 브랜치가 움직였으면 최신 커밋 위에서 1회 재시도
+        """
+        branch = branch or self.get_default_branch(repo)
+        entries = [_BlobEntry(path, "100644", git_blob_sha(content), content=content) for path, content in sorted(files.items())]
+        self._upload_missing_blobs(repo, entries, set())
+
+        for _ in range(2):
+            head = self._get_branch_head(repo, branch)
+            if head is None:
+                raise GitDataApiError(404, f"branch not found: {branch}")
+            base_tree = self._request("GET", f"/repos/{repo}/git/commits/{head}")["tree"]["sha"]
+            new_tree = self._request("POST", f"/repos/{repo}/git/trees", json={
+                "base_tree": base_tree,
+                "tree": [{"path": e.path, "mode": e.mode, "type": "blob", "sha": e.sha} for e in entries]
+            })
+            commit = self._request("POST", f"/repos/{repo}/git/commits", json={
+                "message": message, "tree": new_tree["sha"], "parents": [head]
+            })
+            # 422: fast-forward 아님 (동시에 다른 커밋이 올라감)
+            updated = self._request(
+                "PATCH", f"/repos/{repo}/git/refs/heads/{branch}",
+                json={"sha": commit["sha"], "force": False}, allow=(422,)
+            )
+            if updated is not None:
+                return commit["sha"]
+        raise GitDataApiError(409, f"{repo}@{branch} moved during commit")
+
+    # -----------------------------------------------------------------
+    # 배포
+    # -----------------------------------------------------------------
+    def deploy(self, tree: DeployTree, repo: str, branch: str, message: str = "Deploy by Eggit") -> str:
+        """
+        repo: "owner/name" / 반환: 새 커밋 SHA
+        - 브랜치가 없으면 생성, 있으면 강제 갱신
+        """
+        head = self._get_branch_head(repo, branch)
+        # 새 브랜치라도 기본 브랜치와 공유하는 blob은 다시 올리지 않음
+        base_head = head or self._get_default_head(repo)
+        if base_head is None:
+            self._bootstrap_empty_repo(repo, branch)
+            base_head = head = self._get_branch_head(repo, branch)
+        remote_blobs = self._get_remote_blobs(repo, base_head) if base_head else set()
+
+        entries = self._collect_entries(tree)
+        with span("upload_blobs"):
+            uploaded = self._upload_missing_blobs(repo, entries, remote_blobs)
+
+        new_tree = self._request("POST", f"/repos/{repo}/git/trees", json={
+            "tree": [{"path": e.path, "mode": e.mode, "type": "blob", "sha": e.sha} for e in entries]
+        })
+        commit = self._request("POST", f"/repos/{repo}/git/commits", json={
+            "message": message,
+            "tree": new_tree["sha"],
+            "parents": [],
+            "author": {"name": "Eggit Bot", "email": "bot@eggit.io"},
+        })
+
+        if head is None:
+            self._request("POST", f"/repos/{repo}/git/refs", json={"ref": f"refs/heads/{branch}", "sha": commit["sha"]})
+        else:
+            self._request("PATCH", f"/repos/{repo}/git/refs/heads/{branch}", json={"sha": commit["sha"], "force": True})
+
+        logger.info(f"✅ Git Data API 배포: {repo}@{branch} (파일 {len(entries)}개, 업로드 blob {uploaded}개)")
+        return commit["sha"]
+
+    def update(
+        self, tree: DeployTree, repo: str, branch: str, message: str = "Update theme by Eggit"
+    ) -> Optional[Tuple[str, List[str]]]:
+        """
+        기존 브랜치 위에 바뀐 경로만 커밋 → (커밋 SHA, 바뀐 경로) / 브랜치가 없으면 None
+        - 바뀐 경로가 없으면 커밋 없이 현재 커밋 반환
+        - 원격에만 있는 파일은 유지, tree.removed 중 원격에 있는 경로는 삭제
+        - 그 사이 브랜치가 움직였으면 최신 커밋 기준으로 다시 비교해 1회 재시도
+        """
+        entries = self._collect_entries(tree)
+        for _ in range(2):
+            head = self._get_branch_head(repo, branch)
+            if head is None:
+                return None
+            base_tree, remote = self._get_remote_tree(repo, head)
+
+            changed = [
+                e for e in entries
+                if e.path not in tree.keep_remote and remote.get(e.path) != (e.mode, e.sha)
+            ]
+            deleted = sorted(path for path in tree.removed if path in remote)
+            if not changed and not deleted:
+                logger.info(f"✅ {repo}@{branch} 변경 없음 (커밋 생략)")
+                return head, []
+
+            with span("upload_blobs"):
+                uploaded = self._upload_missing_blobs(repo, changed, {sha for _, sha in remote.values()})
+            new_tree = self._request("POST", f"/repos/{repo}/git/trees", json={
+                "base_tree": base_tree,
+                "tree": [{"path": e.path, "mode": e.mode, "type": "blob", "sha": e.sha} for e in changed]
+                        + [{"path": path, "mode": "100644", "type": "blob", "sha": None} for path in deleted]
+            })
+            commit = self._request("POST", f"/repos/{repo}/git/commits", json={
+                "message": message,
+                "tree": new_tree["sha"],
+                "parents": [head],
+                "author": {"name": "Eggit Bot", "email": "bot@eggit.io"},
+            })
+            updated = self._request(
+                "PATCH", f"/repos/{repo}/git/refs/heads/{branch}",
+                json={"sha": commit["sha"], "force": False}, allow=(422,)
+            )
+            if updated is not None:
+                paths = [e.path for e in changed] + deleted
+                logger.info(f"✅ Git Data API 업데이트: {repo}@{branch} (변경 경로 {len(paths)}개, 업로드 blob {uploaded}개)")
+                return commit["sha"], paths
+        raise GitDataApiError(409, f"{repo}@{branch} moved during update")
@@ -1,14 +1,17 @@
 import os
-import shutil
-import subprocess
-import uuid
 import requests
 import logging
-import yaml
 import base64
 import binascii
 import mimetypes
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List, Tuple
+
+from app.core.config import settings
+from app.core.deploy_timing import deploy_trace, span
+from app.services.blog.git_data_api import GitDataApiDeployer
+from app.services.blog.template_store import DeployTree, get_template_store
+from app.services.blog.render_cache import load_yaml, dump_yaml, front_matter
+from app.services.blog.artifact_cache import get_artifact_cache, patch, placeholder
 
 CHIRPY_TEMPLATE_PATH = "./templates/eggit_blog_theme"
 DOCS_TEMPLATE_PATH = "./templates/eggit_docs_theme"
@@ -26,79 +29,102 @@ logger.propagate = False
 class BlogDeployService:
     """블로그 배포 서비스 - Chirpy(Tech) & Just-the-Docs(Docs)"""
     
-    def __init__(self, user_token: str):
+    def __init__(self, user_token: str, deploy_backend: Optional[str] = None):
         self.user_token = user_token
-
-    def _run_git(self, cmd: str, cwd: str) -> str:
-        """Git 명령 실행"""
-        result = subprocess.run(
-            cmd, 
-            shell=True, 
-            cwd=cwd, 
-            capture_output=True, 
-            text=True, 
-            timeout=120
-        )
-        if result.returncode != 0:
-            raise Exception(f"Git command failed: {result.stderr}")
-        return result.stdout
+        # "git" | "api" (배포별 선택, 없으면 DEPLOY_BACKEND)
+        self.deploy_backend = deploy_backend or settings.DEPLOY_BACKEND
 
     # =================================================================
     # [Helper] Chirpy Config 수정 (전체 필드 주입)
     # =================================================================
-    def _update_chirpy_config(self, work_dir: str, user_info: dict, avatar_path_rel: Optional[str], repo_name: str):
+    def _update_chirpy_config(self, tree: DeployTree, user_info: dict, avatar_path_rel: Optional[str], repo_name: str):
         """
         Chirpy 테마 설정을 업데이트합니다.
         * avatar_path_rel: _setup_avatar_image에서 결정된 실제 아바타 경로
         * repo_name: BaseURL 설정을 위해 필요
+        - 같은 테마 설정/아바타 유무면 아티팩트 캐시의 variant에 유저별 값만 patch
         """
-        config_path = os.path.join(work_dir, '_config.yml')
-        
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f) or {}
-
-        # 1. 메타데이터 설정
-        config['title'] = user_info.get('blog_title', 'My Tech Blog')
-        config['tagline'] = user_info.get('blog_tagline', '')
-        config['description'] = user_info.get('description', '')
-        config['url'] = f"https://{user_info['github_username']}.github.io"
-        
+        username = user_info['github_username']
         # [Fix] BaseURL 설정 (CSS/JS 로딩 문제 해결의 핵심)
         # username.github.io 포맷이면 baseurl은 빈 문자열, 아니면 /repo_name
-        if repo_name.lower() == f"{user_info['github_username'].lower()}.github.io":
-            config['baseurl'] = ""
-        else:
-            config['baseurl'] = f"/{repo_name}"
-            
-        logger.info(f"✅ BaseURL 설정: '{config.get('baseurl')}' (Repo: {repo_name})")
-        
-        # 2. 아바타 경로 동적 설정 (중요)
+        baseurl = "" if repo_name.lower() == f"{username.lower()}.github.io" else f"/{repo_name}"
+        logger.info(f"✅ BaseURL 설정: '{baseurl}' (Repo: {repo_name})")
+
+        variant = {
+            "theme_settings": user_info.get('theme_settings') or None,
+            "has_avatar": bool(avatar_path_rel),
+        }
+        values = {
+            "title": user_info.get('blog_title', 'My Tech Blog'),
+            "tagline": user_info.get('blog_tagline', ''),
+            "description": user_info.get('description', ''),
+            "url": f"https://{username}.github.io",
+            "baseurl": baseurl,
+            "username": username,
+            "author_name": user_info.get('author_name', username),
+            "email": user_info.get('email', ''),
+            "github_link": f"https://github.com/{username}",
+        }
         if avatar_path_rel:
-            config['avatar'] = avatar_path_rel
-            
+            values["avatar"] = avatar_path_rel
+        self._render_variant_file(tree, '_config.yml', "chirpy_config", variant, values, self._render_chirpy_config)
+        logger.info("✅ Chirpy _config.yml 업데이트 완료")
+
+    @staticmethod
+    def _render_chirpy_config(template_text: Optional[str], inputs: dict) -> str:
+        config = load_yaml(template_text or "") or {}
+
+        # 1. 메타데이터 설정
+        config['title'] = inputs['title']
+        config['tagline'] = inputs['tagline']
+        config['description'] = inputs['description']
+        config['url'] = inputs['url']
+        config['baseurl'] = inputs['baseurl']
+
+        # 2. 아바타 경로 동적 설정 (중요)
+        if inputs['has_avatar']:
+            config['avatar'] = inputs['avatar']
+
         if 'github' not in config: config['github'] = {}
-        config['github']['username'] = user_info['github_username']
+        config['github']['username'] = inputs['username']
         # [Add] 템플릿에서 방문자 추적 등에 사용할 소유자 정보
-        config['repo_owner'] = user_info['github_username']
+        config['repo_owner'] = inputs['username']
 
         if 'social' not in config: config['social'] = {}
-        config['social']['name'] = user_info.get('author_name', user_info['github_username'])
-        config['social']['email'] = user_info.get('email', '')
-        config['social']['links'] = [f"https://github.com/{user_info['github_username']}"]
+        config['social']['name'] = inputs['author_name']
+        config['social']['email'] = inputs['email']
+        config['social']['links'] = [inputs['github_link']]
 
         # 3. 테마 색상 설정
-        if user_info.get('theme_settings'):
-            config['user_custom_theme'] = user_info['theme_settings']
+        if inputs['theme_settings']:
+            config['user_custom_theme'] = inputs['theme_settings']
 
-        with open(config_path, 'w', encoding='utf-8') as f:
-            yaml.dump(config, f, allow_unicode=True, sort_keys=False, default_flow_style=False)
-            
-        logger.info("✅ Chirpy _config.yml 업데이트 완료")
+        return dump_yaml(config, default_flow_style=False)
+
+    @staticmethod
+    def _render_variant_file(
+        tree: DeployTree, path: str, kind: str, variant: dict, values: dict,
+        render: Callable[[Optional[str], dict], str], inline: Tuple[str, ...] = ()
+    ):
+        """
+        유저와 무관한 입력(variant)별로 한 번만 렌더링해 아티팩트 캐시에 두고, 유저별 값(values)만 채워 기록
+        - inline: 문자열 안쪽에 들어가는 값 (owner/repo 등), 허용 문자가 아니면 캐시 없이 직접 렌더링
+        """
+        tokens = {name: placeholder(name, inline=name in inline) for name in values}
+        try:
+            files = get_artifact_cache().get_variant(
+                kind, tree.source_stamp(path), variant,
+                lambda: {path: render(tree.read_text(path), {**variant, **tokens})}
+            )
+            content = patch(files[path], values)
+        except ValueError:
+            content = render(tree.read_text(path), {**variant, **values})
+        tree.write(path, content)
 
     # =================================================================
     # [FIX] 아바타 이미지 설정 (확장자 동적 감지 및 파일명 반환)
     # =================================================================
-    def _setup_avatar_image(self, work_dir: str, user_info: dict) -> Optional[str]:
+    def _setup_avatar_image(self, tree: DeployTree, user_info: dict) -> Optional[str]:
         """
         아바타 이미지를 다운로드/디코딩하여 저장하고, **저장된 파일의 웹 경로**를 반환합니다.
         Return: 예) "/assets/img/avatar.jpg" 또는 None
@@ -106,16 +132,10 @@ class BlogDeployService:
         target_url = user_info.get('avatar_url')
         username = user_info['github_username']
         
-        assets_dir = os.path.join(work_dir, "assets", "img")
-        os.makedirs(assets_dir, exist_ok=True)
-
         # 1. 기존 템플릿의 avatar.* 파일 모두 삭제
-        for f in os.listdir(assets_dir):
+        for f in tree.list_dir("assets/img"):
             if f.startswith("avatar."):
-                try:
-                    os.remove(os.path.join(assets_dir, f))
-                except Exception:
-                    pass
+                tree.remove(f"assets/img/{f}")
         
         # 2. GitHub 프로필 URL 조회 (Fallback)
         if not target_url:
@@ -178,9 +198,7 @@ class BlogDeployService:
 
             # 파일 저장
             if file_content:
-                save_path = os.path.join(assets_dir, final_filename)
-                with open(save_path, 'wb') as f:
-                    f.write(file_content)
+                tree.write(f"assets/img/{final_filename}", file_content)
                 
                 # Chirpy Config에 들어갈 상대 경로 반환
                 return f"/assets/img/{final_filename}"
@@ -194,35 +212,38 @@ class BlogDeployService:
     # =================================================================
     # [Public] 메인 블로그 배포 메서드
     # =================================================================
-    def deploy_chirpy_blog(self, repo_name: str, user_info: dict):
-        """Chirpy 기술 블로그 배포"""
-        work_dir = f"/tmp/eggit_{uuid.uuid4()}"
-        try:
-            # 1. 템플릿 복사
-            shutil.copytree(os.path.abspath(CHIRPY_TEMPLATE_PATH), work_dir)
-            
+    def deploy_chirpy_blog(self, repo_name: str, user_info: dict, update: bool = False):
+        """Chirpy 기술 블로그 배포 (update: 기존 히스토리 위에 바뀐 파일만 커밋)"""
+        owner = user_info['github_username']
+        with deploy_trace("chirpy", f"{owner}/{repo_name}"):
+            # 1. 템플릿(읽기 전용) 위에 유저별 파일만 덮어쓰는 트리 (템플릿 복사 없음)
+            tree = DeployTree(CHIRPY_TEMPLATE_PATH)
+
             # 2. 아바타 이미지를 먼저 처리하여 파일명을 확정
-            avatar_path_rel = self._setup_avatar_image(work_dir, user_info)
-            
+            with span("avatar"):
+                avatar_path_rel = self._setup_avatar_image(tree, user_info)
+
             # 3. 확정된 아바타 경로를 Config에 주입
-            self._update_chirpy_config(work_dir, user_info, avatar_path_rel, repo_name)
-            
+            with span("render_config"):
+                self._update_chirpy_config(tree, user_info, avatar_path_rel, repo_name)
+
             # 4. Git 배포 진행
             # [New] CSS Override for Chirpy Font Customization
             if user_info.get('theme_settings'):
-                self._inject_chirpy_custom_css(work_dir, user_info['theme_settings'])
-            
-            repo_url = f"https://{self.user_token}@github.com/{user_info['github_username']}/{repo_name}.git"
-            self._git_deploy(work_dir, repo_url, 'main')
-            
-            # 5. Pages 활성화
-            self._enable_github_pages(user_info['github_username'], repo_name, 'main', 'workflow')
-            
-            logger.info("🎉 Chirpy 배포 완료")
-        finally:
-            shutil.rmtree(work_dir, ignore_errors=True)
+                with span("render_css"):
+                    self._inject_chirpy_custom_css(tree, user_info['theme_settings'])
 
-    def _inject_chirpy_custom_css(self, work_dir: str, settings: dict):
+            with span("deploy_tree"):
+                updated = self._deploy_tree(tree, owner, repo_name, 'main', update=update)
+
+            # 5. Pages 활성화 (기존 브랜치 업데이트면 이미 설정되어 있음)
+            if not updated:
+                with span("pages"):
+                    self._enable_github_pages(owner, repo_name, 'main', 'workflow')
+
+        logger.info("🎉 Chirpy 배포 완료")
+
+    def _inject_chirpy_custom_css(self, tree: DeployTree, settings: dict):
         """Chirpy 테마에 커스텀 폰트 CSS 주입"""
         font_url = settings.get('font_import_url', '')
         font_family = settings.get('font_family_base', '')
@@ -235,8 +256,7 @@ class BlogDeployService:
         # assets/css/style.scss에 덧붙여야 함.
         # 안전하게 assets/css/style.scss (없으면 생성)에 append.
         
-        css_path = os.path.join(work_dir, 'assets', 'css', 'style.scss')
-        os.makedirs(os.path.dirname(css_path), exist_ok=True)
+        css_path = 'assets/css/style.scss'
         
         css_content = ["\n/* Eggit Custom Font Override */"]
         if font_url:
@@ -246,9 +266,12 @@ class BlogDeployService:
             # Chirpy uses --font-family-sans variables usually, but simple override works best
             css_content.append(f"body {{ font-family: {font_family}, sans-serif !important; }}")
             css_content.append(f":root {{ --font-family-sans: {font_family}, sans-serif; }}")
-            
-        with open(css_path, 'a', encoding='utf-8') as f:
-            f.write("\n".join(css_content))
+
+        files = get_artifact_cache().get_variant(
+            "chirpy_font_css", tree.source_stamp(css_path), {"font_url": font_url, "font_family": font_family},
+            lambda: {css_path: (tree.read_text(css_path) or "") + "\n".join(css_content)}
+        )
+        tree.write(css_path, files[css_path])
             
         logger.info(f"✅ Chirpy Custom Font CSS Injected")
 
@@ -277,29 +300,44 @@ class BlogDeployService:
             scss.append(f"$font-family-base: {font_family}, -apple-system, blinkmacsystemfont, 'Segoe UI', roboto, helvetica, arial, sans-serif;")
         return "\n".join(scss)
 
-    def _write_docs_scss_file(self, work_dir: str, scss_content: str):
-        scss_path = os.path.join(work_dir, '_sass', 'color_schemes', 'eggit_custom.scss')
-        os.makedirs(os.path.dirname(scss_path), exist_ok=True)
-        with open(scss_path, 'w', encoding='utf-8') as f:
-            f.write(scss_content)
+    def _render_docs_scss(self, settings: dict) -> str:
+        """같은 테마 설정이면 아티팩트 캐시 결과 재사용"""
+        path = '_sass/color_schemes/eggit_custom.scss'
+        files = get_artifact_cache().get_variant("docs_scss", "", settings, lambda: {path: self._generate_docs_scss(settings)})
+        return files[path]
+
+    def _write_docs_scss_file(self, tree: DeployTree, scss_content: str):
+        tree.write('_sass/color_schemes/eggit_custom.scss', scss_content)
         logger.info(f"✅ Docs 3-Color SCSS 생성 완료")
 
     # =================================================================
     # [FIX] Docs 설정 업데이트 (메뉴 증발 버그 수정 핵심)
     # =================================================================
-    def _update_docs_config(self, work_dir: str, project_info: dict, owner: str, repo: str):
-        config_path = os.path.join(work_dir, '_config.yml')
-        with open(config_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        content = content.replace("__REPO_NAME__", repo)
+    def _update_docs_config(self, tree: DeployTree, project_info: dict, owner: str, repo: str):
+        values = {
+            "owner": owner,
+            "repo": repo,
+            "title": project_info.get('project_name', repo),
+            "description": project_info.get('description', 'Documentation'),
+            "url": f"https://{owner}.github.io",
+            "baseurl": f"/{repo}",
+        }
+        self._render_variant_file(
+            tree, '_config.yml', "docs_config", {}, values, self._render_docs_config, inline=("owner", "repo")
+        )
+        logger.info(f"✅ Docs _config.yml 업데이트 완료 (permalink: pretty 적용)")
+
+    @staticmethod
+    def _render_docs_config(template_text: Optional[str], inputs: dict) -> str:
+        owner, repo = inputs['owner'], inputs['repo']
+        content = (template_text or "").replace("__REPO_NAME__", repo)
         content = content.replace("__GITHUB_USERNAME__", owner)
-        config = yaml.safe_load(content) or {}
+        config = load_yaml(content) or {}
 
-        config['title'] = project_info.get('project_name', repo)
-        config['description'] = project_info.get('description', 'Documentation')
-        config['url'] = f"https://{owner}.github.io"
-        config['baseurl'] = f"/{repo}"
+        config['title'] = inputs['title']
+        config['description'] = inputs['description']
+        config['url'] = inputs['url']
+        config['baseurl'] = inputs['baseurl']
         
         # [핵심 수정] URL 매칭 오류 방지를 위한 Pretty Permalink 설정
         config['permalink'] = 'pretty' 
@@ -313,23 +351,37 @@ class BlogDeployService:
 
         config['color_scheme'] = 'eggit_custom'
 
-        with open(config_path, 'w', encoding='utf-8') as f:
-            yaml.dump(config, f, allow_unicode=True, sort_keys=False)
-        
-        logger.info(f"✅ Docs _config.yml 업데이트 완료 (permalink: pretty 적용)")
+        return dump_yaml(config)
 
     # --------------------------------------------------------------------------------
     # 공통 Git 및 Pages 메서드
     # --------------------------------------------------------------------------------
-    def _git_deploy(self, work_dir: str, repo_url: str, branch: str):
-        self._run_git("git init", work_dir)
-        self._run_git(f"git checkout -b {branch}", work_dir)
-        self._run_git("git config user.name 'Eggit Bot'", work_dir)
-        self._run_git("git config user.email 'bot@eggit.io'", work_dir)
-        self._run_git("git add -A", work_dir)
-        self._run_git("git commit -m 'Deploy by Eggit'", work_dir)
-        self._run_git(f"git remote add origin {repo_url}", work_dir)
-        self._run_git(f"git push origin {branch} --force", work_dir)
+    def _deploy_tree(self, tree: DeployTree, owner: str, repo: str, branch: str, update: bool = False) -> bool:
+        """
+        템플릿 오브젝트 저장소에서 커밋을 조립해 변경분만 push (api 백엔드는 HTTP로만 커밋)
+        - update: 기존 브랜치 위에 바뀐 경로만 커밋 (브랜치가 없으면 전체 배포) → 기존 브랜치를 업데이트했으면 True
+        """
+        repo_url = f"https://{self.user_token}@github.com/{owner}/{repo}.git"
+        if update:
+            if self.deploy_backend == "api":
+                with GitDataApiDeployer(self.user_token) as deployer:
+                    result = deployer.update(tree, f"{owner}/{repo}", branch)
+            else:
+                result = get_template_store().update(tree, repo_url, branch, deploy_key=f"{owner}/{repo}")
+            if result is not None:
+                commit_sha, changed = result
+                logger.info(f"✅ 업데이트 완료: {owner}/{repo}@{branch} ({commit_sha[:7]}, 변경 경로 {len(changed)}개)")
+                return True
+            logger.info(f"ℹ️ {owner}/{repo}@{branch} 브랜치가 없어 전체 배포로 진행")
+
+        if self.deploy_backend == "api":
+            with GitDataApiDeployer(self.user_token) as deployer:
+                deployer.deploy(tree, f"{owner}/{repo}", branch)
+            return False
+
+        commit_sha = get_template_store().deploy(tree, repo_url, branch, deploy_key=f"{owner}/{repo}")
+        logger.info(f"✅ Push 완료: {owner}/{repo}@{branch} ({commit_sha[:7]}, 덮어쓴 파일 {len(tree.files)}개)")
+        return False
 
     def _enable_github_pages(self, owner: str, repo: str, branch: str, build_type: str):
         headers = {
@@ -338,10 +390,10 @@ class BlogDeployService:
             "X-GitHub-Api-Version": "2022-11-28"
         }
         try:
-            requests.delete(f"https://api.github.com/repos/{owner}/{repo}/branches/{branch}/protection", headers=headers)
+            requests.delete(f"{settings.GITHUB_API_URL}/repos/{owner}/{repo}/branches/{branch}/protection", headers=headers)
         except Exception: pass
 
-        pages_url = f"https://api.github.com/repos/{owner}/{repo}/pages"
+        pages_url = f"{settings.GITHUB_API_URL}/repos/{owner}/{repo}/pages"
         payload = {"build_type": "workflow"} if build_type == "workflow" else {"source": {"branch": branch, "path": "/"}}
         try:
             res = requests.post(pages_url, headers=headers, json=payload)
@@ -351,82 +403,82 @@ class BlogDeployService:
     # --------------------------------------------------------------------------------
     # AI 구조 생성 관련 메서드 (유지 및 수정)
     # --------------------------------------------------------------------------------
-    def _generate_docs_files(self, work_dir: str, nodes: list):
+    def _generate_docs_files(self, tree: DeployTree, nodes: list):
+        """AI 문서 구조 전체를 메모리에서 렌더링한 뒤 트리에 한 번에 기록"""
         if not nodes: return
-        self._create_root_index(work_dir, nodes[0])
-        remaining_nodes = nodes[1:]
-        if remaining_nodes:
-            self._process_recursive(work_dir, remaining_nodes, parent_path="docs", ancestors=[])
-
-    def _process_recursive(self, work_dir: str, nodes: list, parent_path: str, ancestors: List[str]):
-        base_path = os.path.join(work_dir, parent_path)
-        if not os.path.exists(base_path): os.makedirs(base_path, exist_ok=True)
-
-        for node in nodes:
+        files = {"index.md": self._create_root_index(nodes[0])}
+        files.update(self._render_docs_nodes(nodes[1:], parent_path="docs"))
+        tree.write_many(files)
+        logger.info(f"✅ Docs 페이지 {len(files)}개 생성")
+
+    def _render_docs_nodes(self, nodes: list, parent_path: str) -> Dict[str, str]:
+        """구조를 재귀 호출 없이 전위 순회하며 {경로: 내용} 생성 (같은 경로면 나중 노드가 덮어씀)"""
+        files: Dict[str, str] = {}
+        stack = [(node, parent_path, []) for node in reversed(nodes)]
+        while stack:
+            node, parent, ancestors = stack.pop()
             # 안전한 폴더명 생성
             safe_name = "".join([c for c in node['title'].lower().replace(" ", "-") if c.isalnum() or c == "-"])
             if not safe_name: safe_name = node['title'] # fallback
 
-            current_path = os.path.join(base_path, safe_name)
-            current_ancestors = ancestors + [node['title']]
+            current_path = f"{parent}/{safe_name}"
 
             if node['is_directory']:
-                os.makedirs(current_path, exist_ok=True)
-                with open(os.path.join(current_path, "index.md"), "w", encoding="utf-8") as f:
-                    f.write(self._create_front_matter(node, True, ancestors))
-                if 'children' in node and node['children']:
-                    self._process_recursive(work_dir, node['children'], os.path.join(parent_path, safe_name), current_ancestors)
+                files[f"{current_path}/index.md"] = self._create_front_matter(node, True, ancestors)
+                children = node.get('children') or []
+                child_ancestors = ancestors + [node['title']]
+                stack.extend((child, current_path, child_ancestors) for child in reversed(children))
             else:
-                with open(f"{current_path}.md", "w", encoding="utf-8") as f:
-                    f.write(self._create_front_matter(node, False, ancestors))
+                files[f"{current_path}.md"] = self._create_front_matter(node, False, ancestors)
+        return files
 
     # =================================================================
     # [Fix] Front Matter 생성 로직 (Nav Order 및 Escape 강화)
     # =================================================================
     def _create_front_matter(self, node: dict, is_index: bool, ancestors: List[str]) -> str:
-        lines = ["---", "layout: default"]
-        
-        # Title Escape 처리
-        safe_title = node['title'].replace('"', '\\"')
-        lines.append(f"title: \"{safe_title}\"")
-        
-        if len(ancestors) > 0:
-            lines.append(f"parent: \"{ancestors[-1]}\"")
-            if len(ancestors) > 1: lines.append(f"grand_parent: \"{ancestors[-2]}\"")
-        
-        # [중요] nav_order가 있으면 꼭 기입
-        if 'nav_order' in node and node['nav_order']:
-            lines.append(f"nav_order: {node['nav_order']}")
-            
-        if is_index: lines.append("has_children: true")
-        lines.append("---\n")
-        lines.append(f"# {node['title']}\n")
-        lines.append(f"{node.get('description', 'Auto-generated documentation page.')}\n")
-        return "\n".join(lines)
+        # 문자열 값은 front_matter에서 이스케이프 (따옴표/역슬래시 포함 제목도 안전)
+        return front_matter(
+            [
+                ("layout", "default"),
+                ("title", node['title']),
+                ("parent", ancestors[-1] if ancestors else None),
+                ("grand_parent", ancestors[-2] if len(ancestors) > 1 else None),
+                # [중요] nav_order가 있으면 꼭 기입
+                ("nav_order", node.get('nav_order') or None),
+                ("has_children", True if is_index else None),
+            ],
+            body=f"# {node['title']}\n\n{node.get('description', 'Auto-generated documentation page.')}\n",
+        )
 
-    def _create_root_index(self, base_path: str, node: dict):
+    def _create_root_index(self, node: dict) -> str:
         node['nav_order'] = 1 
-        with open(os.path.join(base_path, "index.md"), "w", encoding="utf-8") as f:
-            f.write(self._create_front_matter(node, False, [])) 
         logger.info(f"✅ Root index.md created from '{node['title']}'")
+        return self._create_front_matter(node, False, [])
 
     # [Docs] 문서 사이트 배포 메서드
-    def deploy_docs_site(self, target_repo_full_name: str, project_info: dict, docs_structure: Optional[dict] = None):
+    def deploy_docs_site(
+        self, target_repo_full_name: str, project_info: dict, docs_structure: Optional[dict] = None, update: bool = False
+    ):
         owner, repo = target_repo_full_name.split('/')
-        work_dir = f"/tmp/eggit_{uuid.uuid4()}"
-        try:
-            shutil.copytree(os.path.abspath(DOCS_TEMPLATE_PATH), work_dir)
+        with deploy_trace("docs", target_repo_full_name):
+            tree = DeployTree(DOCS_TEMPLATE_PATH)
             if docs_structure and 'root_structure' in docs_structure:
-                self._generate_docs_files(work_dir, docs_structure['root_structure'])
+                with span("render_docs"):
+                    self._generate_docs_files(tree, docs_structure['root_structure'])
+            else:
+                # 새 문서 구조 없이 테마/설정만 바꾸는 경우 기존 홈 페이지를 템플릿 index.md로 덮지 않음
+                tree.keep_remote.add("index.md")
             if project_info.get('theme_settings'):
-                self._write_docs_scss_file(work_dir, self._generate_docs_scss(project_info['theme_settings']))
-            
+                with span("render_css"):
+                    self._write_docs_scss_file(tree, self._render_docs_scss(project_info['theme_settings']))
+
             # [Fix] Config 업데이트 (permalink: pretty 추가됨)
-            self._update_docs_config(work_dir, project_info, owner, repo)
-            
-            repo_url = f"https://{self.user_token}@github.com/{target_repo_full_name}.git"
-            self._git_deploy(work_dir, repo_url, 'gh-pages')
-            self._enable_github_pages(owner, repo, 'gh-pages', 'legacy')
-            logger.info(f"🎉 Docs 배포 완료")
-        finally:
-            if os.path.exists(work_dir): shutil.rmtree(work_dir, ignore_errors=True)
\ No newline at end of file
+            with span("render_config"):
+                self._update_docs_config(tree, project_info, owner, repo)
+
+            with span("deploy_tree"):
+                updated = self._deploy_tree(tree, owner, repo, 'gh-pages', update=update)
+            if not updated:
+                with span("pages"):
+                    self._enable_github_pages(owner, repo, 'gh-pages', 'legacy')
+        logger.info(f"🎉 Docs 배포 완료")
\ No newline at end of file
@@ -0,0 +1,204 @@
+"""
+블로그 이미지 업로드 파이프라인
+
+- 처리(process_image): 전용 스레드풀에서 실행 (Pillow는 리사이즈/인코딩 중 GIL을 놓음 → 이벤트 루프 비차단)
+  - EXIF 회전 반영 후 반응형 너비(BLOG_IMAGE_WIDTHS)별 WebP 변형 생성 (원본보다 큰 너비는 만들지 않음)
+  - 원본 포맷 fallback 1개 (최대 너비로 축소, 이미 작으면 원본 바이트 그대로)
+  - LQIP: 실제로 디코딩 가능한 초소형 블러 WebP (data URI)
+- 중복 제거: 원본 바이트 SHA-256으로 경로를 정하고, 같은 저장소에 이미 올린 이미지는 Redis에 남긴 결과를 그대로 반환 (GitHub 호출 없음)
+- 커밋: 변형 전체를 Git Data API로 한 커밋에 업로드 (GithubWriter, GitHub 전용 스레드풀)
+"""
+import asyncio
+import base64
+import hashlib
+import io
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import orjson
+from app.core.config import settings
+from app.services.github.github_writer import GithubWriter, run_blocking
+
+KEY_PREFIX = "eggit:blogimg"
+
+# Pillow로 다시 인코딩하지 않고 그대로 올리는 형식 (벡터/애니메이션)
+_PASSTHROUGH_EXTS = {".svg", ".gif"}
+_FORMAT_EXTS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}
+_CONTENT_TYPES = {".jpg": "image/jpeg", ".png": "image/png", ".webp": "image/webp", ".svg": "image/svg+xml", ".gif": "image/gif"}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_async_redis = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.BLOG_IMAGE_WORKERS, thread_name_prefix="blog-image")
+    return _executor
+
+
+def _get_async_redis():
+    global _async_redis
+    if _async_redis is None:
+        import redis.asyncio as redis
+        _async_redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _async_redis
+
+
+def _dedup_key(repo_name: str, digest: str) -> str:
+    return f"{KEY_PREFIX}:{repo_name.lower()}:{digest}"
+
+
+@dataclass
+class ImageVariant:
+    path: str
+    content: bytes
+    width: Optional[int] = None
+    content_type: str = "image/webp"
+
+
+@dataclass
+class ProcessedImage:
+    digest: str
+    fallback: ImageVariant                       # 원본 포맷 (WebP 미지원 환경/원본 보관용)
+    variants: List[ImageVariant] = field(default_factory=list)  # 너비 오름차순 WebP
+    width: Optional[int] = None
+    height: Optional[int] = None
+    lqip: Optional[str] = None
+
+    @property
+    def files(self) -> Dict[str, bytes]:
+        return {v.path: v.content for v in [self.fallback, *self.variants]}
+
+    def to_response(self, alt: str) -> Dict[str, Any]:
+        main = self.variants[-1] if self.variants else self.fallback
+        return {
+            "path": f"/{main.path}",
+            "alt": alt,
+            "lqip": self.lqip,
+            "width": self.width,
+            "height": self.height,
+            "original": f"/{self.fallback.path}",
+            "srcset": ", ".join(f"/{v.path} {v.width}w" for v in self.variants),
+            "variants": [{"path": f"/{v.path}", "width": v.width, "type": v.content_type} for v in self.variants],
+        }
+
+
+def _safe_stem(filename: str) -> str:
+    stem = os.path.splitext(os.path.basename(filename or ""))[0]
+    # URL에 그대로 쓸 수 있도록 ASCII만 남김 (한글 등은 "image")
+    return re.sub(r"[^A-Za-z0-9_-]+", "-", stem).strip("-")[:60] or "image"
+
+
+def _encode(img, fmt: str, **options) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format=fmt, **options)
+    return buf.getvalue()
+
+
+def _make_lqip(img) -> str:
+    from PIL import ImageFilter
+
+    thumb = img.copy()
+    thumb.thumbnail((settings.BLOG_IMAGE_LQIP_WIDTH, settings.BLOG_IMAGE_LQIP_WIDTH))
+    thumb = thumb.filter(ImageFilter.GaussianBlur(1))
+    data = _encode(thumb, "WEBP", quality=30, method=4)
+    return f"data:image/webp;base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def process_image(content: bytes, filename: str) -> ProcessedImage:
+    """CPU 작업 (스레드풀에서 실행) - 디코딩 불가/벡터/애니메이션은 원본 그대로"""
+    digest = hashlib.sha256(content).hexdigest()
+    base_dir = f"{settings.BLOG_IMAGE_DIR}/{digest[:16]}"
+    stem = _safe_stem(filename)
+    ext = os.path.splitext(filename or "")[1].lower()
+
+    def passthrough() -> ProcessedImage:
+        ext_ = ext if ext in _CONTENT_TYPES else ".bin"
+        return ProcessedImage(
+            digest=digest,
+            fallback=ImageVariant(f"{base_dir}/{stem}{ext_}", content, content_type=_CONTENT_TYPES.get(ext_, "application/octet-stream"))
+        )
+
+    if ext in _PASSTHROUGH_EXTS:
+        return passthrough()
+
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        img = Image.open(io.BytesIO(content))
+        source_format = img.format
+        img = ImageOps.exif_transpose(img)
+        img.load()
+    except (UnidentifiedImageError, OSError):
+        return passthrough()
+    if getattr(img, "is_animated", False):
+        return passthrough()
+
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+
+    width, height = img.size
+    max_width = max(settings.BLOG_IMAGE_WIDTHS)
+
+    # 원본 포맷 fallback (큰 이미지는 최대 너비로 축소)
+    fallback_ext = _FORMAT_EXTS.get(source_format, ".png")
+    if width <= max_width and source_format in _FORMAT_EXTS:
+        fallback_content = content
+    else:
+        resized = img.resize((max_width, round(height * max_width / width)), Image.LANCZOS) if width > max_width else img
+        fmt = "JPEG" if fallback_ext == ".jpg" else fallback_ext[1:].upper()
+        if fmt == "JPEG" and resized.mode == "RGBA":
+            resized = resized.convert("RGB")
+        fallback_content = _encode(resized, fmt, quality=85, optimize=True) if fmt == "JPEG" else _encode(resized, fmt, optimize=True)
+    processed = ProcessedImage(
+        digest=digest,
+        fallback=ImageVariant(f"{base_dir}/{stem}{fallback_ext}", fallback_content, min(width, max_width), _CONTENT_TYPES[fallback_ext]),
+        width=min(width, max_width),
+        height=round(height * min(width, max_width) / width),
+        lqip=_make_lqip(img),
+    )
+
+    # 반응형 WebP (원본보다 작은 너비 + 원본 너비가 최대 너비보다 작으면 원본 너비 1개)
+    targets = sorted({w for w in settings.BLOG_IMAGE_WIDTHS if w < width} | {min(width, max_width)})
+    for target in targets:
+        resized = img if target == width else img.resize((target, round(height * target / width)), Image.LANCZOS)
+        processed.variants.append(ImageVariant(
+            f"{base_dir}/{stem}-{target}w.webp",
+            _encode(resized, "WEBP", quality=settings.BLOG_IMAGE_WEBP_QUALITY, method=4),
+            target,
+        ))
+    return processed
+
+
+async def upload_image(token: str, repo_name: str, content: bytes, filename: str) -> Dict[str, Any]:
+    """
+    이미지 처리 + 업로드 (같은 저장소에 같은 이미지를 다시 올리면 GitHub 호출 없이 이전 결과 반환)
+    """
+    digest = hashlib.sha256(content).hexdigest()
+    alt = os.path.splitext(os.path.basename(filename or ""))[0] or "image"
+    key = _dedup_key(repo_name, digest)
+
+    try:
+        cached = await _get_async_redis().get(key)
+        if cached:
+            return {**orjson.loads(cached), "alt": alt, "deduplicated": True}
+    except Exception as e:
+        print(f"⚠️ [BlogImage] dedup lookup failed: {e}")
+
+    loop = asyncio.get_running_loop()
+    processed = await loop.run_in_executor(_get_executor(), process_image, content, filename)
+
+    await run_blocking(
+        GithubWriter(token).commit_files, repo_name, processed.files, message=f"Upload image: {filename} (via Eggit)"
+    )
+    result = processed.to_response(alt)
+
+    try:
+        await _get_async_redis().set(key, orjson.dumps(result), ex=settings.BLOG_IMAGE_DEDUP_TTL_SECONDS)
+    except Exception as e:
+        print(f"⚠️ [BlogImage] dedup save failed: {e}")
+    return {**result, "deduplicated": False}
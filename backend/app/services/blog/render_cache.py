@@ -0,0 +1,86 @@
+"""
+배포 렌더링 캐시 + 빠른 YAML/front matter 직렬화
+
+- RenderCache: 렌더 결과의 워커 프로세스별 LRU (DEPLOY_RENDER_CACHE_SIZE)
+  - 키: 렌더 종류 + 원본 파일 식별자(DeployTree.source_stamp) + 입력 값 (orjson 정렬 직렬화 → SHA-256)
+  - 디스크 아티팩트 캐시(artifact_cache)의 메모리 계층
+- YAML은 libyaml(C) 로더/덤퍼가 있으면 사용
+- front matter는 YAML 라이브러리 없이 직접 직렬화 (문자열은 JSON 큰따옴표 표기 = 유효한 YAML 스칼라)
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Tuple
+
+import orjson
+import yaml
+
+from app.core.config import settings
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def load_yaml(text: str) -> Any:
+    return yaml.load(text, Loader=_Loader)
+
+
+def dump_yaml(data: Any, **options) -> str:
+    return yaml.dump(data, Dumper=_Dumper, allow_unicode=True, sort_keys=False, **options)
+
+
+def _scalar(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return json.dumps(str(value), ensure_ascii=False)
+
+
+def front_matter(fields: List[Tuple[str, Any]], body: str = "") -> str:
+    """[(키, 값)] 순서대로 front matter 작성 (값이 None이면 생략)"""
+    lines = ["---"]
+    lines.extend(f"{key}: {_scalar(value)}" for key, value in fields if value is not None)
+    lines.append("---\n")
+    if body:
+        lines.append(body)
+    return "\n".join(lines)
+
+
+class RenderCache:
+    """렌더 결과 LRU (스레드 안전)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(kind: str, source: str, inputs: Dict[str, Any]) -> str:
+        raw = orjson.dumps([kind, source, inputs], option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        return hashlib.sha256(raw).hexdigest()
+
+    def get_or_render(self, key: str, render: Callable[[], str]) -> str:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        rendered = render()
+        with self._lock:
+            self._entries[key] = rendered
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return rendered
+
+    def snapshot(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+render_cache = RenderCache(settings.DEPLOY_RENDER_CACHE_SIZE)
@@ -0,0 +1,125 @@
+"""
+블로그 저장소 메타데이터 캐시 (포스팅 업로드 fast path)
+
+포스팅 1건마다 get_user → get_repo → get_branch(→ gh-pages/기본 브랜치) → get_contents → update_file
+순서로 5~7번 API를 호출하던 것을, 캐시가 맞는 흔한 경우 쓰기 1번(PUT contents)으로 줄입니다.
+
+- 유저 login: eggit:repometa:login:{user_id}
+- 저장소별 해시 eggit:repometa:{owner/repo} (REPO_META_TTL_SECONDS)
+  - branch:{요청 브랜치}:{docs|posts} → 실제 쓸 브랜치 (gh-pages/기본 브랜치 fallback 결과)
+  - sha:{브랜치}:{경로} → 마지막으로 알려진 blob SHA (블로그 구조 조회 시 트리에서 채움, 쓰기 후 갱신)
+- 쓰기가 충돌(409/422)하거나 브랜치가 사라지면(404) 저장소 항목 전체를 무효화하고 다시 조회
+- Redis 장애 시에는 캐시 없이 GitHub 조회로 동작
+"""
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+KEY_PREFIX = "eggit:repometa"
+
+
+def _repo_key(repo_full_name: str) -> str:
+    return f"{KEY_PREFIX}:{repo_full_name.lower()}"
+
+
+def _login_key(user_id: int) -> str:
+    return f"{KEY_PREFIX}:login:{user_id}"
+
+
+def _sha_field(branch: str, path: str) -> str:
+    return f"sha:{branch}:{path.lstrip('/')}"
+
+
+def _branch_field(requested: str, theme_type: str) -> str:
+    # fallback 규칙은 docs 여부로만 갈림 (chirpy/tech_blog는 같은 항목 사용)
+    return f"branch:{requested}:{'docs' if theme_type == 'docs' else 'posts'}"
+
+
+def _hget(redis_client, key: str, field: str) -> Optional[str]:
+    try:
+        return redis_client.hget(key, field)
+    except Exception as e:
+        print(f"⚠️ [RepoMeta] cache read failed: {e}")
+        return None
+
+
+def _hset(redis_client, key: str, mapping: Dict[str, str]):
+    try:
+        pipe = redis_client.pipeline()
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, settings.REPO_META_TTL_SECONDS)
+        pipe.execute()
+    except Exception as e:
+        print(f"⚠️ [RepoMeta] cache write failed: {e}")
+
+
+# =========================================================
+# Celery 워커 (sync)
+# =========================================================
+
+def resolve_login(redis_client, writer, user_id: int) -> str:
+    try:
+        login = redis_client.get(_login_key(user_id))
+    except Exception:
+        login = None
+    if login:
+        return login
+    login = writer.get_login()
+    try:
+        redis_client.set(_login_key(user_id), login, ex=settings.REPO_META_TTL_SECONDS)
+    except Exception as e:
+        print(f"⚠️ [RepoMeta] cache write failed: {e}")
+    return login
+
+
+def resolve_branch(redis_client, writer, repo_full_name: str, requested: str, theme_type: str) -> str:
+    """요청 브랜치가 없으면 docs는 gh-pages, 그 외(또는 gh-pages도 없으면) 기본 브랜치"""
+    field = _branch_field(requested, theme_type)
+    cached = _hget(redis_client, _repo_key(repo_full_name), field)
+    if cached:
+        return cached
+
+    branch = requested
+    if not writer.branch_exists(repo_full_name, requested):
+        if theme_type == "docs" and writer.branch_exists(repo_full_name, "gh-pages"):
+            branch = "gh-pages"
+        else:
+            branch = writer.get_default_branch(repo_full_name)
+        print(f"🔧 [RepoMeta] Branch Adjusted: '{requested}' -> '{branch}' ({repo_full_name})")
+
+    _hset(redis_client, _repo_key(repo_full_name), {field: branch})
+    return branch
+
+
+def get_file_sha(redis_client, repo_full_name: str, branch: str, path: str) -> Optional[str]:
+    return _hget(redis_client, _repo_key(repo_full_name), _sha_field(branch, path))
+
+
+def remember_file_sha(redis_client, repo_full_name: str, branch: str, path: str, sha: str):
+    _hset(redis_client, _repo_key(repo_full_name), {_sha_field(branch, path): sha})
+
+
+def invalidate(redis_client, repo_full_name: str):
+    try:
+        redis_client.delete(_repo_key(repo_full_name))
+    except Exception as e:
+        print(f"⚠️ [RepoMeta] cache invalidate failed: {e}")
+
+
+# =========================================================
+# API 프로세스 (async) - 블로그 구조 조회 결과로 채움
+# =========================================================
+
+async def seed_file_shas(async_redis, repo_full_name: str, branch: str, theme_type: str, shas: Dict[str, str]):
+    """블로그 구조 조회 때 받은 트리(경로 → blob SHA)를 저장 (트리가 있으면 브랜치도 존재하므로 브랜치 확인 결과도 기록)"""
+    if not shas:
+        return
+    mapping = {_sha_field(branch, path): sha for path, sha in shas.items()}
+    mapping[_branch_field(branch, theme_type)] = branch
+    try:
+        pipe = async_redis.pipeline()
+        pipe.hset(_repo_key(repo_full_name), mapping=mapping)
+        pipe.expire(_repo_key(repo_full_name), settings.REPO_META_TTL_SECONDS)
+        await pipe.execute()
+    except Exception as e:
+        print(f"⚠️ [RepoMeta] seed failed: {e}")
@@ -0,0 +1,367 @@
+"""
+템플릿 오브젝트 저장소 (Template Object Store)
+
+배포마다 테마 전체를 /tmp에 복사하고 git init/add/commit 하던 방식 대신,
+테마는 로컬 bare 저장소에 한 번만 커밋(해시)해 두고 배포 시에는 유저별 파일만 덮어씁니다.
+
+- DeployTree: 템플릿(읽기 전용) + 유저별 덮어쓰기/삭제 파일 (배포 백엔드 공용)
+- TemplateStore.base_tree: 템플릿 디렉토리 -> 트리 SHA (파일 목록/크기/수정 시각이 같으면 재사용)
+- TemplateStore.build_commit: base 트리에 유저별 blob만 얹어 새 커밋 생성 (임시 인덱스 사용, 작업 디렉토리 없음)
+- TemplateStore.push: 대상 저장소에 이미 있는 오브젝트는 제외하고 변경분만 전송
+  (마지막 배포 커밋을 refs/deploys/* 에 남겨 두어 push 협상 시 원격과 공통 조상으로 사용)
+- TemplateStore.update: 대상 브랜치 최신 커밋(depth=1)을 받아 그 트리에 렌더링 결과를 덮어쓴 뒤
+  바뀐 경로가 있을 때만 기존 히스토리 위에 커밋 (강제 push 없음, 유저 포스트/이미지 유지)
+  - 받아온 커밋은 배포별 임시 ref에만 두고 push 후 삭제 (유저 저장소 스냅샷을 계속 붙잡지 않음)
+  - shallow fetch는 저장소의 shallow 파일을 고치므로 파일 락으로 프로세스 간 직렬화
+- TemplateStore.gc: 참조가 끊긴 유저 저장소 오브젝트 정리 (Celery beat, deploy 큐)
+"""
+import fcntl
+import hashlib
+import os
+import subprocess
+import tempfile
+import threading
+import uuid
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from app.core.config import settings
+from app.core.deploy_timing import span
+
+GIT_IDENTITY = {
+    "GIT_AUTHOR_NAME": "Eggit Bot",
+    "GIT_AUTHOR_EMAIL": "bot@eggit.io",
+    "GIT_COMMITTER_NAME": "Eggit Bot",
+    "GIT_COMMITTER_EMAIL": "bot@eggit.io",
+}
+EMPTY_SHA = "0" * 40
+
+
+class DeployTree:
+    """
+    배포할 파일 트리 = 템플릿 디렉토리(읽기 전용) + 유저별 파일 덮어쓰기/삭제
+    - 경로는 저장소 루트 기준 POSIX 상대 경로 ("assets/img/avatar.png")
+    """
+
+    def __init__(self, template_dir: str):
+        self.template_dir = os.path.abspath(template_dir)
+        self.files: Dict[str, bytes] = {}
+        self.removed: Set[str] = set()
+        # update 배포에서 원격 내용을 그대로 둘 경로 (예: AI가 생성한 docs 홈 index.md)
+        self.keep_remote: Set[str] = set()
+
+    @staticmethod
+    def _norm(path: str) -> str:
+        return path.replace(os.sep, "/").strip("/")
+
+    def _template_path(self, path: str) -> str:
+        return os.path.join(self.template_dir, *path.split("/"))
+
+    def exists(self, path: str) -> bool:
+        path = self._norm(path)
+        if path in self.files:
+            return True
+        return path not in self.removed and os.path.isfile(self._template_path(path))
+
+    def read_bytes(self, path: str) -> Optional[bytes]:
+        path = self._norm(path)
+        if path in self.files:
+            return self.files[path]
+        if path in self.removed or not os.path.isfile(self._template_path(path)):
+            return None
+        with open(self._template_path(path), "rb") as f:
+            return f.read()
+
+    def read_text(self, path: str) -> Optional[str]:
+        content = self.read_bytes(path)
+        return content.decode("utf-8") if content is not None else None
+
+    def source_stamp(self, path: str) -> str:
+        """현재 내용의 blob SHA (렌더 캐시 키용, 템플릿 파일은 크기/수정 시각이 같으면 다시 읽지 않음)"""
+        path = self._norm(path)
+        if path in self.files:
+            return git_blob_sha(self.files[path])
+        template_path = self._template_path(path)
+        if path in self.removed or not os.path.isfile(template_path):
+            return "missing"
+        return template_blob_sha(template_path)
+
+    def write(self, path: str, content: Union[str, bytes]):
+        path = self._norm(path)
+        self.files[path] = content.encode("utf-8") if isinstance(content, str) else content
+        self.removed.discard(path)
+
+    def write_many(self, files: Dict[str, Union[str, bytes]]):
+        for path, content in files.items():
+            self.write(path, content)
+
+    def remove(self, path: str):
+        path = self._norm(path)
+        self.files.pop(path, None)
+        self.removed.add(path)
+
+    def list_dir(self, path: str) -> List[str]:
+        """디렉토리 바로 아래 파일 이름 목록 (템플릿 + 덮어쓴 파일, 삭제된 파일 제외)"""
+        path = self._norm(path)
+        names = set()
+        template_dir = self._template_path(path)
+        if os.path.isdir(template_dir):
+            names.update(name for name in os.listdir(template_dir) if os.path.isfile(os.path.join(template_dir, name)))
+        prefix = f"{path}/" if path else ""
+        for file_path in self.files:
+            if file_path.startswith(prefix) and "/" not in file_path[len(prefix):]:
+                names.add(file_path[len(prefix):])
+        return sorted(name for name in names if f"{prefix}{name}" not in self.removed)
+
+    def iter_template_files(self) -> Iterator[Tuple[str, str]]:
+        """템플릿의 (상대 경로, 절대 경로) 목록 (.git 제외)"""
+        for root, dirs, files in os.walk(self.template_dir):
+            dirs[:] = sorted(d for d in dirs if d != ".git")
+            for name in sorted(files):
+                abs_path = os.path.join(root, name)
+                yield self._norm(os.path.relpath(abs_path, self.template_dir)), abs_path
+
+
+def git_blob_sha(content: bytes) -> str:
+    """git hash-object와 같은 blob SHA-1"""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+# 템플릿 파일 blob SHA 캐시 (경로/크기/수정 시각이 같으면 다시 읽지 않음)
+_template_sha_cache: Dict[Tuple[str, int, int], str] = {}
+_template_sha_lock = threading.Lock()
+
+
+def template_blob_sha(abs_path: str) -> str:
+    stat = os.stat(abs_path)
+    key = (abs_path, stat.st_size, stat.st_mtime_ns)
+    sha = _template_sha_cache.get(key)
+    if sha is None:
+        with open(abs_path, "rb") as f:
+            sha = git_blob_sha(f.read())
+        with _template_sha_lock:
+            _template_sha_cache[key] = sha
+    return sha
+
+
+class TemplateStore:
+    """로컬 bare 저장소에 템플릿을 한 번만 해시해 두고 배포 커밋을 조립"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = os.path.abspath(root or settings.TEMPLATE_STORE_DIR)
+        self.git_dir = os.path.join(self.root, "templates.git")
+        self._base_trees: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    # -----------------------------------------------------------------
+    # git 실행 (shell 없이 인자 리스트로, 토큰 노출 방지를 위해 명령줄은 로그에 남기지 않음)
+    # -----------------------------------------------------------------
+    def _git(
+        self, *args: str, env: Optional[dict] = None, input: Optional[str] = None,
+        cwd: Optional[str] = None, timeout: int = 120
+    ) -> str:
+        # 단계 이름은 첫 번째 옵션이 아닌 인자(서브커맨드)로 (경로 등이 메트릭 라벨에 들어가지 않도록)
+        command = next((arg for arg in args if not arg.startswith("-")), "unknown")
+        with span(f"git.{command}"):
+            result = subprocess.run(
+                ["git", f"--git-dir={self.git_dir}", *args],
+                cwd=cwd,
+                capture_output=True,
+                text=True,
+                input=input,
+                env={**os.environ, **GIT_IDENTITY, **(env or {})},
+                timeout=timeout,
+            )
+            if result.returncode != 0:
+                raise Exception(f"Git command failed ({command}, exit {result.returncode}): {result.stderr.strip()}")
+        return result.stdout.strip()
+
+    def _ensure_repo(self):
+        if not os.path.isfile(os.path.join(self.git_dir, "HEAD")):
+            os.makedirs(self.root, exist_ok=True)
+            subprocess.run(["git", "init", "--bare", "-q", self.git_dir], check=True, capture_output=True)
+
+    @contextmanager
+    def _shallow_lock(self) -> Iterator[None]:
+        """shallow fetch / gc 직렬화 (같은 호스트의 워커 프로세스 간, shallow.lock 충돌 방지)"""
+        with open(os.path.join(self.git_dir, "eggit-shallow.lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_blob(self, content: bytes) -> str:
+        """loose 오브젝트를 직접 기록 (git 프로세스 없이, 이미 있으면 건너뜀)"""
+        sha = git_blob_sha(content)
+        object_path = os.path.join(self.git_dir, "objects", sha[:2], sha[2:])
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(object_path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(zlib.compress(b"blob %d\0" % len(content) + content))
+            os.replace(tmp_path, object_path)
+        return sha
+
+    @staticmethod
+    def _fingerprint(tree: DeployTree) -> str:
+        """템플릿 변경 감지용 (경로/크기/수정 시각만 stat, 내용은 읽지 않음)"""
+        digest = hashlib.sha1()
+        for rel_path, abs_path in tree.iter_template_files():
+            stat = os.stat(abs_path)
+            digest.update(f"{rel_path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    # -----------------------------------------------------------------
+    # 템플릿 base 트리
+    # -----------------------------------------------------------------
+    def base_tree(self, tree: DeployTree) -> str:
+        """템플릿 스냅샷의 트리 SHA (처음 한 번만 git add로 해시, 이후 ref에서 재사용)"""
+        self._ensure_repo()
+        fingerprint = self._fingerprint(tree)
+        cache_key = (tree.template_dir, fingerprint)
+        if cache_key in self._base_trees:
+            return self._base_trees[cache_key]
+
+        with self._lock:
+            if cache_key in self._base_trees:
+                return self._base_trees[cache_key]
+
+            name = os.path.basename(tree.template_dir)
+            ref = f"refs/templates/{name}/{fingerprint}"
+            try:
+                tree_sha = self._git("rev-parse", "--verify", "--quiet", f"{ref}^{{tree}}")
+            except Exception:
+                tree_sha = ""
+
+            if not tree_sha:
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    env = {"GIT_INDEX_FILE": os.path.join(tmp_dir, "index"), "GIT_WORK_TREE": tree.template_dir}
+                    self._git("add", "-A", ".", env=env, cwd=tree.template_dir)
+                    tree_sha = self._git("write-tree", env=env)
+                commit_sha = self._git("commit-tree", tree_sha, "-m", f"Template snapshot: {name}")
+                self._git("update-ref", ref, commit_sha)
+
+            self._base_trees[cache_key] = tree_sha
+            return tree_sha
+
+    # -----------------------------------------------------------------
+    # 배포 커밋 조립 & push
+    # -----------------------------------------------------------------
+    def build_tree(self, tree: DeployTree) -> str:
+        """base 트리 + 유저별 파일로 트리 SHA 생성 (변경된 blob만 새로 기록)"""
+        base = self.base_tree(tree)
+
+        # update-index --index-info 형식 (mode 0 = 삭제), 경로는 NUL 구분
+        entries = [f"0 {EMPTY_SHA}\t{path}" for path in sorted(tree.removed)]
+        entries += [
+            f"100644 {self._write_blob(content)}\t{path}"
+            for path, content in sorted(tree.files.items())
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            env = {"GIT_INDEX_FILE": os.path.join(tmp_dir, "index")}
+            self._git("read-tree", base, env=env)
+            if entries:
+                self._git("update-index", "-z", "--index-info", env=env, input="\0".join(entries) + "\0")
+            return self._git("write-tree", env=env)
+
+    def build_commit(self, tree: DeployTree, message: str = "Deploy by Eggit") -> str:
+        """부모 없는 배포 커밋"""
+        return self._git("commit-tree", self.build_tree(tree), "-m", message)
+
+    def push(self, commit_sha: str, repo_url: str, branch: str, deploy_key: str):
+        """
+        강제 push 후 refs/deploys/<deploy_key>에 커밋 보관
+        - 다음 배포 때 원격이 이 커밋을 광고하면 공통 오브젝트(템플릿)는 다시 보내지 않음
+        """
+        self._git("push", "--force", "--quiet", repo_url, f"{commit_sha}:refs/heads/{branch}", timeout=300)
+        self._git("update-ref", f"refs/deploys/{deploy_key}/{branch}", commit_sha)
+
+    def deploy(self, tree: DeployTree, repo_url: str, branch: str, deploy_key: str) -> str:
+        commit_sha = self.build_commit(tree)
+        self.push(commit_sha, repo_url, branch, deploy_key)
+        return commit_sha
+
+    def update(
+        self, tree: DeployTree, repo_url: str, branch: str, deploy_key: str,
+        message: str = "Update theme by Eggit"
+    ) -> Optional[Tuple[str, List[str]]]:
+        """
+        기존 브랜치 위에 렌더링 결과와 다른 경로만 커밋 → (커밋 SHA, 바뀐 경로)
+        - 브랜치가 없으면 None (호출 측에서 전체 배포)
+        - 바뀐 경로가 없으면 커밋/push 없이 현재 커밋 반환
+        - 원격에만 있는 파일(유저 포스트/이미지 등)은 그대로 유지, tree.removed는 삭제
+        """
+        self._ensure_repo()
+        if not self._git("ls-remote", "--heads", repo_url, f"refs/heads/{branch}", timeout=60):
+            return None
+
+        # 배포별 임시 ref (push 후 삭제 → 유저 저장소 오브젝트는 gc 대상)
+        fetch_ref = f"refs/tmp/update-{uuid.uuid4().hex}"
+        try:
+            with self._shallow_lock():
+                self._git(
+                    "fetch", "--quiet", "--depth=1", "--no-tags", repo_url,
+                    f"+refs/heads/{branch}:{fetch_ref}", timeout=300
+                )
+                # 이후로는 SHA로만 참조 (gc가 임시 ref를 지워도 최근 오브젝트는 TEMPLATE_STORE_GC_PRUNE 동안 유지)
+                head = self._git("rev-parse", fetch_ref)
+            head_tree = self._git("rev-parse", f"{head}^{{tree}}")
+
+            # 렌더링된 전체 트리의 (mode, blob) 목록을 원격 트리 인덱스 위에 그대로 적용
+            rendered = self._git("ls-tree", "-r", "-z", self.build_tree(tree))
+            entries = []
+            for line in filter(None, rendered.split("\0")):
+                meta, path = line.split("\t", 1)
+                mode, obj_type, sha = meta.split()
+                if obj_type == "blob" and path not in tree.keep_remote:
+                    entries.append(f"{mode} {sha}\t{path}")
+            entries += [f"0 {EMPTY_SHA}\t{path}" for path in sorted(tree.removed)]
+
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                env = {"GIT_INDEX_FILE": os.path.join(tmp_dir, "index")}
+                self._git("read-tree", head, env=env)
+                # --replace: 원격의 파일/디렉토리 자리에 반대 형태의 경로가 와도 교체
+                self._git("update-index", "--replace", "-z", "--index-info", env=env, input="\0".join(entries) + "\0")
+                new_tree = self._git("write-tree", env=env)
+
+            if new_tree == head_tree:
+                return head, []
+            changed = self._git("diff-tree", "-r", "--name-only", "-z", head_tree, new_tree)
+            commit_sha = self._git("commit-tree", new_tree, "-p", head, "-m", message)
+            # fast-forward만 허용 (그 사이 브랜치가 움직였으면 실패 → 작업 재시도)
+            # (refs/deploys에는 남기지 않음: 유저 파일 전체가 담긴 트리라 보관하면 gc로 정리되지 않음)
+            self._git("push", "--quiet", repo_url, f"{commit_sha}:refs/heads/{branch}", timeout=300)
+            return commit_sha, [path for path in changed.split("\0") if path]
+        finally:
+            try:
+                self._git("update-ref", "-d", fetch_ref)
+            except Exception as e:
+                print(f"⚠️ [TemplateStore] temp ref cleanup failed: {e}")
+
+    def gc(self):
+        """
+        update 배포가 받아온 오브젝트 정리
+        - 남은 임시 ref(비정상 종료한 배포) / 이전 버전의 refs/remotes/* 삭제
+        - TEMPLATE_STORE_GC_PRUNE보다 오래된 참조 없는 오브젝트 삭제 (shallow 목록도 함께 정리됨)
+        """
+        if not os.path.isfile(os.path.join(self.git_dir, "HEAD")):
+            return
+        with self._shallow_lock():
+            refs = self._git("for-each-ref", "--format=%(refname)", "refs/tmp/", "refs/remotes/")
+            for ref in filter(None, refs.splitlines()):
+                self._git("update-ref", "-d", ref)
+            self._git("gc", "--quiet", f"--prune={settings.TEMPLATE_STORE_GC_PRUNE}", timeout=1800)
+
+
+_default_store: Optional[TemplateStore] = None
+
+
+def get_template_store() -> TemplateStore:
+    """프로세스당 1개 (base 트리 캐시 공유)"""
+    global _default_store
+    if _default_store is None:
+        _default_store = TemplateStore()
+    return _default_store
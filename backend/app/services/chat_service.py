@@ -0,0 +1,199 @@
+from typing import Optional, List, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import or_, case, func, select, union_all
+from sqlalchemy.exc import IntegrityError
+from app.models.chat import ChatMessage, Conversation
+from app.models.user import User
+from app.utils.datetime_utils import now_utc
+
+# 받은편지함 미리보기 최대 길이 (Conversation.last_message_text 컬럼 길이와 동일)
+PREVIEW_MAX_LENGTH = 255
+# 읽음 처리 중 새 메시지가 도착해 조건부 UPDATE가 실패했을 때 재시도 횟수
+MARK_READ_MAX_ATTEMPTS = 3
+
+
+def _ordered_pair(user_id: int, friend_id: int) -> Tuple[int, int]:
+    """두 유저 ID를 (작은 ID, 큰 ID) 순서로 정렬"""
+    return (user_id, friend_id) if user_id < friend_id else (friend_id, user_id)
+
+
+def _side_columns(user_id: int, user_low_id: int):
+    """user_id 기준 (안 읽은 수 컬럼, 읽음 포인터 컬럼) 반환"""
+    if user_id == user_low_id:
+        return Conversation.unread_count_low, Conversation.last_read_id_low
+    return Conversation.unread_count_high, Conversation.last_read_id_high
+
+
+def get_conversation(db: Session, user_id: int, friend_id: int) -> Optional[Conversation]:
+    """두 유저 간 대화방 요약 조회 (유니크 인덱스 단건 조회)"""
+    low, high = _ordered_pair(user_id, friend_id)
+    return db.query(Conversation).filter(
+        Conversation.user_low_id == low,
+        Conversation.user_high_id == high
+    ).first()
+
+
+# ------------------------------------------------------------------
+# [Core] 메시지 저장 + 대화방 요약 갱신 (단일 트랜잭션)
+# ------------------------------------------------------------------
+def send_message(db: Session, sender_id: int, receiver_id: int, text: str) -> ChatMessage:
+    """
+    메시지를 저장하고 같은 트랜잭션에서 Conversation 요약을 갱신합니다.
+    - 안 읽은 수는 UPDATE ... SET col = col + 1 로 원자적으로 증가 (동시 전송 시 유실 방지)
+    - 대화방이 없으면 생성하며, 동시 생성 충돌 시 UPDATE로 재시도
+    """
+    sent_at = now_utc()
+    new_message = ChatMessage(
+        sender_id=sender_id,
+        receiver_id=receiver_id,
+        message=text,
+        created_at=sent_at
+    )
+    db.add(new_message)
+    db.flush()  # id 확보
+
+    low, high = _ordered_pair(sender_id, receiver_id)
+    receiver_unread, _ = _side_columns(receiver_id, low)
+    preview = text[:PREVIEW_MAX_LENGTH]
+
+    values = {
+        Conversation.last_message_id: new_message.id,
+        Conversation.last_message_text: preview,
+        Conversation.last_message_at: sent_at,
+        receiver_unread: receiver_unread + 1,
+    }
+
+    def _apply_update() -> int:
+        return db.query(Conversation).filter(
+            Conversation.user_low_id == low,
+            Conversation.user_high_id == high
+        ).update(values, synchronize_session=False)
+
+    if not _apply_update():
+        try:
+            with db.begin_nested():
+                conversation = Conversation(
+                    user_low_id=low,
+                    user_high_id=high,
+                    last_message_id=new_message.id,
+                    last_message_text=preview,
+                    last_message_at=sent_at,
+                    unread_count_low=1 if receiver_id == low else 0,
+                    unread_count_high=1 if receiver_id == high else 0,
+                )
+                db.add(conversation)
+        except IntegrityError:
+            # 다른 요청이 먼저 대화방을 만든 경우
+            _apply_update()
+
+    db.commit()
+    db.refresh(new_message)
+    return new_message
+
+
+# ------------------------------------------------------------------
+# [Core] 읽음 처리 (읽음 포인터 이동)
+# ------------------------------------------------------------------
+def mark_as_read(db: Session, user_id: int, friend_id: int, up_to_message_id: Optional[int] = None) -> Optional[Conversation]:
+    """
+    user_id가 friend_id와의 대화를 up_to_message_id까지 읽었음을 기록합니다.
+    - up_to_message_id가 없으면 마지막 메시지까지 읽은 것으로 처리
+    - 포인터는 앞으로만 이동 (늦게 도착한 읽음 요청이 되돌리지 않음)
+    - 읽은 시점의 last_message_id가 그대로일 때만 갱신하는 조건부 UPDATE
+      (그 사이 send_message가 올린 안 읽은 수를 덮어쓰지 않도록, 충돌 시 다시 읽고 재시도)
+    """
+    for _ in range(MARK_READ_MAX_ATTEMPTS):
+        conversation = get_conversation(db, user_id, friend_id)
+        if not conversation:
+            return None
+
+        last_id = conversation.last_message_id or 0
+        target_id = last_id if up_to_message_id is None else min(up_to_message_id, last_id)
+
+        unread_column, pointer_column = _side_columns(user_id, conversation.user_low_id)
+        is_low = user_id == conversation.user_low_id
+        current_pointer = conversation.last_read_id_low if is_low else conversation.last_read_id_high
+        if target_id <= current_pointer:
+            return conversation
+
+        if target_id >= last_id:
+            remaining = 0
+        else:
+            # 포인터 이후 상대방이 보낸 메시지 수 (PK 범위 조회)
+            remaining = db.query(ChatMessage).filter(
+                ChatMessage.sender_id == friend_id,
+                ChatMessage.receiver_id == user_id,
+                ChatMessage.id > target_id
+            ).count()
+
+        updated = db.query(Conversation).filter(
+            Conversation.id == conversation.id,
+            Conversation.last_message_id == conversation.last_message_id,
+            pointer_column < target_id
+        ).update({pointer_column: target_id, unread_column: remaining}, synchronize_session=False)
+        db.commit()
+        db.refresh(conversation)
+        if updated:
+            return conversation
+    return conversation
+
+
+# ------------------------------------------------------------------
+# [Core] 받은편지함 조회 (단일 쿼리)
+# ------------------------------------------------------------------
+def get_inbox(db: Session, user_id: int, skip: int = 0, limit: int = 50) -> List[dict]:
+    """
+    내 대화방 목록을 최신 메시지 순으로 조회합니다.
+    - 내가 low인 대화방 / high인 대화방을 각각 (내 ID, last_message_at) 인덱스로 skip + limit개씩 뽑아
+      UNION ALL로 합친 뒤 최종 정렬/페이지 (OR 조건 + filesort 없음)
+    - 상대방 User를 JOIN 하여 대화방 수와 무관하게 쿼리 1회
+    """
+    window = skip + limit
+
+    def _side(my_column):
+        side = select(Conversation.id, Conversation.last_message_at).where(
+            my_column == user_id
+        ).order_by(Conversation.last_message_at.desc()).limit(window).subquery()
+        return select(side.c.id, side.c.last_message_at)
+
+    latest = union_all(
+        _side(Conversation.user_low_id), _side(Conversation.user_high_id)
+    ).subquery()
+
+    is_low = Conversation.user_low_id == user_id
+    friend_id_expr = case((is_low, Conversation.user_high_id), else_=Conversation.user_low_id)
+
+    rows = db.query(Conversation, User).join(
+        latest, latest.c.id == Conversation.id
+    ).join(
+        User, User.id == friend_id_expr
+    ).order_by(
+        latest.c.last_message_at.desc()
+    ).offset(skip).limit(limit).all()
+
+    result = []
+    for conversation, friend in rows:
+        mine_is_low = conversation.user_low_id == user_id
+        result.append({
+            "friend_id": friend.id,
+            "friend_username": friend.username,
+            "friend_avatar_url": friend.avatar_url,
+            "last_message_id": conversation.last_message_id,
+            "last_message_text": conversation.last_message_text,
+            "last_message_at": conversation.last_message_at,
+            "unread_count": conversation.unread_count_low if mine_is_low else conversation.unread_count_high,
+            "last_read_message_id": conversation.last_read_id_low if mine_is_low else conversation.last_read_id_high,
+        })
+    return result
+
+
+def get_total_unread(db: Session, user_id: int) -> int:
+    """전체 안 읽은 메시지 수 (배지 표시용)"""
+    my_unread = case(
+        (Conversation.user_low_id == user_id, Conversation.unread_count_low),
+        else_=Conversation.unread_count_high
+    )
+    total = db.query(func.coalesce(func.sum(my_unread), 0)).filter(
+        or_(Conversation.user_low_id == user_id, Conversation.user_high_id == user_id)
+    ).scalar()
+    return int(total or 0)
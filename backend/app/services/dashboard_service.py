@@ -1,76 +1,59 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime, timedelta, timezone
-from app.models import UserDashboard, BlogPost, User, BlogVisitLog
-from app.utils.github_client import fetch_github_stats
-from app.utils.datetime_utils import now_utc, get_kst_date, get_monday_of_week_kst, days_ago_utc, KST, to_kst, to_utc
-
-def get_combined_dashboard(db: Session, user: User) -> dict:
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
+from app.models import UserDashboard, BlogPost, User, BlogVisitDaily
+from app.services import github_stats_service
+from app.utils.datetime_utils import now_utc, get_kst_date, get_monday_of_week_kst, days_ago_utc, KST, to_kst
+
+async def get_combined_dashboard(db: AsyncSession, user: User) -> dict:
     """
     [Core Logic] GitHub 캐싱 데이터 + 블로그 실시간 데이터 병합
+    - GitHub 통계는 캐시만 읽고, 갱신은 Celery 작업으로 (github_stats_service)
     """
     # 1. 대시보드 조회 (없으면 생성)
-    dashboard = db.query(UserDashboard).filter(UserDashboard.user_id == user.id).first()
+    dashboard = await db.scalar(select(UserDashboard).where(UserDashboard.user_id == user.id))
     if not dashboard:
         dashboard = UserDashboard(user_id=user.id)
         db.add(dashboard)
-        db.commit()
-        db.refresh(dashboard)
+        await db.commit()
+        await db.refresh(dashboard)
 
     now = now_utc()
 
-    # 2. GitHub 데이터 갱신 여부 체크 (1시간 쿨타임)
-    should_update = False
-    if not dashboard.last_github_updated_at:
-        should_update = True
-    elif now - to_utc(dashboard.last_github_updated_at) > timedelta(hours=1):
-        should_update = True
-
-    if should_update and user.github_access_token:
-        print(f"🔄 Fetching fresh GitHub stats for {user.username}...")
-        gh_data = fetch_github_stats(user.github_access_token, user.username)
-        
-        if gh_data:
-            dashboard.github_stats = {
-                "total_commits": gh_data["total_commits"],
-                "total_prs": gh_data["total_prs"],
-                "total_issues": gh_data["total_issues"],
-                "total_stars": gh_data["total_stars"],
-                "calendar": gh_data["calendar"]
-            }
-            dashboard.tech_stack = gh_data["top_languages"]
-            dashboard.last_github_updated_at = now
-            db.commit()
-            db.refresh(dashboard)
+    # 2. GitHub 데이터 (stale-while-revalidate)
+    # 캐시된 통계를 그대로 반환하고, 1시간이 지났으면 백그라운드 갱신만 예약 (GitHub API를 기다리지 않음)
+    if user.github_access_token and github_stats_service.is_stale(dashboard, now):
+        await github_stats_service.request_refresh(user.id)
 
-    # 3. 방문자 데이터 집계 (Real-time)
+    # 3. 방문자 데이터 집계 (일별 집계 테이블 기반, 원본 로그 COUNT 없음)
     today_kst = get_kst_date(now)
     monday_utc = get_monday_of_week_kst(now)
     monday_kst_date = to_kst(monday_utc).date() # DB Date filter용
 
-    today_count = db.query(BlogVisitLog).filter(
-        BlogVisitLog.owner_id == user.id,
-        BlogVisitLog.visit_date == today_kst
-    ).count()
-
-    weekly_visitor_count = db.query(BlogVisitLog).filter(
-        BlogVisitLog.owner_id == user.id,
-        BlogVisitLog.visit_date >= monday_kst_date
-    ).count()
+    # 오늘/이번 주/누적 방문자 수를 집계 행(유저당 하루 1행)에서 한 번에 계산
+    today_count, weekly_visitor_count, total_visitor_count = (await db.execute(
+        select(
+            func.coalesce(func.sum(case((BlogVisitDaily.visit_date == today_kst, BlogVisitDaily.uv), else_=0)), 0),
+            func.coalesce(func.sum(case((BlogVisitDaily.visit_date >= monday_kst_date, BlogVisitDaily.uv), else_=0)), 0),
+            func.coalesce(func.sum(BlogVisitDaily.uv), 0),
+        ).where(BlogVisitDaily.owner_id == user.id)
+    )).one()
 
     # 4. 블로그 포스팅 데이터 집계
     one_week_ago_utc = days_ago_utc(7)
-    weekly_post_count = db.query(BlogPost).filter(
-        BlogPost.user_id == user.id,
-        BlogPost.created_at >= one_week_ago_utc
-    ).count()
+    weekly_post_count = await db.scalar(
+        select(func.count(BlogPost.id)).where(
+            BlogPost.user_id == user.id,
+            BlogPost.created_at >= one_week_ago_utc
+        )
+    )
 
     # 5. 최종 데이터 구조 반환
     return {
         "username": user.username,
-        "total_visitors": dashboard.total_visitors,
-        "today_visitors": today_count,
-        "weekly_visitors": weekly_visitor_count,
+        "total_visitors": int(total_visitor_count),
+        "today_visitors": int(today_count),
+        "weekly_visitors": int(weekly_visitor_count),
         "weekly_post_count": weekly_post_count,
         "tech_stack": dashboard.tech_stack,
         "github_stats": dashboard.github_stats,
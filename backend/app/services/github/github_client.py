@@ -229,6 +229,17 @@ class GithubClient:
         except:
             return []
 
+    async def fetch_file_shas(self, full_name: str, branch: str) -> Dict[str, str]:
+        """Git Tree API로 전체 파일의 경로 → blob SHA 조회"""
+        url = f"https://api.github.com/repos/{full_name}/git/trees/{branch}"
+        try:
+            r = await self.client.get(url, params={"recursive": "1"})
+            if r.status_code == 200:
+                return {item["path"]: item["sha"] for item in r.json().get("tree", []) if item.get("type") == "blob"}
+            return {}
+        except:
+            return {}
+
     async def fetch_raw_content(self, full_name: str, path: str, branch: str) -> str:
         """파일 Raw Content 조회"""
         url = f"https://api.github.com/repos/{full_name}/contents/{path}"
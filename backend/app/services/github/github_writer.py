@@ -0,0 +1,104 @@
+"""
+GitHub 쓰기 클라이언트 (API 라우트 / Celery 워커 공용)
+
+- 동기 PyGithub(Github(token).get_repo, update_file ...)를 대체
+  - 프로세스 공용 httpx 커넥션 풀 재사용 (요청마다 TLS 연결/클라이언트 생성 없음)
+  - Contents API(파일 1개 읽기/쓰기) + Git Data API(여러 파일 한 커밋, GitDataApiDeployer 상속)
+- async 라우트에서는 run_blocking으로 전용 스레드풀(GITHUB_IO_THREADS)에서 실행 → 이벤트 루프 비차단
+  - 스레드 수를 제한해 GitHub 지연이 길어져도 기본 스레드풀(sync 라우트/DB)을 잠식하지 않음
+"""
+import asyncio
+import base64
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, TypeVar, Union
+from urllib.parse import quote
+
+import httpx
+
+from app.core.config import settings
+from app.services.blog.git_data_api import GitDataApiDeployer, GitDataApiError
+
+T = TypeVar("T")
+
+_shared_client: Optional[httpx.Client] = None
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_shared_client() -> httpx.Client:
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = httpx.Client(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=settings.GITHUB_IO_THREADS * 2, max_keepalive_connections=settings.GITHUB_IO_THREADS),
+        )
+    return _shared_client
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.GITHUB_IO_THREADS, thread_name_prefix="github-io")
+    return _executor
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """GitHub 호출을 전용 스레드풀에서 실행 (async 라우트용)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+@dataclass
+class GithubFile:
+    content: bytes
+    sha: str
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8")
+
+
+class GithubWriter(GitDataApiDeployer):
+    """Contents API + Git Data API (공용 커넥션 풀 사용)"""
+
+    def __init__(self, token: str):
+        super().__init__(token, client=_get_shared_client())
+
+    @staticmethod
+    def _contents_path(repo: str, path: str) -> str:
+        return f"/repos/{repo}/contents/{quote(path.lstrip('/'), safe='/')}"
+
+    def get_login(self) -> str:
+        return self._request("GET", "/user")["login"]
+
+    def branch_exists(self, repo: str, branch: str) -> bool:
+        return self._request("GET", f"/repos/{repo}/branches/{quote(branch, safe='')}", allow=(404,)) is not None
+
+    def get_file(self, repo: str, path: str, ref: Optional[str] = None) -> Optional[GithubFile]:
+        """파일 내용 + blob SHA (없으면 None)"""
+        data = self._request("GET", self._contents_path(repo, path), params={"ref": ref} if ref else None, allow=(404,))
+        if data is None or isinstance(data, list):
+            return None
+        return GithubFile(content=base64.b64decode(data.get("content") or ""), sha=data["sha"])
+
+    def put_file(
+        self, repo: str, path: str, content: Union[str, bytes], message: str,
+        branch: Optional[str] = None, sha: Optional[str] = None
+    ) -> str:
+        """
+        파일 생성(sha 없음) 또는 수정(sha = 현재 blob SHA) → 새 blob SHA
+        - sha가 현재 내용과 다르면 409/422 (GitDataApiError)
+        """
+        raw = content.encode("utf-8") if isinstance(content, str) else content
+        payload = {"message": message, "content": base64.b64encode(raw).decode("ascii")}
+        if branch:
+            payload["branch"] = branch
+        if sha:
+            payload["sha"] = sha
+        return self._request("PUT", self._contents_path(repo, path), json=payload)["content"]["sha"]
+
+
+def is_conflict(error: Exception) -> bool:
+    """put_file의 sha 불일치 (다른 곳에서 먼저 수정됨)"""
+    return isinstance(error, GitDataApiError) and error.status_code in (409, 422)
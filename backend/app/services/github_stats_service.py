@@ -0,0 +1,187 @@
+"""
+GitHub 통계 갱신 (stale-while-revalidate)
+
+- 대시보드 조회는 항상 DB에 캐시된 github_stats를 즉시 반환
+- 캐시가 오래됐으면(GITHUB_STATS_TTL_SECONDS) Celery 갱신 작업을 예약만 하고 기다리지 않음
+- 예약은 유저당 1개로 중복 제거(queued 키), 실제 갱신은 유저별 분산 락으로 1개 워커만 수행
+- 주기적인 sweeper가 최근 활동한 유저의 오래된 통계를 미리 갱신
+"""
+import time
+import uuid
+from datetime import timedelta
+from typing import List
+
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.security import decrypt_token
+from app.models import User, UserDashboard
+from app.utils.datetime_utils import now_utc, to_utc
+from app.utils.github_client import fetch_github_stats
+
+KEY_PREFIX = "eggit:ghstats"
+ACTIVE_USERS_KEY = f"{KEY_PREFIX}:active"
+
+
+def _queued_key(user_id: int) -> str:
+    return f"{KEY_PREFIX}:queued:{user_id}"
+
+
+def _lock_key(user_id: int) -> str:
+    return f"{KEY_PREFIX}:lock:{user_id}"
+
+
+# 토큰이 일치할 때만 락 해제 (다른 워커가 다시 잡은 락을 지우지 않도록)
+_RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_async_redis = None
+
+
+def _get_async_redis():
+    global _async_redis
+    if _async_redis is None:
+        import redis.asyncio as redis
+        _async_redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _async_redis
+
+
+def is_stale(dashboard: UserDashboard, now=None) -> bool:
+    if not dashboard.last_github_updated_at:
+        return True
+    now = now or now_utc()
+    return now - to_utc(dashboard.last_github_updated_at) > timedelta(seconds=settings.GITHUB_STATS_TTL_SECONDS)
+
+
+def _enqueue_refresh_task(user_id: int):
+    from app.worker import task_refresh_github_stats
+    task_refresh_github_stats.delay(user_id)
+
+
+# =========================================================
+# API 프로세스 (async)
+# =========================================================
+
+async def mark_active(user_id: int):
+    """최근 활동 유저 기록 (sweeper의 사전 갱신 대상)"""
+    try:
+        await _get_async_redis().zadd(ACTIVE_USERS_KEY, {str(user_id): time.time()})
+    except Exception as e:
+        print(f"⚠️ [GitHubStats] mark_active failed: {e}")
+
+
+async def request_refresh(user_id: int) -> bool:
+    """
+    갱신 작업 예약 (이미 예약/진행 중이면 무시) - 예약했으면 True
+    - queued 키는 작업이 끝나면 삭제되고, 워커가 죽어도 LOCK 시간 후 만료
+    """
+    try:
+        queued = await _get_async_redis().set(
+            _queued_key(user_id), "1", nx=True, ex=settings.GITHUB_STATS_LOCK_SECONDS
+        )
+        if not queued:
+            return False
+        await run_in_threadpool(_enqueue_refresh_task, user_id)
+        return True
+    except Exception as e:
+        print(f"⚠️ [GitHubStats] refresh enqueue failed for user {user_id}: {e}")
+        return False
+
+
+# =========================================================
+# Celery 워커 (sync)
+# =========================================================
+
+def refresh_user_stats(db: Session, redis_client, user_id: int) -> bool:
+    """
+    GitHub GraphQL 조회 후 UserDashboard 저장 (유저별 분산 락 보유 중에만)
+    - 다른 워커가 같은 유저를 갱신 중이면 바로 False
+    """
+    lock_token = uuid.uuid4().hex
+    if not redis_client.set(_lock_key(user_id), lock_token, nx=True, ex=settings.GITHUB_STATS_LOCK_SECONDS):
+        return False
+
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user or not user.github_access_token:
+            return False
+
+        # DB에는 암호화된 토큰이 저장되어 있음
+        access_token = decrypt_token(user.github_access_token)
+        if not access_token:
+            return False
+
+        gh_data = fetch_github_stats(access_token, user.username)
+        if not gh_data:
+            return False
+
+        dashboard = db.query(UserDashboard).filter(UserDashboard.user_id == user_id).first()
+        if not dashboard:
+            dashboard = UserDashboard(user_id=user_id)
+            db.add(dashboard)
+
+        dashboard.github_stats = {
+            "total_commits": gh_data["total_commits"],
+            "total_prs": gh_data["total_prs"],
+            "total_issues": gh_data["total_issues"],
+            "total_stars": gh_data["total_stars"],
+            "calendar": gh_data["calendar"]
+        }
+        dashboard.tech_stack = gh_data["top_languages"]
+        dashboard.last_github_updated_at = now_utc()
+        db.commit()
+        return True
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        redis_client.eval(_RELEASE_LOCK_LUA, 1, _lock_key(user_id), lock_token)
+        redis_client.delete(_queued_key(user_id))
+
+
+def enqueue_refresh(redis_client, user_id: int) -> bool:
+    """request_refresh의 동기 버전 (워커에서 사용) - 이미 예약/진행 중이면 False"""
+    if not redis_client.set(_queued_key(user_id), "1", nx=True, ex=settings.GITHUB_STATS_LOCK_SECONDS):
+        return False
+    _enqueue_refresh_task(user_id)
+    return True
+
+
+def sweep_stale_stats(db: Session, redis_client) -> List[int]:
+    """
+    최근 활동 유저(GITHUB_STATS_ACTIVE_WINDOW_SECONDS 이내) 중 통계가 오래된 유저를 찾아 갱신 예약
+    - 활동 기록이 창 밖으로 밀려난 유저는 sorted set에서 정리
+    """
+    now_ts = time.time()
+    window_start = now_ts - settings.GITHUB_STATS_ACTIVE_WINDOW_SECONDS
+    redis_client.zremrangebyscore(ACTIVE_USERS_KEY, "-inf", window_start)
+
+    # 가장 최근에 활동한 유저부터
+    active_ids = [
+        int(user_id) for user_id in redis_client.zrevrangebyscore(
+            ACTIVE_USERS_KEY, now_ts, window_start, start=0, num=settings.GITHUB_STATS_SWEEP_BATCH_SIZE
+        )
+    ]
+    if not active_ids:
+        return []
+
+    stale_before = now_utc() - timedelta(seconds=settings.GITHUB_STATS_TTL_SECONDS)
+    rows = db.query(User.id, UserDashboard.last_github_updated_at).outerjoin(
+        UserDashboard, UserDashboard.user_id == User.id
+    ).filter(
+        User.id.in_(active_ids),
+        User.github_access_token.isnot(None)
+    ).all()
+
+    enqueued = []
+    for user_id, last_updated in rows:
+        if last_updated and to_utc(last_updated) > stale_before:
+            continue
+        if enqueue_refresh(redis_client, user_id):
+            enqueued.append(user_id)
+    return enqueued
@@ -0,0 +1,239 @@
+"""
+로그인 후속 작업 (Post-login)
+
+로그인 요청은 신원 확인과 토큰 발급만 처리하고, 나머지는 후속 작업으로 분리합니다.
+
+- 기본 아바타(알)는 신규 유저일 때만 로그인 요청 안에서 생성 (로그인 직후 아바타 API 404 방지)
+- 대시보드 초기화, 출석 체크(주간 출석 포함), GitHub 통계 갱신 예약, 오늘의 선물 생성 예약
+- 모든 단계는 멱등 (이미 있으면 건너뜀) → 같은 날 여러 번 로그인하거나 재시도해도 안전
+- 결과는 Redis에 보관하고 GET /auth/login/followup으로 조회 (출석 알림 등)
+"""
+from typing import Any, Dict, Optional
+
+import orjson
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models import User, UserDashboard, Avatar, AvatarMeta, DailyGift
+from app.models.avatar import GrowthStage, MatchType
+from app.services import quest_service
+from app.utils.datetime_utils import now_kst, now_utc, to_iso8601
+
+KEY_PREFIX = "eggit:postlogin"
+
+STATUS_PENDING = "PENDING"
+STATUS_DONE = "DONE"
+STATUS_FAILED = "FAILED"
+
+_async_redis = None
+
+
+def _result_key(user_id: int) -> str:
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+def _get_async_redis():
+    global _async_redis
+    if _async_redis is None:
+        import redis.asyncio as redis
+        _async_redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _async_redis
+
+
+def _enqueue_post_login_task(user_id: int):
+    from app.worker import task_post_login
+    task_post_login.delay(user_id)
+
+
+def serialize_avatar(avatar: Avatar) -> Dict[str, Any]:
+    return {
+        "level": avatar.level,
+        "exp": avatar.exp,
+        "growth_stage": avatar.growth_stage.value,
+        "avatar_name": avatar.meta.name,
+        "match_type": avatar.meta.match_type.value
+    }
+
+
+# =========================================================
+# API 프로세스 (async)
+# =========================================================
+
+async def schedule(user_id: int) -> bool:
+    """
+    후속 작업 예약 + 결과 키를 PENDING으로 초기화
+    - Redis/브로커 장애 시 False (호출 측에서 BackgroundTasks로 대체 실행)
+    """
+    try:
+        await _get_async_redis().set(
+            _result_key(user_id),
+            orjson.dumps({"status": STATUS_PENDING, "requested_at": to_iso8601(now_utc())}),
+            ex=settings.POST_LOGIN_RESULT_TTL_SECONDS
+        )
+        await run_in_threadpool(_enqueue_post_login_task, user_id)
+        return True
+    except Exception as e:
+        print(f"⚠️ [PostLogin] schedule failed for user {user_id}: {e}")
+        return False
+
+
+async def ensure_avatar_async(db: AsyncSession, user_id: int) -> Optional[Avatar]:
+    """기본 아바타(알) 조회, 없으면 생성 (기존 유저는 조회 1번)"""
+    avatar_query = select(Avatar).options(selectinload(Avatar.meta)).where(Avatar.user_id == user_id)
+    avatar = await db.scalar(avatar_query)
+    if avatar:
+        return avatar
+
+    # DEFAULT 메타가 있는지 확인 (없으면 생성 - 시드 미실행 대비)
+    default_meta = await db.scalar(select(AvatarMeta).where(AvatarMeta.match_type == MatchType.DEFAULT))
+    if not default_meta:
+        default_meta = AvatarMeta(match_type=MatchType.DEFAULT, name="알")
+        db.add(default_meta)
+        await db.flush()
+
+    try:
+        db.add(Avatar(
+            user_id=user_id,
+            avatar_meta_id=default_meta.id,
+            level=1,
+            exp=0,
+            growth_stage=GrowthStage.EGG
+        ))
+        await db.commit()
+    except IntegrityError:
+        # 동시에 들어온 다른 로그인 요청이 먼저 생성
+        await db.rollback()
+    return await db.scalar(avatar_query)
+
+
+async def get_result(user_id: int) -> Optional[Dict[str, Any]]:
+    """마지막 로그인의 후속 작업 결과 (없거나 만료됐으면 None)"""
+    raw = await _get_async_redis().get(_result_key(user_id))
+    return orjson.loads(raw) if raw else None
+
+
+# =========================================================
+# 후속 작업 본체 (Celery 워커 / BackgroundTasks 공용, sync)
+# =========================================================
+
+def _ensure_dashboard(db: Session, user_id: int) -> UserDashboard:
+    dashboard = db.query(UserDashboard).filter(UserDashboard.user_id == user_id).first()
+    if dashboard:
+        return dashboard
+    try:
+        dashboard = UserDashboard(
+            user_id=user_id,
+            total_visitors=0,
+            today_visitors=0,
+            tech_stack=[],
+            github_stats={},
+            last_github_updated_at=None  # 생성 직후 통계 갱신 대상
+        )
+        db.add(dashboard)
+        db.commit()
+        return dashboard
+    except IntegrityError:
+        # 동시에 실행된 다른 후속 작업이 먼저 생성
+        db.rollback()
+        return db.query(UserDashboard).filter(UserDashboard.user_id == user_id).first()
+
+
+def _ensure_avatar(db: Session, user_id: int) -> Optional[Avatar]:
+    """기본 아바타(알) 생성 - 404 방지 및 초기 상태 부여"""
+    avatar_query = db.query(Avatar).options(selectinload(Avatar.meta)).filter(Avatar.user_id == user_id)
+    avatar = avatar_query.first()
+    if avatar:
+        return avatar
+
+    # DEFAULT 메타가 있는지 확인 (없으면 생성 - 시드 미실행 대비)
+    default_meta = db.query(AvatarMeta).filter(AvatarMeta.match_type == MatchType.DEFAULT).first()
+    if not default_meta:
+        default_meta = AvatarMeta(match_type=MatchType.DEFAULT, name="알")
+        db.add(default_meta)
+        db.flush()
+
+    try:
+        db.add(Avatar(
+            user_id=user_id,
+            avatar_meta_id=default_meta.id,
+            level=1,
+            exp=0,
+            growth_stage=GrowthStage.EGG
+        ))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+    return avatar_query.first()
+
+
+def run_post_login(db: Session, user_id: int, redis_client=None) -> Dict[str, Any]:
+    """
+    로그인 후속 작업 실행 (멱등)
+    - gift_pending: 오늘의 선물이 아직 없음 (호출 측에서 생성 예약)
+    - redis_client가 있으면 GitHub 통계 갱신 예약 + 결과 저장
+    """
+    from app.services import github_stats_service
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user or user.is_active is False:
+        return {"status": STATUS_DONE, "skipped": True}
+
+    # 1. 대시보드 초기화 + 통계가 오래됐으면 갱신 예약
+    dashboard = _ensure_dashboard(db, user_id)
+    if redis_client is not None and github_stats_service.is_stale(dashboard):
+        try:
+            github_stats_service.enqueue_refresh(redis_client, user_id)
+        except Exception as e:
+            print(f"⚠️ [PostLogin] GitHub stats refresh enqueue failed for user {user_id}: {e}")
+
+    # 2. 기본 아바타(알) - 보통 로그인 요청에서 이미 생성됨 (실패했던 경우 대비)
+    avatar = _ensure_avatar(db, user_id)
+
+    # 3. 출석 체크 (아바타가 있을 때만, 주간 출석 현황 포함 1회 커밋)
+    quest_check_in = quest_service.auto_check_in_user(db, user_id, avatar) if avatar else None
+
+    # 4. 오늘의 선물 존재 여부
+    today_str = now_kst().strftime("%Y-%m-%d")
+    gift_pending = db.query(DailyGift.id).filter(
+        DailyGift.user_id == user_id,
+        DailyGift.target_date == today_str
+    ).first() is None
+
+    result = {
+        "status": STATUS_DONE,
+        "finished_at": to_iso8601(now_utc()),
+        "has_avatar": avatar is not None,
+        "avatar": serialize_avatar(avatar) if avatar else None,
+        "quest_check_in": quest_check_in,
+        "gift_pending": gift_pending,
+    }
+    if redis_client is not None:
+        save_result(redis_client, user_id, result)
+    return result
+
+
+def save_result(redis_client, user_id: int, result: Dict[str, Any]):
+    try:
+        redis_client.set(_result_key(user_id), orjson.dumps(result), ex=settings.POST_LOGIN_RESULT_TTL_SECONDS)
+    except Exception as e:
+        print(f"⚠️ [PostLogin] result save failed for user {user_id}: {e}")
+
+
+def run_post_login_in_new_session(user_id: int):
+    """[Fallback] Celery를 쓸 수 없을 때 BackgroundTasks에서 자체 세션으로 실행"""
+    import redis
+
+    db = SessionLocal()
+    try:
+        redis_client = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=0.2)
+        run_post_login(db, user_id, redis_client)
+    except Exception as e:
+        db.rollback()
+        print(f"❌ [PostLogin] fallback failed for user {user_id}: {e}")
+    finally:
+        db.close()
@@ -0,0 +1,106 @@
+"""
+퀘스트 카탈로그 (프로세스 메모리 캐시)
+
+quests 테이블은 init_default_quests로만 바뀌는 작은 정적 데이터이므로
+퀘스트 처리마다 제목으로 다시 조회하지 않고 프로세스 메모리에 올려 둡니다.
+
+- 서버 시작 시 init_default_quests가 동기화 후 refresh로 적재
+- 다른 프로세스(Celery 워커 등)나 DB 직접 수정에 대비해 QUEST_CATALOG_TTL_SECONDS마다 다시 적재
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.quest import Quest, QuestFrequency
+
+
+@dataclass(frozen=True)
+class CatalogQuest:
+    """세션과 무관한 퀘스트 정보 (DB 세션이 닫혀도 안전하게 공유)"""
+    id: int
+    title: str
+    description: Optional[str]
+    exp_reward: int
+    frequency: QuestFrequency
+    is_active: bool
+
+
+class _Catalog:
+    def __init__(self, quests: List[CatalogQuest]):
+        self.loaded_at = time.monotonic()
+        self.by_id: Dict[int, CatalogQuest] = {quest.id: quest for quest in quests}
+        # 제목이 겹치면 활성 퀘스트 중 id가 가장 작은 것 (기존 .first() 조회와 동일)
+        self.active_by_title: Dict[str, CatalogQuest] = {}
+        for quest in sorted(quests, key=lambda q: q.id):
+            if quest.is_active:
+                self.active_by_title.setdefault(quest.title, quest)
+        self.active: List[CatalogQuest] = [quest for quest in sorted(quests, key=lambda q: q.id) if quest.is_active]
+
+
+_catalog: Optional[_Catalog] = None
+_lock = threading.Lock()
+
+
+def _to_catalog_quest(quest: Quest) -> CatalogQuest:
+    return CatalogQuest(
+        id=quest.id,
+        title=quest.title.value if hasattr(quest.title, "value") else quest.title,
+        description=quest.description,
+        exp_reward=quest.exp_reward,
+        frequency=quest.frequency,
+        is_active=bool(quest.is_active),
+    )
+
+
+def refresh(db: Session) -> List[CatalogQuest]:
+    """DB에서 전체 퀘스트를 다시 적재 (init_default_quests 동기화 직후 호출)"""
+    global _catalog
+    quests = [_to_catalog_quest(quest) for quest in db.query(Quest).all()]
+    with _lock:
+        _catalog = _Catalog(quests)
+    return _catalog.active
+
+
+def invalidate():
+    global _catalog
+    with _lock:
+        _catalog = None
+
+
+def _current() -> Optional[_Catalog]:
+    catalog = _catalog
+    if catalog is None or time.monotonic() - catalog.loaded_at > settings.QUEST_CATALOG_TTL_SECONDS:
+        return None
+    return catalog
+
+
+def _ensure(db: Session) -> _Catalog:
+    catalog = _current()
+    if catalog is None:
+        refresh(db)
+        catalog = _catalog
+    return catalog
+
+
+def cached_active_quests() -> Optional[List[CatalogQuest]]:
+    """적재된 활성 퀘스트 목록 (미적재/만료 시 None - async 경로에서 run_sync(refresh) 필요 여부 판단용)"""
+    catalog = _current()
+    return catalog.active if catalog else None
+
+
+def get_active_quests(db: Session) -> List[CatalogQuest]:
+    return _ensure(db).active
+
+
+def get_by_title(db: Session, title: str) -> Optional[CatalogQuest]:
+    """활성 퀘스트를 제목으로 조회"""
+    title = title.value if hasattr(title, "value") else title
+    return _ensure(db).active_by_title.get(title)
+
+
+def get_by_id(db: Session, quest_id: int) -> Optional[CatalogQuest]:
+    return _ensure(db).by_id.get(quest_id)
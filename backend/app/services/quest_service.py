@@ -1,49 +1,114 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from app.models.quest import Quest, UserQuest, QuestStatus, QuestTitle
-from app.services import avatar_service
-from datetime import datetime, timezone
-from typing import Optional, Dict, Any
+from app.models.quest import UserQuest, QuestStatus, QuestTitle
+from app.services import avatar_service, quest_catalog
+from app.services.quest_catalog import CatalogQuest
+from typing import Optional, Dict, Any, Tuple
 from app.utils.datetime_utils import now_utc, now_kst, to_kst, get_monday_of_week_kst, to_utc
 
+# ------------------------------------------------------------------
+# [Core] 유저 퀘스트 상태 계산 (UserQuest 조회 1회 + 메모리 계산)
+# ------------------------------------------------------------------
+def load_user_quests(db: Session, user_id: int) -> Dict[int, UserQuest]:
+    """유저의 퀘스트 진행 상황 전체를 1회 조회 -> {quest_id: UserQuest} (중복 행이 있으면 마지막 것 사용)"""
+    rows = db.query(UserQuest).filter(UserQuest.user_id == user_id).order_by(UserQuest.id).all()
+    return {uq.quest_id: uq for uq in rows}
+
+
+def _get_user_quest(db: Session, user_id: int, quest_id: int) -> Optional[UserQuest]:
+    return db.query(UserQuest).filter(
+        UserQuest.user_id == user_id,
+        UserQuest.quest_id == quest_id
+    ).order_by(UserQuest.id.desc()).first()
+
+
+def frequency_name(frequency) -> str:
+    """Enum/문자열 모두 'DAILY' 형태로 (Enum 처리 안전 장치)"""
+    freq_val = frequency.value if hasattr(frequency, 'value') else str(frequency)
+    if "." in freq_val:
+        freq_val = freq_val.split(".")[-1]
+    return freq_val
+
+
+def current_period(now=None) -> Tuple[Any, Any]:
+    """(오늘 KST 날짜, 이번 주 월요일 KST 날짜)"""
+    now = now or now_utc()
+    return to_kst(now).date(), to_kst(get_monday_of_week_kst(now)).date()
+
+
+def is_in_current_period(frequency, completed_at, today_kst, current_monday_kst) -> bool:
+    """완료 시각이 현재 주기(데일리: 오늘, 위클리: 이번 주)에 속하는지 - 기간이 지나면 리셋 대상"""
+    if not completed_at:
+        return False
+    freq_val = frequency_name(frequency)
+    if "DAILY" in freq_val:
+        return to_kst(completed_at).date() == today_kst
+    if "WEEKLY" in freq_val:
+        return to_kst(get_monday_of_week_kst(completed_at)).date() == current_monday_kst
+    return True  # ONE_TIME 등은 리셋 없음
+
+
+def evaluate_quest(quest: CatalogQuest, uq: Optional[UserQuest], today_kst, current_monday_kst) -> Tuple[str, int]:
+    """
+    표시용 (상태, 주간 출석 횟수) 계산
+    - KST 기준으로 주기가 지났으면 NOT_STARTED로 리셋하여 표시 (DB는 다음 달성 시 갱신)
+    """
+    if uq is None:
+        return QuestStatus.NOT_STARTED.value, 0
+
+    status_val = uq.status.value if hasattr(uq.status, 'value') else str(uq.status)
+    weekly_count = uq.weekly_checkin_count or 0
+
+    if uq.completed_at and not is_in_current_period(quest.frequency, uq.completed_at, today_kst, current_monday_kst):
+        status_val = QuestStatus.NOT_STARTED.value
+        if "WEEKLY" in frequency_name(quest.frequency):
+            weekly_count = 0
+    return status_val, weekly_count
+
 # ------------------------------------------------------------------
 # [Core] 주간 출석 체크 (월-일 중 5일 출석)
 # ------------------------------------------------------------------
-def check_weekly_attendance(db: Session, user_id: int) -> Optional[Dict[str, Any]]:
-    """주간 출석 체크 (월-일 중 5일 출석)"""
-    attendance_quest = db.query(Quest).filter(
-        Quest.title == QuestTitle.WEEKLY_ATTENDANCE,
-        Quest.is_active == True
-    ).first()
-    
+def check_weekly_attendance(
+    db: Session,
+    user_id: int,
+    user_quests: Optional[Dict[int, UserQuest]] = None,
+    commit: bool = True
+) -> Optional[Dict[str, Any]]:
+    """
+    주간 출석 체크 (월-일 중 5일 출석)
+    - user_quests: 호출 측에서 이미 조회한 진행 상황 (없으면 조회)
+    - commit=False면 호출 측 트랜잭션에 포함 (로그인 시 출석과 함께 1회 커밋)
+    """
+    attendance_quest = quest_catalog.get_by_title(db, QuestTitle.WEEKLY_ATTENDANCE)
     if not attendance_quest:
         return None
 
     now = now_utc()
     monday = get_monday_of_week_kst(now)
     monday_kst_date = to_kst(monday).date()
-    
+
     # ✨ Daily CheckinLog 테이블에서 이번 주 출석 횟수 조회
     from app.models.checkin import DailyCheckinLog
-    
-    checkins = db.query(DailyCheckinLog).filter(
+
+    checkin_count = db.query(func.count(DailyCheckinLog.id)).filter(
         DailyCheckinLog.user_id == user_id,
         DailyCheckinLog.checkin_date >= monday_kst_date
-    ).all()
-    
-    checkin_count = len(checkins)
-    
-    user_quest = db.query(UserQuest).filter(
-        UserQuest.user_id == user_id,
-        UserQuest.quest_id == attendance_quest.id
-    ).first()
-    
+    ).scalar() or 0
+
+    if user_quests is not None:
+        user_quest = user_quests.get(attendance_quest.id)
+    else:
+        user_quest = _get_user_quest(db, user_id, attendance_quest.id)
+
     if user_quest:
         if user_quest.status == QuestStatus.CLAIMED and user_quest.completed_at and to_utc(user_quest.completed_at) >= monday:
             return None
-        
+
         is_new_week = user_quest.completed_at and to_utc(user_quest.completed_at) < monday
-        user_quest.weekly_checkin_count = checkin_count
-        
+        # 값이 바뀐 경우에만 변경 (변경 없으면 UPDATE 없음)
+        if user_quest.weekly_checkin_count != checkin_count:
+            user_quest.weekly_checkin_count = checkin_count
+
         if is_new_week or (checkin_count >= 5 and user_quest.status != QuestStatus.COMPLETED):
             user_quest.status = QuestStatus.COMPLETED if checkin_count >= 5 else QuestStatus.IN_PROGRESS
             if checkin_count >= 5:
@@ -57,9 +122,12 @@ def check_weekly_attendance(db: Session, user_id: int) -> Optional[Dict[str, Any
             completed_at=now if checkin_count >= 5 else None
         )
         db.add(user_quest)
-    
-    db.commit()
-    
+        if user_quests is not None:
+            user_quests[attendance_quest.id] = user_quest
+
+    if commit:
+        db.commit()
+
     if checkin_count >= 5:
         return {
             "quest_title": attendance_quest.title,
@@ -71,49 +139,47 @@ def check_weekly_attendance(db: Session, user_id: int) -> Optional[Dict[str, Any
 # ------------------------------------------------------------------
 # [Core] 자동 출석 체크 (로그인 시 호출)
 # ------------------------------------------------------------------
-def auto_check_in_user(db: Session, user_id: int) -> Optional[Dict[str, Any]]:
+def auto_check_in_user(db: Session, user_id: int, avatar=None) -> Optional[Dict[str, Any]]:
     """
     자동 출석 체크 (로그인 시 호출)
     - DailyCheckinLog 테이블에 출석 기록 저장
     - UserQuest는 상태 관리용으로만 사용
+    - 진행 상황은 1회 조회, 오늘 이미 출석했으면 쓰기 없음 / 처음이면 출석+주간 현황을 1회 커밋
+    - avatar: 호출 측에서 이미 조회한 아바타 (없으면 조회)
     """
-    daily_quest = db.query(Quest).filter(
-        Quest.title == QuestTitle.DAILY_CHECKIN,
-        Quest.is_active == True
-    ).first()
-    
+    daily_quest = quest_catalog.get_by_title(db, QuestTitle.DAILY_CHECKIN)
     if not daily_quest:
         return None
-    
-    from app.utils.datetime_utils import now_kst, to_kst
+
     now = now_utc()
     today_kst = now_kst().date()
-    
+    user_quests = load_user_quests(db, user_id)
+
     # 1. 중복 출석 확인 (오늘 이미 달성했거나 보상을 받았는지)
-    existing_quest = db.query(UserQuest).filter(
-        UserQuest.user_id == user_id,
-        UserQuest.quest_id == daily_quest.id,
-        UserQuest.status.in_([QuestStatus.COMPLETED, QuestStatus.CLAIMED])
-    ).order_by(UserQuest.completed_at.desc()).first()
-    
-    if existing_quest and existing_quest.completed_at and existing_quest.completed_at.date() == today_kst:
+    existing_quest = user_quests.get(daily_quest.id)
+    if (existing_quest
+            and existing_quest.status in (QuestStatus.COMPLETED, QuestStatus.CLAIMED)
+            and existing_quest.completed_at
+            and to_kst(existing_quest.completed_at).date() == today_kst):
         return {
             "already_completed": True,
             "status": existing_quest.status,
             "exp_gained": 0,
             "message": "오늘 이미 출석했습니다."
         }
-    
+
     # 2. 보상 지급 (아바타 경험치) - 수동 수령 방식으로 변경 (여기서는 지급하지 않음)
-    from app.crud import crud_avatar
-    avatar = crud_avatar.get_avatar_by_user_id(db, user_id)
+    if avatar is None:
+        from app.crud import crud_avatar
+        avatar = crud_avatar.get_avatar_by_user_id(db, user_id)
     if not avatar:
         return None
-    
+    current_level, current_exp = avatar.level, avatar.exp
+
     # ✨ DailyCheckinLog 테이블에 출석 기록
     from app.models.checkin import DailyCheckinLog
     from sqlalchemy.exc import IntegrityError
-    
+
     try:
         # 오늘 출석 기록 시도
         checkin_log = DailyCheckinLog(
@@ -122,42 +188,37 @@ def auto_check_in_user(db: Session, user_id: int) -> Optional[Dict[str, Any]]:
         )
         db.add(checkin_log)
         db.flush()  # DB에 반영하여 UniqueConstraint 체크
-        
+
         # 출석 성공! UserQuest 상태를 COMPLETED로 설정
-        user_quest = db.query(UserQuest).filter(
-            UserQuest.user_id == user_id,
-            UserQuest.quest_id == daily_quest.id
-        ).first()
-        
-        if user_quest:
+        if existing_quest:
             # 기존 레코드가 있으면 업데이트
-            user_quest.status = QuestStatus.COMPLETED
-            user_quest.completed_at = now
+            existing_quest.status = QuestStatus.COMPLETED
+            existing_quest.completed_at = now
         else:
             # 없으면 새로 생성
-            user_quest = UserQuest(
+            new_uq = UserQuest(
                 user_id=user_id,
                 quest_id=daily_quest.id,
                 status=QuestStatus.COMPLETED,
                 completed_at=now
             )
-            db.add(user_quest)
-        
+            db.add(new_uq)
+            user_quests[daily_quest.id] = new_uq
+
+        # ✨ 주간 출석 현황도 같은 트랜잭션에서 갱신 (사용자가 '보상 받기'를 누르기 전에도 circles가 채워지도록)
+        check_weekly_attendance(db, user_id, user_quests=user_quests, commit=False)
         db.commit()
 
-        # ✨ 주간 출석 현황 즉시 업데이트 (사용자가 '보상 받기'를 누르기 전에도 circles가 채워지도록)
-        check_weekly_attendance(db, user_id)
-        
         message = "출석 퀘스트 달성! '보상 받기' 버튼을 눌러 경험치를 수령하세요."
-        
+
         return {
             "already_completed": False,
             "exp_gained": 0,
-            "current_level": avatar.level,
-            "current_exp": avatar.exp,
+            "current_level": current_level,
+            "current_exp": current_exp,
             "message": message
         }
-        
+
     except IntegrityError:
         # 이미 오늘 출석함 (UniqueConstraint 위반)
         db.rollback()
@@ -169,69 +230,36 @@ def auto_check_in_user(db: Session, user_id: int) -> Optional[Dict[str, Any]]:
 # ------------------------------------------------------------------
 # [Core] 퀘스트 달성 처리 (Complete)
 # ------------------------------------------------------------------
-def complete_quest_by_title(db: Session, user_id: int, quest_title: QuestTitle) -> Optional[Dict[str, Any]]:
-    quest = db.query(Quest).filter(
-        Quest.title == quest_title,
-        Quest.is_active == True
-    ).first()
-    
-    if not quest:
-        return None
-        
-    today = now_kst().date()
-    today = now_kst().date()
+def _complete_quest(db: Session, user_id: int, quest: CatalogQuest, existing_quest: Optional[UserQuest]) -> Dict[str, Any]:
+    """
+    진행 상황을 COMPLETED로 변경 (보상 지급은 하지 않음)
+    - 이번 주기에 이미 CLAIMED면 거절, 이미 COMPLETED면 쓰기 없이 그대로 반환
+    - 주기가 지난 기록은 같은 행을 재사용해 다시 COMPLETED
+    """
+    today_kst, current_monday_kst = current_period()
+    result = {
+        "quest_title": quest.title,
+        "status": QuestStatus.COMPLETED
+    }
 
-    
-    existing_quest = db.query(UserQuest).filter(
-        UserQuest.user_id == user_id,
-        UserQuest.quest_id == quest.id,
-        UserQuest.status.in_([QuestStatus.COMPLETED, QuestStatus.CLAIMED])
-    ).first()
-    
     if existing_quest:
-        last_completed = to_kst(existing_quest.completed_at).date() if existing_quest.completed_at else None
-        last_completed = to_kst(existing_quest.completed_at).date() if existing_quest.completed_at else None
-        freq_str = str(quest.frequency.name if hasattr(quest.frequency, 'name') else quest.frequency)
-
-        # [DAILY]
-        if "DAILY" in freq_str:
-            if existing_quest.status == QuestStatus.CLAIMED:
-                if last_completed == today:
-                    return {"already_completed": True, "message": "오늘 이미 완료한 퀘스트입니다."}
-                else:
-                    existing_quest.status = QuestStatus.COMPLETED
-                    existing_quest.completed_at = now_utc()
-
-            else:
-                existing_quest.status = QuestStatus.COMPLETED
-                existing_quest.completed_at = now_utc()
-        
-        # [WEEKLY]
-        elif "WEEKLY" in freq_str and last_completed:
-            current_year, current_week, _ = today.isocalendar()
-            last_year, last_week, _ = last_completed.isocalendar()
-            
-            if existing_quest.status == QuestStatus.CLAIMED:
-                if current_year == last_year and current_week == last_week:
-                    return {"already_completed": True, "message": "이번 주에 이미 완료한 퀘스트입니다."}
-                else:
-                    existing_quest.status = QuestStatus.COMPLETED
-                    existing_quest.completed_at = now_utc()
-            else:
-                existing_quest.status = QuestStatus.COMPLETED
-                existing_quest.completed_at = now_utc()
-
-        # [ONE TIME 등 기타]
-        else:
-             if existing_quest.status != QuestStatus.CLAIMED:
-                 existing_quest.status = QuestStatus.COMPLETED
-                 existing_quest.completed_at = now_utc()
+        in_period = is_in_current_period(quest.frequency, existing_quest.completed_at, today_kst, current_monday_kst)
+        freq_val = frequency_name(quest.frequency)
 
-    # 보상 지급을 하지 않고 상태만 COMPLETED로 변경 (이미 CLAIMED 면 변경 안 함)
-    if existing_quest:
-        if existing_quest.status != QuestStatus.CLAIMED:
-            existing_quest.completed_at = datetime.now(timezone.utc)
-            existing_quest.status = QuestStatus.COMPLETED
+        if existing_quest.status == QuestStatus.CLAIMED and in_period:
+            # [DAILY] / [WEEKLY]
+            if "DAILY" in freq_val:
+                return {"already_completed": True, "message": "오늘 이미 완료한 퀘스트입니다."}
+            if "WEEKLY" in freq_val:
+                return {"already_completed": True, "message": "이번 주에 이미 완료한 퀘스트입니다."}
+            # [ONE TIME 등 기타] 이미 수령했으면 변경 안 함
+            return result
+
+        if existing_quest.status == QuestStatus.COMPLETED and in_period:
+            return result
+
+        existing_quest.status = QuestStatus.COMPLETED
+        existing_quest.completed_at = now_utc()
     else:
         new_uq = UserQuest(
             user_id=user_id,
@@ -240,48 +268,52 @@ def complete_quest_by_title(db: Session, user_id: int, quest_title: QuestTitle)
             completed_at=now_utc()
         )
         db.add(new_uq)
-    
+
     db.commit()
-    return {
-        "quest_title": quest.title,
-        "status": QuestStatus.COMPLETED
-    }
+    return result
+
+
+def complete_quest_by_title(db: Session, user_id: int, quest_title: QuestTitle) -> Optional[Dict[str, Any]]:
+    quest = quest_catalog.get_by_title(db, quest_title)
+    if not quest:
+        return None
+
+    return _complete_quest(db, user_id, quest, _get_user_quest(db, user_id, quest.id))
 
 # ------------------------------------------------------------------
 # [Core] 퀘스트 보상 수령 (Claim)
 # ------------------------------------------------------------------
 def claim_quest_reward(db: Session, user_id: int, quest_id: int) -> Dict[str, Any]:
-    user_quest = db.query(UserQuest).filter(
-        UserQuest.user_id == user_id,
-        UserQuest.quest_id == quest_id
-    ).first()
+    user_quest = _get_user_quest(db, user_id, quest_id)
 
     if not user_quest:
         return {"success": False, "message": "퀘스트 기록이 없습니다."}
 
     if user_quest.status == QuestStatus.CLAIMED:
         return {"success": False, "message": "이미 보상을 수령했습니다."}
-    
+
     if user_quest.status != QuestStatus.COMPLETED:
         return {"success": False, "message": "아직 퀘스트 조건을 달성하지 못했습니다."}
 
+    quest = quest_catalog.get_by_id(db, quest_id)
+    if not quest:
+        return {"success": False, "message": "퀘스트를 찾을 수 없습니다."}
+
     from app.crud import crud_avatar
     avatar = crud_avatar.get_avatar_by_user_id(db, user_id)
     if not avatar:
         return {"success": False, "message": "아바타를 찾을 수 없습니다."}
 
-    quest = db.query(Quest).filter(Quest.id == quest_id).first()
-    
     try:
         old_level = avatar.level
         avatar_service.add_experience(db, avatar, quest.exp_reward)
-        
+
         user_quest.status = QuestStatus.CLAIMED
         db.commit()
 
         if quest.title == QuestTitle.DAILY_CHECKIN:
             check_weekly_attendance(db, user_id)
-            
+
         db.refresh(avatar)
 
         return {
@@ -302,11 +334,7 @@ def claim_quest_reward(db: Session, user_id: int, quest_id: int) -> Dict[str, An
 # [Helper] 방명록 퀘스트 체크
 # ------------------------------------------------------------------
 def check_guestbook_quest_achievements(db: Session, user_id: int) -> Optional[Dict[str, Any]]:
-    quest = db.query(Quest).filter(
-        Quest.title == QuestTitle.GUESTBOOK_THREE_TIMES,
-        Quest.is_active == True
-    ).first()
-    
+    quest = quest_catalog.get_by_title(db, QuestTitle.GUESTBOOK_THREE_TIMES)
     if not quest:
         return None
 
@@ -314,23 +342,20 @@ def check_guestbook_quest_achievements(db: Session, user_id: int) -> Optional[Di
     monday = get_monday_of_week_kst(now)
 
     # 이번 주에 이미 완료(COMPLETED) 또는 수령(CLAIMED)했는지 확인
-    already_done = db.query(UserQuest).filter(
-        UserQuest.user_id == user_id,
-        UserQuest.quest_id == quest.id,
-        UserQuest.status.in_([QuestStatus.COMPLETED, QuestStatus.CLAIMED]),
-        UserQuest.completed_at >= monday.replace(tzinfo=None)
-    ).first()
-
-    if already_done:
+    user_quest = _get_user_quest(db, user_id, quest.id)
+    if (user_quest
+            and user_quest.status in (QuestStatus.COMPLETED, QuestStatus.CLAIMED)
+            and user_quest.completed_at
+            and to_utc(user_quest.completed_at) >= monday):
         return None
 
     from app.models.guestbook import Guestbook
-    count = db.query(Guestbook).filter(
+    count = db.query(func.count(Guestbook.id)).filter(
         Guestbook.author_id == user_id,
         Guestbook.created_at >= monday.replace(tzinfo=None)
-    ).count()
+    ).scalar() or 0
 
     if count >= 3:
-        return complete_quest_by_title(db, user_id, QuestTitle.GUESTBOOK_THREE_TIMES)
-        
-    return None
\ No newline at end of file
+        return _complete_quest(db, user_id, quest, user_quest)
+
+    return None
@@ -1,8 +1,30 @@
 import hashlib
+import time
+import uuid
+from collections import defaultdict
 from datetime import date
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from app.models import User, UserDashboard, BlogVisitLog
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.upsert import build_increment_upsert
+from app.models import User, BlogVisitLog, BlogVisitDaily
+from app.utils.datetime_utils import get_kst_date
+
+def increment_daily_uv(db: Session, owner_id: int, visit_date, amount: int = 1):
+    """
+    일별 집계 행의 uv를 원자적으로 증가 (행이 없으면 생성)
+    - 커밋은 호출 측에서
+    """
+    stmt = build_increment_upsert(
+        db.get_bind().dialect.name,
+        BlogVisitDaily,
+        [{"owner_id": owner_id, "visit_date": visit_date, "uv": amount}],
+        key_columns=("owner_id", "visit_date"),
+        increment_columns=("uv",),
+    )
+    db.execute(stmt)
+
 
 def process_visit_log(db: Session, username: str, client_ip: str):
     """
@@ -14,28 +36,22 @@ def process_visit_log(db: Session, username: str, client_ip: str):
         return
 
     # 2. IP 해싱 (개인정보 보호)
-    visitor_hash = hashlib.sha256(client_ip.encode()).hexdigest()
-    today = date.today()
+    visitor_hash = hash_visitor(client_ip)
+    today = get_kst_date()
 
     # 3. 중복 체크 (DB 레벨)
     try:
-        # 로그 생성 시도
+        # 로그 생성 시도 (중복이면 flush 시점에 IntegrityError 발생)
         new_log = BlogVisitLog(
             owner_id=owner.id,
             visitor_ip_hash=visitor_hash,
             visit_date=today
         )
         db.add(new_log)
-        db.commit() # 여기서 중복이면 IntegrityError 발생
-
-        # 4. 성공 시(처음 온 경우) -> 대시보드 카운트 증가
-        dashboard = db.query(UserDashboard).filter(UserDashboard.user_id == owner.id).first()
-        if not dashboard:
-            dashboard = UserDashboard(user_id=owner.id)
-            db.add(dashboard)
-        
-        dashboard.total_visitors += 1
-        dashboard.today_visitors = (dashboard.today_visitors or 0) + 1
+        db.flush()
+
+        # 4. 성공 시(처음 온 경우) -> 일별 집계 증가 (로그와 같은 트랜잭션에서 원자적 UPSERT)
+        increment_daily_uv(db, owner.id, today)
         db.commit()
         print(f"✅ Visit counted for {username}")
 
@@ -44,4 +60,208 @@ def process_visit_log(db: Session, username: str, client_ip: str):
         print(f"ℹ️ Duplicate visit ignored for {username}")
     except Exception as e:
         db.rollback()
-        print(f"❌ Tracking Error: {e}")
\ No newline at end of file
+        print(f"❌ Tracking Error: {e}")
+
+
+def process_visit_log_in_new_session(username: str, client_ip: str):
+    """[Fallback] Redis를 쓸 수 없을 때 백그라운드에서 자체 세션으로 DB에 직접 기록"""
+    db = SessionLocal()
+    try:
+        process_visit_log(db, username, client_ip)
+    finally:
+        db.close()
+
+
+def prune_visit_logs(db: Session, keep_days: int, batch_size: int = 5000) -> int:
+    """
+    보존 기간이 지난 원본 방문 로그 삭제 (통계는 BlogVisitDaily에 남아 있음)
+    - 오늘 로그는 중복 체크에 필요하므로 keep_days는 최소 1일
+    - 한 번에 batch_size개씩 나눠 삭제 (긴 락 방지)
+    """
+    from datetime import timedelta
+    cutoff = get_kst_date() - timedelta(days=max(keep_days, 1))
+
+    deleted_total = 0
+    while True:
+        ids = [
+            row_id for (row_id,) in db.query(BlogVisitLog.id).filter(
+                BlogVisitLog.visit_date < cutoff
+            ).limit(batch_size).all()
+        ]
+        if not ids:
+            break
+        deleted_total += db.query(BlogVisitLog).filter(
+            BlogVisitLog.id.in_(ids)
+        ).delete(synchronize_session=False)
+        db.commit()
+    return deleted_total
+
+
+# =========================================================
+# Redis 방문 수집 (요청 경로에서 DB 접근 없음)
+# - 방문자 중복 제거: 주인/일자별 HyperLogLog(기본) 또는 Set
+# - 새 방문자면 pending 해시의 "{날짜}|{username}" 필드 +1
+# - Celery beat가 주기적으로 pending 해시를 가져가 DB 일별 집계에 일괄 반영
+# =========================================================
+VISIT_KEY_PREFIX = "eggit:visits"
+PENDING_KEY = f"{VISIT_KEY_PREFIX}:pending"
+FLUSHING_KEY_PREFIX = f"{VISIT_KEY_PREFIX}:flushing:"
+DEDUP_KEY_TTL_SECONDS = 60 * 60 * 48  # 날짜가 바뀐 뒤에도 하루 여유
+FLUSH_UPSERT_BATCH_SIZE = 1000        # multi-row UPSERT 1문장당 최대 행 수
+RECOVER_LOCK_KEY = f"{VISIT_KEY_PREFIX}:flush-recover-lock"
+RECOVER_LOCK_SECONDS = 60
+
+# 토큰이 일치할 때만 락 해제
+_RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# KEYS[1]: 중복 제거 키, KEYS[2]: pending 해시 / ARGV: 방문자 해시, 필드, TTL, 모드
+# 왕복 1회로 "처음 온 방문자면 카운트 증가"를 원자적으로 처리
+_RECORD_VISIT_LUA = """
+local added
+if ARGV[4] == 'set' then
+    added = redis.call('SADD', KEYS[1], ARGV[1])
+else
+    added = redis.call('PFADD', KEYS[1], ARGV[1])
+end
+if added == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+    redis.call('HINCRBY', KEYS[2], ARGV[2], 1)
+end
+return added
+"""
+
+_async_redis = None
+_record_visit_script = None
+
+
+def _get_record_visit_script():
+    global _async_redis, _record_visit_script
+    if _record_visit_script is None:
+        import redis.asyncio as redis
+        _async_redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        _record_visit_script = _async_redis.register_script(_RECORD_VISIT_LUA)
+    return _record_visit_script
+
+
+def hash_visitor(client_ip: str) -> str:
+    """IP 해싱 (개인정보 보호)"""
+    return hashlib.sha256(client_ip.encode()).hexdigest()
+
+
+async def record_visit(username: str, client_ip: str) -> bool:
+    """
+    방문 1건을 Redis에 기록 (새 방문자면 True)
+    - Redis 장애 시 redis.exceptions.RedisError 그대로 전파 (호출 측에서 DB 경로로 대체)
+    """
+    today = get_kst_date()
+    mode = "set" if settings.VISIT_DEDUP_MODE == "set" else "hll"
+    script = _get_record_visit_script()
+    added = await script(
+        keys=[f"{VISIT_KEY_PREFIX}:uv:{today.isoformat()}:{username}", PENDING_KEY],
+        args=[hash_visitor(client_ip), f"{today.isoformat()}|{username}", DEDUP_KEY_TTL_SECONDS, mode],
+    )
+    return added == 1
+
+
+def flush_pending_visits(db: Session, redis_client) -> int:
+    """
+    pending 해시를 DB 일별 집계(BlogVisitDaily)에 일괄 반영
+    1. pending 해시를 이번 실행 전용 이름(flushing:{생성 시각}:{uuid})으로 RENAME
+       (이후 들어오는 방문은 새 pending에 쌓이고, 동시에 도는 다른 실행은 이 배치를 건드리지 않음)
+    2. username -> owner_id 일괄 조회 (IN 1회)
+    3. multi-row UPSERT 1회 + 커밋 후 배치 해시 삭제
+    - 이전 실행이 중간에 죽어 남은 배치는 VISIT_FLUSH_ORPHAN_SECONDS가 지난 것만, 회수 락을 잡은 실행 1개가 처리
+      (커밋 직후 삭제 전에 죽은 경우에는 그 배치가 한 번 더 반영될 수 있음)
+    """
+    import redis
+
+    flushed = 0
+    batch_key = _new_batch_key()
+    try:
+        redis_client.rename(PENDING_KEY, batch_key)
+    except redis.exceptions.ResponseError:
+        batch_key = None  # pending 없음 (이번 주기 방문 없음)
+
+    if batch_key:
+        flushed += _flush_batch(db, redis_client, batch_key)
+    flushed += _recover_orphan_batches(db, redis_client)
+    return flushed
+
+
+def _new_batch_key() -> str:
+    return f"{FLUSHING_KEY_PREFIX}{int(time.time())}:{uuid.uuid4().hex}"
+
+
+def _batch_created_at(key: str) -> int:
+    """배치 키의 생성 시각 (시각이 없는 이전 형식 키는 0 → 바로 회수 대상)"""
+    created_at = key[len(FLUSHING_KEY_PREFIX):].split(":", 1)[0]
+    return int(created_at) if created_at.isdigit() else 0
+
+
+def _flush_batch(db: Session, redis_client, key: str) -> int:
+    counts = redis_client.hgetall(key)
+    flushed = _apply_visit_counts(db, counts) if counts else 0
+    redis_client.delete(key)
+    return flushed
+
+
+def _recover_orphan_batches(db: Session, redis_client) -> int:
+    import redis
+
+    token = uuid.uuid4().hex
+    if not redis_client.set(RECOVER_LOCK_KEY, token, nx=True, ex=RECOVER_LOCK_SECONDS):
+        return 0  # 다른 실행이 회수 중
+
+    flushed = 0
+    try:
+        cutoff = time.time() - settings.VISIT_FLUSH_ORPHAN_SECONDS
+        for key in list(redis_client.scan_iter(match=f"{FLUSHING_KEY_PREFIX}*")):
+            if _batch_created_at(key) > cutoff:
+                continue  # 아직 다른 실행이 처리 중일 수 있음
+            # 회수한 배치도 새 전용 키로 옮긴 뒤 처리 (RENAME은 원자적이라 한 실행만 가져감)
+            claimed_key = _new_batch_key()
+            try:
+                redis_client.rename(key, claimed_key)
+            except redis.exceptions.ResponseError:
+                continue
+            print(f"⚠️ [Visits] Recovering orphan batch {key}")
+            flushed += _flush_batch(db, redis_client, claimed_key)
+    finally:
+        redis_client.eval(_RELEASE_LOCK_LUA, 1, RECOVER_LOCK_KEY, token)
+    return flushed
+
+
+def _apply_visit_counts(db: Session, counts: dict) -> int:
+    """{"2026-10-19|username": "3", ...} -> BlogVisitDaily UPSERT (반영한 방문 수 반환)"""
+    per_user = defaultdict(int)
+    for field, value in counts.items():
+        day, username = field.split("|", 1)
+        per_user[(username, date.fromisoformat(day))] += int(value)
+
+    usernames = {username for username, _ in per_user}
+    owner_ids = dict(db.query(User.username, User.id).filter(User.username.in_(usernames)).all())
+
+    rows = [
+        {"owner_id": owner_ids[username], "visit_date": day, "uv": uv}
+        for (username, day), uv in per_user.items()
+        if username in owner_ids
+    ]
+    if not rows:
+        return 0
+
+    dialect_name = db.get_bind().dialect.name
+    for start in range(0, len(rows), FLUSH_UPSERT_BATCH_SIZE):
+        db.execute(build_increment_upsert(
+            dialect_name,
+            BlogVisitDaily,
+            rows[start:start + FLUSH_UPSERT_BATCH_SIZE],
+            key_columns=("owner_id", "visit_date"),
+            increment_columns=("uv",),
+        ))
+    db.commit()
+    return sum(row["uv"] for row in rows)
@@ -1,7 +1,25 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from typing import Optional, List
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, case, select, union_all, Select
+from typing import Optional, List, Tuple
 from app.models.friend import Friendship, FriendStatus
+from app.models.user import User
+
+
+def ordered_pair(user_id: int, friend_id: int) -> Tuple[int, int]:
+    """(작은 ID, 큰 ID) - Friendship.user_low_id / user_high_id 조회용"""
+    return (user_id, friend_id) if user_id < friend_id else (friend_id, user_id)
+
+
+def _pair_filter(user_id: int, friend_id: int):
+    """두 유저의 관계 행 조건 (uq_friendship_pair 유니크 인덱스 1회 조회)"""
+    low, high = ordered_pair(user_id, friend_id)
+    return (Friendship.user_low_id == low) & (Friendship.user_high_id == high)
+
+
+def _involves(user_id: int):
+    """유저가 포함된 관계 행 조건 (low: 유니크 인덱스 선두, high: ix_friendships_high_low)"""
+    return or_(Friendship.user_low_id == user_id, Friendship.user_high_id == user_id)
 
 
 def check_friendship(db: Session, user_id: int, friend_id: int) -> bool:
@@ -16,14 +34,11 @@ def check_friendship(db: Session, user_id: int, friend_id: int) -> bool:
     Returns:
         bool: 친구 관계이면 True, 아니면 False
     """
-    friendship = db.query(Friendship).filter(
-        Friendship.status == FriendStatus.ACCEPTED,
-        or_(
-            (Friendship.requester_id == user_id) & (Friendship.addressee_id == friend_id),
-            (Friendship.requester_id == friend_id) & (Friendship.addressee_id == user_id)
-        )
-    ).first()
-    return friendship is not None
+    friendship_id = db.query(Friendship.id).filter(
+        _pair_filter(user_id, friend_id),
+        Friendship.status == FriendStatus.ACCEPTED
+    ).scalar()
+    return friendship_id is not None
 
 
 def get_friendship(db: Session, user_id: int, friend_id: int) -> Optional[Friendship]:
@@ -38,12 +53,7 @@ def get_friendship(db: Session, user_id: int, friend_id: int) -> Optional[Friend
     Returns:
         Optional[Friendship]: 친구 관계 객체 또는 None
     """
-    return db.query(Friendship).filter(
-        or_(
-            (Friendship.requester_id == user_id) & (Friendship.addressee_id == friend_id),
-            (Friendship.requester_id == friend_id) & (Friendship.addressee_id == user_id)
-        )
-    ).first()
+    return db.query(Friendship).filter(_pair_filter(user_id, friend_id)).first()
 
 
 def get_accepted_friendship(db: Session, user_id: int, friend_id: int) -> Optional[Friendship]:
@@ -59,11 +69,8 @@ def get_accepted_friendship(db: Session, user_id: int, friend_id: int) -> Option
         Optional[Friendship]: ACCEPTED 상태의 친구 관계 객체 또는 None
     """
     return db.query(Friendship).filter(
-        Friendship.status == FriendStatus.ACCEPTED,
-        or_(
-            (Friendship.requester_id == user_id) & (Friendship.addressee_id == friend_id),
-            (Friendship.requester_id == friend_id) & (Friendship.addressee_id == user_id)
-        )
+        _pair_filter(user_id, friend_id),
+        Friendship.status == FriendStatus.ACCEPTED
     ).first()
 
 
@@ -78,21 +85,16 @@ def get_friend_ids(db: Session, user_id: int) -> List[int]:
     Returns:
         List[int]: 친구 ID 목록
     """
-    friendships = db.query(Friendship).filter(
-        Friendship.status == FriendStatus.ACCEPTED,
-        or_(
-            Friendship.requester_id == user_id,
-            Friendship.addressee_id == user_id
-        )
-    ).all()
-    
-    friend_ids = []
-    for fs in friendships:
-        # 상대방 ID 추출
-        friend_id = fs.addressee_id if fs.requester_id == user_id else fs.requester_id
-        friend_ids.append(friend_id)
-    
-    return friend_ids
+    # 내가 low인 행과 high인 행을 각각 인덱스로 찾아 상대방 ID만 합침 (OR 스캔 없음)
+    as_low = select(Friendship.user_high_id).where(
+        Friendship.user_low_id == user_id,
+        Friendship.status == FriendStatus.ACCEPTED
+    )
+    as_high = select(Friendship.user_low_id).where(
+        Friendship.user_high_id == user_id,
+        Friendship.status == FriendStatus.ACCEPTED
+    )
+    return list(db.execute(union_all(as_low, as_high)).scalars())
 
 
 def get_accepted_friendships(db: Session, user_id: int) -> List[Friendship]:
@@ -107,9 +109,45 @@ def get_accepted_friendships(db: Session, user_id: int) -> List[Friendship]:
         List[Friendship]: 친구 관계 객체 목록
     """
     return db.query(Friendship).filter(
-        Friendship.status == FriendStatus.ACCEPTED,
-        or_(
-            Friendship.requester_id == user_id,
-            Friendship.addressee_id == user_id
+        _involves(user_id),
+        Friendship.status == FriendStatus.ACCEPTED
+    ).all()
+
+# ------------------------------------------------------------------
+# 비동기 세션용 (AsyncSession)
+# ------------------------------------------------------------------
+def friend_id_expr(user_id: int):
+    """친구 관계 행에서 상대방 ID를 고르는 SQL 식"""
+    return case(
+        (Friendship.user_low_id == user_id, Friendship.user_high_id),
+        else_=Friendship.user_low_id
+    )
+
+
+def select_accepted_friend_users(user_id: int) -> Select:
+    """
+    수락된 친구들의 User 목록 쿼리 (JOIN 1회, 친구 수와 무관)
+    
+    Args:
+        user_id: 유저 ID
+        
+    Returns:
+        Select: User 엔티티를 반환하는 select 문 (동기/비동기 세션 공용)
+    """
+    return select(User).join(
+        Friendship, User.id == friend_id_expr(user_id)
+    ).where(
+        _involves(user_id),
+        Friendship.status == FriendStatus.ACCEPTED
+    ).order_by(Friendship.id)
+
+
+async def check_friendship_async(db: AsyncSession, user_id: int, friend_id: int) -> bool:
+    """check_friendship의 비동기 버전"""
+    friendship_id = await db.scalar(
+        select(Friendship.id).where(
+            _pair_filter(user_id, friend_id),
+            Friendship.status == FriendStatus.ACCEPTED
         )
-    ).all()
\ No newline at end of file
+    )
+    return friendship_id is not None
@@ -1,9 +1,12 @@
 # app/worker.py
 
 import asyncio
+import json
 import logging
+import time
 import traceback
 from datetime import datetime
+from typing import Optional
 from celery import Celery, signals
 from celery.schedules import crontab
 from celery.utils.log import get_task_logger
@@ -15,9 +18,15 @@ from app.models.quest import QuestTitle
 from app.models.user import User
 from app.models.gift import DailyGift
 from app.core.security import decrypt_token
+from app.core.socket_manager import TASK_EVENTS_CHANNEL
+from app.core import deploy_timing
 
 # 서비스 임포트
 from app.services.blog.github_blog_service import BlogDeployService
+from app.services.blog.deploy_coordinator import repo_lock, release_idempotency_key
+from app.services.github.github_writer import GithubWriter, is_conflict
+from app.services.blog.git_data_api import GitDataApiError
+from app.services.blog import repo_metadata
 from app.services.github.github_client import GithubClient
 from app.services.github.github_context_builder import GithubContextBuilder
 from app.services.ai.ai_docs_site_generator import AiDocsBlogGenerator
@@ -28,7 +37,7 @@ from app.services.ai.ai_posting_service import AiPostingService
 from app.services.ai.docs_generator import DocsGeneratorService
 from app.services.ai.gift_generator import GiftGeneratorService
 from app.services.gift_service_logic import run_gift_generation_sync
-from github import Github, GithubException
+import redis
 
 # 워커 로거
 logger = get_task_logger(__name__)
@@ -46,28 +55,109 @@ celery_app.conf.update(
     result_expires=3600, 
     timezone='Asia/Seoul', 
     enable_utc=False, 
+    # 작업 종류별 큐 분리 (워커도 큐별로 띄워 동시 실행 수를 따로 제한)
+    # - deploy: git/GitHub 쓰기 (무거움, 저장소별 락) / llm: AI 생성 / maintenance: 주기 작업·후속 작업
+    task_default_queue="maintenance",
+    task_routes={
+        "app.worker.task_deploy_chirpy": {"queue": "deploy"},
+        "app.worker.task_deploy_docs": {"queue": "deploy"},
+        "app.worker.task_post_to_blog": {"queue": "deploy"},
+        # 템플릿 저장소는 deploy 워커의 로컬 디스크에 있음
+        "app.worker.task_gc_template_store": {"queue": "deploy"},
+        "app.worker.task_generate_draft": {"queue": "llm"},
+        "app.worker.task_generate_user_gift": {"queue": "llm"},
+    },
+    # 긴 작업을 미리 가져가 다른 워커가 놀지 않도록
+    worker_prefetch_multiplier=1,
 )
 
 
 # =================================================================
-# 1. 기술 블로그 배포 워커 (Chirpy)
+# 0. 작업 상태 이벤트 발행 (API 프로세스의 실시간 소켓으로 전달)
 # =================================================================
-@celery_app.task(bind=True)
-def task_deploy_chirpy(self, token: str, repo_name: str, user_info: dict):
+_event_publisher = redis.Redis.from_url(settings.REDIS_URL)
+# 작업용 Redis 클라이언트 (방문 카운터, GitHub 통계 락 등)
+_redis_client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+# 작업 실행 시간 (task_id → 시작 시각, 같은 프로세스의 prerun/postrun 사이)
+_task_started = {}
+
+@signals.task_prerun.connect
+def mark_task_start(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@signals.task_postrun.connect
+def record_task_runtime(task_id=None, task=None, state=None, **kwargs):
+    """작업 1회 실행 시간을 배포 단계 지표(task.<이름>)로 기록 (RETRY/FAILURE는 실패로 집계)"""
+    started = _task_started.pop(task_id, None)
+    if started is not None and task is not None:
+        deploy_timing.record(f"task.{task.name.rsplit('.', 1)[-1]}", time.perf_counter() - started, ok=state == "SUCCESS")
+
+
+@signals.task_postrun.connect
+def publish_task_event(task_id=None, state=None, **kwargs):
+    """작업 종료 시 상태를 Redis Pub/Sub으로 발행 (구독 중인 클라이언트는 폴링 없이 수신)"""
     try:
-        service = BlogDeployService(user_token=token)
-        service.deploy_chirpy_blog(repo_name, user_info)
-        return {"status": "success", "repo": repo_name, "type": "chirpy"}
+        _event_publisher.publish(TASK_EVENTS_CHANNEL, json.dumps({"task_id": task_id, "status": state}))
     except Exception as e:
-        logger.error(f"❌ Chirpy Deploy Task Failed: {e}")
-        raise self.retry(exc=e, countdown=10, max_retries=3)
+        logger.warning(f"⚠️ Task event publish failed: {e}")
+
+
+# =================================================================
+# 0-1. 배포/포스팅 공통 (저장소별 직렬 실행 + 멱등 키 정리)
+# =================================================================
+def _defer_while_repo_busy(task, repo_full_name: str):
+    """
+    같은 저장소의 다른 배포/포스팅이 진행 중이면 뒤로 미룸
+    - 대기 횟수는 lock_deferrals로 따로 세어 실패 재시도 횟수(max_retries)를 소모하지 않음
+    """
+    kwargs = dict(task.request.kwargs or {})
+    kwargs["lock_deferrals"] = kwargs.get("lock_deferrals", 0) + 1
+    logger.info(f"⏳ {repo_full_name} is busy. Retrying in {settings.DEPLOY_LOCK_RETRY_SECONDS}s")
+    raise task.retry(kwargs=kwargs, countdown=settings.DEPLOY_LOCK_RETRY_SECONDS, max_retries=task.request.retries + 1)
+
+
+def _retry_or_release(task, exc: Exception, idempotency_key: Optional[str], countdown: int, max_retries: int = 3):
+    """실패 재시도 (마지막 시도였다면 같은 요청을 다시 제출할 수 있도록 멱등 키 해제)"""
+    deferrals = (task.request.kwargs or {}).get("lock_deferrals", 0)
+    if task.request.retries - deferrals >= max_retries:
+        release_idempotency_key(_redis_client, idempotency_key)
+    raise task.retry(exc=exc, countdown=countdown, max_retries=max_retries + deferrals)
+
+
+# =================================================================
+# 1. 기술 블로그 배포 워커 (Chirpy)
+# =================================================================
+@celery_app.task(bind=True)
+def task_deploy_chirpy(
+    self, token: str, repo_name: str, user_info: dict,
+    deploy_backend: Optional[str] = None, idempotency_key: Optional[str] = None, lock_deferrals: int = 0,
+    update: bool = False
+):
+    repo_full_name = f"{user_info['github_username']}/{repo_name}"
+    with repo_lock(_redis_client, repo_full_name) as acquired:
+        if not acquired:
+            _defer_while_repo_busy(self, repo_full_name)
+        try:
+            service = BlogDeployService(user_token=token, deploy_backend=deploy_backend)
+            service.deploy_chirpy_blog(repo_name, user_info, update=update)
+            release_idempotency_key(_redis_client, idempotency_key)
+            return {"status": "success", "repo": repo_name, "type": "chirpy"}
+        except Exception as e:
+            logger.error(f"❌ Chirpy Deploy Task Failed: {e}")
+            _retry_or_release(self, e, idempotency_key, countdown=10)
 
 
 # =================================================================
 # 2. 문서 사이트 배포 워커 (Docs - AI Integration)
 # =================================================================
 @celery_app.task(bind=True)
-def task_deploy_docs(self, token: str, target_repo: str, project_info: dict):
+def task_deploy_docs(
+    self, token: str, target_repo: str, project_info: dict,
+    deploy_backend: Optional[str] = None, idempotency_key: Optional[str] = None, lock_deferrals: int = 0,
+    update: bool = False
+):
     logger.info(f"🚀 Starting Docs Deployment for: {target_repo}")
 
     async def generate_ai_content():
@@ -92,66 +182,81 @@ def task_deploy_docs(self, token: str, target_repo: str, project_info: dict):
         
         return structure_data
 
-    try:
+    # AI 구조 생성까지 락 안에서 실행 (락 대기로 재시도될 때 AI 호출이 중복되지 않도록)
+    with repo_lock(_redis_client, target_repo) as acquired:
+        if not acquired:
+            _defer_while_repo_busy(self, target_repo)
         try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            try:
+                loop = asyncio.get_event_loop()
+            except RuntimeError:
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
             
-        docs_structure = None
-        try:
-            docs_structure = loop.run_until_complete(generate_ai_content())
-            if docs_structure and "root_structure" in docs_structure:
-                logger.info(f"✅ AI Generated {len(docs_structure['root_structure'])} categories.")
-            else:
-                logger.warning("⚠️ AI structure generation returned empty.")
-        except Exception as ai_error:
-            logger.error(f"❌ AI Generation skipped due to error: {ai_error}")
-
-        service = BlogDeployService(user_token=token)
-        service.deploy_docs_site(target_repo, project_info, docs_structure=docs_structure)
+            docs_structure = None
+            try:
+                # update(테마/설정 변경)는 기존 문서를 유지하므로 AI 구조 생성 생략
+                if not update:
+                    docs_structure = loop.run_until_complete(generate_ai_content())
+                if update:
+                    logger.info("ℹ️ Update deploy: keeping existing docs pages.")
+                elif docs_structure and "root_structure" in docs_structure:
+                    logger.info(f"✅ AI Generated {len(docs_structure['root_structure'])} categories.")
+                else:
+                    logger.warning("⚠️ AI structure generation returned empty.")
+            except Exception as ai_error:
+                logger.error(f"❌ AI Generation skipped due to error: {ai_error}")
+
+            service = BlogDeployService(user_token=token, deploy_backend=deploy_backend)
+            service.deploy_docs_site(target_repo, project_info, docs_structure=docs_structure, update=update)
+            release_idempotency_key(_redis_client, idempotency_key)
         
-        return {
-            "status": "success", 
-            "repo": target_repo, 
-            "type": "docs",
-            "ai_generated": bool(docs_structure)
-        }
+            return {
+                "status": "success", 
+                "repo": target_repo, 
+                "type": "docs",
+                "ai_generated": bool(docs_structure)
+            }
 
-    except Exception as e:
-        logger.error(f"❌ Docs Deploy Task Failed: {e}")
-        raise self.retry(exc=e, countdown=10, max_retries=3)
+        except Exception as e:
+            logger.error(f"❌ Docs Deploy Task Failed: {e}")
+            _retry_or_release(self, e, idempotency_key, countdown=10)
 
 
 # =================================================================
 # 5. 포스팅 업로드 워커
 # =================================================================
 @celery_app.task(bind=True)
-def task_post_to_blog(self, token: str, post_data_dict: dict, user_id: int):
+def task_post_to_blog(
+    self, token: str, post_data_dict: dict, user_id: int,
+    idempotency_key: Optional[str] = None, lock_deferrals: int = 0
+):
     try:
         req = FinalPostRequest(**post_data_dict)
-        g = Github(token)
+        writer = GithubWriter(token)
         target_repo_name = req.blog_repo.strip()
         if "/" not in target_repo_name:
-            auth_user = g.get_user() 
-            target_repo_name = f"{auth_user.login}/{target_repo_name}"
-        
-        repo = g.get_repo(target_repo_name)
-        target_branch = req.branch
-        
-        try:
-            repo.get_branch(target_branch)
-        except Exception:
-            if req.theme_type == "docs":
-                try:
-                    repo.get_branch("gh-pages")
-                    target_branch = "gh-pages"
-                except:
-                    target_branch = repo.default_branch
-            else:
-                target_branch = repo.default_branch
-            logger.info(f"🔧 Branch Adjusted: '{req.branch}' -> '{target_branch}'")
+            target_repo_name = f"{repo_metadata.resolve_login(_redis_client, writer, user_id)}/{target_repo_name}"
+    except Exception as e:
+        logger.error(f"❌ Post Task Failed: {e}")
+        _retry_or_release(self, e, idempotency_key, countdown=5)
+
+    with repo_lock(_redis_client, target_repo_name) as acquired:
+        if not acquired:
+            _defer_while_repo_busy(self, target_repo_name)
+        return _post_to_blog_locked(self, req, writer, target_repo_name, user_id, idempotency_key)
+
+
+def _is_blob_sha(value: Optional[str]) -> bool:
+    return bool(value) and len(value) == 40 and all(c in "0123456789abcdef" for c in value)
+
+
+def _post_to_blog_locked(
+    task, req: FinalPostRequest, writer: GithubWriter, target_repo_name: str, user_id: int, idempotency_key: Optional[str]
+):
+    try:
+        # 브랜치/파일 SHA는 캐시(repo_metadata) 사용 → 흔한 경우 GitHub 호출은 쓰기 1번
+        target_branch = repo_metadata.resolve_branch(_redis_client, writer, target_repo_name, req.branch, req.theme_type)
 
         builder = BlogPostBuilder(req)
         if req.mode == 'update' and req.file_path:
@@ -162,16 +267,32 @@ def task_post_to_blog(self, token: str, post_data_dict: dict, user_id: int):
 
         commit_msg = f"[{req.mode.upper()}] {req.title} (via Eggit)"
 
+        if req.mode == 'update' and req.file_path and _is_blob_sha(req.original_sha):
+            known_sha = req.original_sha
+        else:
+            known_sha = repo_metadata.get_file_sha(_redis_client, target_repo_name, target_branch, target_path)
+
         try:
-            contents = repo.get_contents(target_path, ref=target_branch)
-            logger.info(f"📂 File exists at {target_path}. Overwriting...")
-            repo.update_file(target_path, commit_msg, content, contents.sha, branch=target_branch)
-        except GithubException as e:
-            if e.status == 404:
-                logger.info(f"✨ File not found at {target_path}. Creating new...")
-                repo.create_file(target_path, commit_msg, content, branch=target_branch)
+            new_sha = writer.put_file(
+                target_repo_name, target_path, content, commit_msg, branch=target_branch, sha=known_sha
+            )
+        except GitDataApiError as e:
+            # SHA가 낡았거나(409/422) 브랜치가 사라짐(404) → 캐시 비우고 실제 상태로 1회 재시도
+            if not (is_conflict(e) or e.status_code == 404):
+                raise
+            logger.info(f"🔄 Stale repo metadata for {target_repo_name} ({e.status_code}). Refreshing...")
+            repo_metadata.invalidate(_redis_client, target_repo_name)
+            target_branch = repo_metadata.resolve_branch(_redis_client, writer, target_repo_name, req.branch, req.theme_type)
+            existing = writer.get_file(target_repo_name, target_path, ref=target_branch)
+            if existing:
+                logger.info(f"📂 File exists at {target_path}. Overwriting...")
             else:
-                raise e
+                logger.info(f"✨ File not found at {target_path}. Creating new...")
+            new_sha = writer.put_file(
+                target_repo_name, target_path, content, commit_msg,
+                branch=target_branch, sha=existing.sha if existing else None
+            )
+        repo_metadata.remember_file_sha(_redis_client, target_repo_name, target_branch, target_path, new_sha)
 
         db = SessionLocal()
         try:
@@ -216,13 +337,14 @@ def task_post_to_blog(self, token: str, post_data_dict: dict, user_id: int):
         finally:
             db.close()
 
+        release_idempotency_key(_redis_client, idempotency_key)
         return {"status": "success", "path": target_path, "url": post_url}
 
     except Exception as e:
         logger.error(f"❌ Post Task Failed: {e}")
         if hasattr(e, 'data'):
             logger.error(f"Github API Error Data: {e.data}")
-        raise self.retry(exc=e, max_retries=3, countdown=5)
+        _retry_or_release(task, e, idempotency_key, countdown=5)
 
 
 # =================================================================
@@ -274,6 +396,173 @@ def task_cleanup_old_quest_records():
     finally:
         db.close()
 
+# =================================================================
+# 5-1. 방문 로그 정리 워커 (Retention)
+# =================================================================
+@celery_app.task
+def task_prune_visit_logs():
+    """
+    매일 04:00에 실행
+    - 보존 기간(VISIT_LOG_RETENTION_DAYS)이 지난 blog_visit_logs 삭제
+    - 방문자 통계는 blog_visit_daily 집계 테이블에 남아 있으므로 손실 없음
+    """
+    from app.services.tracking_service import prune_visit_logs
+
+    db = SessionLocal()
+    try:
+        deleted_count = prune_visit_logs(db, settings.VISIT_LOG_RETENTION_DAYS)
+        logger.info(f"✅ Visit log retention: Deleted {deleted_count} logs older than {settings.VISIT_LOG_RETENTION_DAYS} days.")
+        return f"Successfully deleted {deleted_count} visit logs."
+    except Exception as e:
+        logger.error(f"❌ Visit Log Prune Task Failed: {e}")
+        db.rollback()
+        return str(e)
+    finally:
+        db.close()
+
+# =================================================================
+# 5-1-1. 템플릿 저장소 정리 워커 (deploy 큐)
+# =================================================================
+@celery_app.task
+def task_gc_template_store():
+    """
+    TEMPLATE_STORE_GC_INTERVAL_SECONDS마다 실행
+    - update 배포가 받아온 유저 저장소 오브젝트 중 참조가 끊긴 것을 git gc로 삭제
+    """
+    from app.services.blog.template_store import get_template_store
+
+    try:
+        get_template_store().gc()
+        logger.info("✅ Template store gc finished")
+    except Exception as e:
+        logger.error(f"❌ Template Store GC Task Failed: {e}")
+        return str(e)
+
+# =================================================================
+# 5-2. 방문 카운트 반영 워커 (Redis -> DB 일괄 반영)
+# =================================================================
+@celery_app.task
+def task_flush_visit_counters():
+    """
+    VISIT_FLUSH_INTERVAL_SECONDS마다 실행
+    - /dashboard/visit이 Redis에 쌓아둔 일자별 신규 방문자 수를 blog_visit_daily에 일괄 UPSERT
+    """
+    from app.services.tracking_service import flush_pending_visits
+
+    db = SessionLocal()
+    try:
+        flushed = flush_pending_visits(db, _redis_client)
+        if flushed:
+            logger.info(f"✅ Visit counters flushed: {flushed} visits")
+        return flushed
+    except Exception as e:
+        logger.error(f"❌ Visit Flush Task Failed: {e}")
+        db.rollback()
+        return str(e)
+    finally:
+        db.close()
+
+# =================================================================
+# 5-3. GitHub 통계 갱신 워커 (stale-while-revalidate)
+# =================================================================
+@celery_app.task
+def task_refresh_github_stats(user_id: int):
+    """대시보드 조회 시 통계가 오래됐으면 예약됨 (유저별 분산 락으로 동시에 1개만 실행)"""
+    from app.services.github_stats_service import refresh_user_stats
+
+    db = SessionLocal()
+    try:
+        refreshed = refresh_user_stats(db, _redis_client, user_id)
+        if refreshed:
+            logger.info(f"✅ GitHub stats refreshed for user {user_id}")
+        return refreshed
+    except Exception as e:
+        logger.error(f"❌ GitHub Stats Refresh Failed (user {user_id}): {e}")
+        return str(e)
+    finally:
+        db.close()
+
+@celery_app.task
+def task_sweep_github_stats():
+    """GITHUB_STATS_SWEEP_INTERVAL_SECONDS마다 최근 활동 유저의 오래된 통계를 미리 갱신 예약"""
+    from app.services.github_stats_service import sweep_stale_stats
+
+    db = SessionLocal()
+    try:
+        enqueued = sweep_stale_stats(db, _redis_client)
+        if enqueued:
+            logger.info(f"🔄 GitHub stats sweep: {len(enqueued)} refreshes enqueued")
+        return len(enqueued)
+    except Exception as e:
+        logger.error(f"❌ GitHub Stats Sweep Failed: {e}")
+        return str(e)
+    finally:
+        db.close()
+
+# =================================================================
+# 5-4. 회원 탈퇴 데이터 삭제 워커 (chunk 단위, 재개 가능)
+# =================================================================
+@celery_app.task
+def task_delete_account(job_id: int):
+    """DELETE /users/me가 등록한 탈퇴 작업 실행 (테이블별 chunk 삭제, 진행 상황은 account_deletion_jobs에 기록)"""
+    from app.services.account_deletion_service import run_deletion_job
+
+    db = SessionLocal()
+    try:
+        result = run_deletion_job(db, _redis_client, job_id)
+        if result:
+            logger.info(f"✅ Account deletion job {job_id}: {result['status']} {result['deleted_counts']}")
+        return result
+    except Exception as e:
+        logger.error(f"❌ Account Deletion Failed (job {job_id}): {e}")
+        return str(e)
+    finally:
+        db.close()
+
+@celery_app.task
+def task_resume_account_deletions():
+    """ACCOUNT_DELETION_SWEEP_INTERVAL_SECONDS마다 멈춘/실패한 탈퇴 작업을 다시 예약"""
+    from app.services.account_deletion_service import resume_stalled_jobs
+
+    db = SessionLocal()
+    try:
+        resumed = resume_stalled_jobs(db)
+        if resumed:
+            logger.info(f"🔄 Account deletion sweep: resumed jobs {resumed}")
+        return len(resumed)
+    except Exception as e:
+        logger.error(f"❌ Account Deletion Sweep Failed: {e}")
+        db.rollback()
+        return str(e)
+    finally:
+        db.close()
+
+# =================================================================
+# 5-5. 로그인 후속 작업 워커 (Post-login)
+# =================================================================
+@celery_app.task
+def task_post_login(user_id: int):
+    """
+    로그인 응답 이후 실행 (대시보드/아바타 초기화, 출석 체크, GitHub 통계 갱신 예약)
+    - 오늘의 선물이 없으면 선물 생성 작업 예약
+    - 결과는 Redis에 저장 (GET /auth/login/followup)
+    """
+    from app.services.post_login_service import run_post_login, save_result, STATUS_FAILED
+
+    db = SessionLocal()
+    try:
+        result = run_post_login(db, user_id, _redis_client)
+        if result.get("gift_pending"):
+            task_generate_user_gift.delay(user_id)
+        return result.get("status")
+    except Exception as e:
+        logger.error(f"❌ Post-login Task Failed (user {user_id}): {e}")
+        db.rollback()
+        save_result(_redis_client, user_id, {"status": STATUS_FAILED})
+        return str(e)
+    finally:
+        db.close()
+
 # =================================================================
 # 6. [Daily Gift] 선물 생성 워커 (개별 유저용)
 # =================================================================
@@ -413,6 +702,26 @@ celery_app.conf.beat_schedule = {
         "task": "app.worker.task_cleanup_old_quest_records",
         "schedule": crontab(hour=0, minute=0, day_of_week="monday"),
     },
+    "visit-counter-flush": {
+        "task": "app.worker.task_flush_visit_counters",
+        "schedule": float(settings.VISIT_FLUSH_INTERVAL_SECONDS),
+    },
+    "github-stats-sweep": {
+        "task": "app.worker.task_sweep_github_stats",
+        "schedule": float(settings.GITHUB_STATS_SWEEP_INTERVAL_SECONDS),
+    },
+    "account-deletion-resume": {
+        "task": "app.worker.task_resume_account_deletions",
+        "schedule": float(settings.ACCOUNT_DELETION_SWEEP_INTERVAL_SECONDS),
+    },
+    "template-store-gc": {
+        "task": "app.worker.task_gc_template_store",
+        "schedule": float(settings.TEMPLATE_STORE_GC_INTERVAL_SECONDS),
+    },
+    "daily-visit-log-prune": {
+        "task": "app.worker.task_prune_visit_logs",
+        "schedule": crontab(hour=4, minute=0),
+    },
     "daily-gift-generation": {
         "task": "app.worker.task_schedule_daily_gifts",
         "schedule": crontab(hour=15, minute=0), # UTC 15:00 -> KST 00:00 (Midnight)
@@ -0,0 +1,506 @@
+"""
+채팅/프레즌스 WebSocket 부하 테스트 도구
+
+가상 유저(비동기 클라이언트 스웜)가 JWT로 접속해 프레즌스/채팅 소켓을 열고,
+설정한 비율로 채팅 메시지 전송과 프레즌스 재접속(온라인/오프라인 브로드캐스트)을 반복합니다.
+
+측정 항목
+- 연결 용량: 성공/실패 연결 수, 연결 소요 시간 p50/p99
+- 메시지 전달 지연: 전송 -> 상대방 수신까지 p50/p99 (클라이언트 단일 프로세스 시계 기준)
+- 소켓당 메모리: /admin/realtime/stats 의 RSS 증가분 / 연결 수
+- 메시지당 DB 쿼리 수: --spawn-server 모드에서만 (같은 프로세스의 엔진에 쿼리 카운터 부착)
+
+사용 예시 (backend 디렉토리에서)
+  # 1) 로컬 SQLite로 서버를 같은 프로세스에 띄워서 측정
+  python benchmarks/ws_load_test.py --spawn-server --users 200 --duration 30
+
+  # 2) 이미 떠 있는 서버(MySQL 컨테이너 등)에 대해 측정
+  #    (.env의 DATABASE_URL / SECRET_KEY가 서버와 같아야 시드 유저와 토큰이 유효함)
+  python benchmarks/ws_load_test.py --url http://127.0.0.1:8000 --users 500 --mode realtime --encoding msgpack
+  #    (통계 API는 관리자 전용 → 서버의 ADMIN_USERNAMES에 첫 시드 유저(예: loadtest_0)를 넣어야 메모리 수치가 나옴)
+
+주의
+- --spawn-server 모드에서는 클라이언트와 서버가 같은 프로세스(다른 스레드)에서 동작하므로
+  지연/메모리 수치가 실제보다 높게 나옵니다. 회귀 비교용으로 같은 조건끼리 비교하세요.
+- 시드 유저는 username이 --user-prefix 로 시작하며, 여러 번 실행해도 재사용됩니다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+# backend 디렉토리를 sys.path에 추가하여 app 모듈을 찾을 수 있게 함
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+# 결과 출력용 (--spawn-server 모드에서 서버 로그를 숨겨도 리포트는 출력)
+REPORT_OUT = sys.stdout
+
+SEED_GITHUB_ID_BASE = 900_000_000
+LATENCY_TAG = "lt"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Eggit chat/presence WebSocket load test")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="API 서버 주소 (http/https)")
+    parser.add_argument("--spawn-server", action="store_true", help="같은 프로세스에 서버를 띄워서 측정 (기본 SQLite)")
+    parser.add_argument("--port", type=int, default=8765, help="--spawn-server 모드의 포트")
+    parser.add_argument("--users", type=int, default=100, help="가상 유저 수 (짝수로 올림)")
+    parser.add_argument("--friends", type=int, default=4, help="유저당 친구 수 (프레즌스 브로드캐스트 팬아웃)")
+    parser.add_argument("--user-prefix", default="loadtest_", help="시드 유저 username 접두사")
+    parser.add_argument("--mode", choices=["legacy", "realtime"], default="legacy",
+                        help="legacy: /presence/ws + /chat/ws/{friend_id}, realtime: /realtime/ws 멀티플렉스")
+    parser.add_argument("--encoding", choices=["json", "compact", "msgpack"], default="json",
+                        help="프레즌스/멀티플렉스 소켓 인코딩 (legacy 채팅 소켓은 항상 텍스트)")
+    parser.add_argument("--duration", type=float, default=20.0, help="메시지 구간 길이(초)")
+    parser.add_argument("--rate", type=float, default=0.5, help="유저당 초당 동작 수")
+    parser.add_argument("--chat-ratio", type=float, default=0.9,
+                        help="동작 중 채팅 메시지 비율 (나머지는 프레즌스 재접속, realtime 모드는 채팅만)")
+    parser.add_argument("--connect-concurrency", type=int, default=50, help="동시에 진행할 연결 수")
+    parser.add_argument("--drain", type=float, default=3.0, help="종료 전 미수신 메시지 대기 시간(초)")
+    parser.add_argument("--json", dest="json_path", help="결과를 JSON 파일로 저장")
+    parser.add_argument("--show-server-logs", action="store_true", help="--spawn-server 모드에서 서버 print 로그 표시")
+    args = parser.parse_args()
+    args.users += args.users % 2
+    args.friends = max(1, min(args.friends, args.users - 1))
+    return args
+
+
+def prepare_environment(args):
+    """--spawn-server 모드: 설정값이 없으면 로컬 테스트용 기본값 사용 (app import 전에 호출)"""
+    if not args.spawn_server:
+        return
+    from cryptography.fernet import Fernet
+
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(BACKEND_DIR, 'ws_load_test.db')}")
+    os.environ.setdefault("SECRET_KEY", "ws-load-test-secret")
+    os.environ.setdefault("GITHUB_CLIENT_ID", "ws-load-test")
+    os.environ.setdefault("GITHUB_CLIENT_SECRET", "ws-load-test")
+    os.environ.setdefault("OPENAI_API_KEY", "ws-load-test")
+    os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+    # 로컬에는 Redis가 없으므로 작업 이벤트 리스너가 빠르게 실패하도록
+    os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:6379/1")
+    # 통계 API(관리자 전용)를 첫 시드 유저 토큰으로 조회
+    os.environ.setdefault("ADMIN_USERNAMES", json.dumps([f"{args.user_prefix}0"]))
+
+
+# ------------------------------------------------------------------
+# 시드 데이터 & 토큰
+# ------------------------------------------------------------------
+def seed_users(args) -> List[int]:
+    """부하 테스트용 유저/친구 관계 생성 (이미 있으면 재사용)"""
+    from app.db.session import SessionLocal
+    from app.models.user import User
+    from app.models.friend import Friendship, FriendStatus
+
+    db = SessionLocal()
+    try:
+        usernames = [f"{args.user_prefix}{i}" for i in range(args.users)]
+        existing = {
+            u.username: u.id
+            for u in db.query(User).filter(User.username.in_(usernames)).all()
+        }
+        for i, username in enumerate(usernames):
+            if username not in existing:
+                db.add(User(github_id=SEED_GITHUB_ID_BASE + i, username=username))
+        db.commit()
+        user_ids = [
+            u.id for u in sorted(
+                db.query(User).filter(User.username.in_(usernames)).all(),
+                key=lambda u: int(u.username[len(args.user_prefix):])
+            )
+        ]
+
+        # 채팅 상대(짝) + 링 형태의 이웃을 친구로 연결
+        pairs = set()
+        for i in range(args.users):
+            pairs.add(tuple(sorted((user_ids[i], user_ids[i ^ 1]))))
+            for step in range(1, args.friends):
+                j = (i + step) % args.users
+                if j != i:
+                    pairs.add(tuple(sorted((user_ids[i], user_ids[j]))))
+
+        existing_pairs = {
+            tuple(sorted((f.requester_id, f.addressee_id)))
+            for f in db.query(Friendship).filter(Friendship.requester_id.in_(user_ids)).all()
+        }
+        for low, high in pairs - existing_pairs:
+            db.add(Friendship(requester_id=low, addressee_id=high, status=FriendStatus.ACCEPTED))
+        db.commit()
+        return user_ids
+    finally:
+        db.close()
+
+
+# ------------------------------------------------------------------
+# 측정값 수집
+# ------------------------------------------------------------------
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class Metrics:
+    def __init__(self):
+        self.connect_times: List[float] = []
+        self.connect_failures: Dict[str, int] = defaultdict(int)
+        self.latencies: List[float] = []
+        self.sent_messages = 0
+        self.received_messages = 0
+        self.presence_reconnects = 0
+        self.presence_events = 0
+        self.errors: Dict[str, int] = defaultdict(int)
+
+
+class QueryCounter:
+    """같은 프로세스의 SQLAlchemy 엔진에서 실행된 쿼리 수 (--spawn-server 모드 전용)"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        with self._lock:
+            self.count += 1
+
+
+# ------------------------------------------------------------------
+# 가상 유저
+# ------------------------------------------------------------------
+class VirtualUser:
+    def __init__(self, args, ws_base: str, user_id: int, partner_id: int, token: str, metrics: Metrics):
+        self.args = args
+        self.ws_base = ws_base
+        self.user_id = user_id
+        self.partner_id = partner_id
+        self.token = token
+        self.metrics = metrics
+        self.presence_ws = None
+        self.chat_ws = None
+        self.tasks: List[asyncio.Task] = []
+        self.message_no = 0
+
+    # --- 프레임 인코딩 ---
+
+    def _encode(self, payload: dict):
+        from app.core import wire_format
+        return wire_format.encode(payload, self.args.encoding)
+
+    def _decode(self, data) -> dict:
+        from app.core import wire_format
+        try:
+            return wire_format.decode(data, self.args.encoding)
+        except ValueError:
+            return {}
+
+    # --- 연결 ---
+
+    async def _open(self, path: str):
+        import websockets
+
+        started = time.perf_counter()
+        ws = await websockets.connect(f"{self.ws_base}{path}", max_size=None, open_timeout=30)
+        self.metrics.connect_times.append(time.perf_counter() - started)
+        return ws
+
+    async def connect(self):
+        encoding = f"&encoding={self.args.encoding}"
+        if self.args.mode == "realtime":
+            ws = await self._open(f"/api/v1/realtime/ws?token={self.token}{encoding}")
+            self.presence_ws = self.chat_ws = ws
+            await ws.send(self._encode({"type": "subscribe", "channel": "presence"}))
+            await ws.send(self._encode({"type": "subscribe", "channel": "notifications"}))
+            await ws.send(self._encode({"type": "subscribe", "channel": "chat", "friend_id": self.partner_id}))
+            self.tasks.append(asyncio.create_task(self._reader(ws, decode=True)))
+        else:
+            self.presence_ws = await self._open(f"/api/v1/presence/ws?token={self.token}{encoding}")
+            self.chat_ws = await self._open(f"/api/v1/chat/ws/{self.partner_id}?token={self.token}")
+            self.tasks.append(asyncio.create_task(self._reader(self.presence_ws, decode=True)))
+            self.tasks.append(asyncio.create_task(self._reader(self.chat_ws, decode=False)))
+
+    async def reconnect_presence(self):
+        """프레즌스 재접속 (친구들에게 offline/online 브로드캐스트 발생)"""
+        if self.args.mode == "realtime":
+            return
+        old = self.presence_ws
+        await old.close()
+        self.presence_ws = await self._open(
+            f"/api/v1/presence/ws?token={self.token}&encoding={self.args.encoding}"
+        )
+        self.tasks.append(asyncio.create_task(self._reader(self.presence_ws, decode=True)))
+        self.metrics.presence_reconnects += 1
+
+    async def close(self):
+        for ws in {self.presence_ws, self.chat_ws}:
+            if ws is not None:
+                try:
+                    await ws.close()
+                except Exception:
+                    pass
+        for task in self.tasks:
+            task.cancel()
+
+    # --- 송수신 ---
+
+    async def send_chat(self):
+        self.message_no += 1
+        text = f"{LATENCY_TAG}|{self.user_id}|{self.message_no}|{time.perf_counter_ns()}"
+        if self.args.mode == "realtime":
+            await self.chat_ws.send(self._encode({"type": "chat.send", "friend_id": self.partner_id, "text": text}))
+        else:
+            await self.chat_ws.send(text)
+        self.metrics.sent_messages += 1
+
+    def _record_delivery(self, text: str):
+        parts = text.split("|") if isinstance(text, str) else []
+        if len(parts) != 4 or parts[0] != LATENCY_TAG:
+            return
+        sent_ns = int(parts[3])
+        self.metrics.latencies.append((time.perf_counter_ns() - sent_ns) / 1e6)
+        self.metrics.received_messages += 1
+
+    async def _reader(self, ws, decode: bool):
+        import websockets
+
+        try:
+            async for data in ws:
+                frame = self._decode(data) if decode else json.loads(data)
+                frame_type = frame.get("type")
+
+                if frame_type == "ping":
+                    await ws.send(self._encode({"type": "pong"}) if decode else json.dumps({"type": "pong"}))
+                elif frame_type in ("user_online", "user_offline"):
+                    self.metrics.presence_events += 1
+                elif frame_type == "error":
+                    self.metrics.errors[frame.get("message", "error")] += 1
+                elif frame_type == "chat.message" or (frame_type is None and "sender" in frame):
+                    # 상대방에게 도착한 메시지만 지연 시간으로 기록 (내 에코는 제외)
+                    if frame.get("sender") != "me":
+                        self._record_delivery(frame.get("text"))
+        except websockets.ConnectionClosed:
+            pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.metrics.errors[type(e).__name__] += 1
+
+
+# ------------------------------------------------------------------
+# 서버 (in-process)
+# ------------------------------------------------------------------
+def start_server(args):
+    import uvicorn
+    from app.main import app
+    from app.db.session import engine
+    from app.models.base import Base
+
+    engine.echo = False
+    Base.metadata.create_all(engine)
+
+    config = uvicorn.Config(
+        app, host="127.0.0.1", port=args.port,
+        log_level="warning", ws="websockets", ws_per_message_deflate=True,
+    )
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 30
+    while not server.started:
+        if time.time() > deadline or not thread.is_alive():
+            raise RuntimeError("in-process server failed to start")
+        time.sleep(0.05)
+    return server, thread
+
+
+# ------------------------------------------------------------------
+# 시나리오
+# ------------------------------------------------------------------
+async def fetch_stats(http_base: str, token: str) -> Optional[dict]:
+    import httpx
+
+    try:
+        async with httpx.AsyncClient(timeout=10) as client:
+            response = await client.get(
+                f"{http_base}/api/v1/admin/realtime/stats",
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            response.raise_for_status()
+            return response.json()
+    except Exception as e:
+        print(f"[LoadTest] stats 조회 실패: {e}", file=REPORT_OUT)
+        return None
+
+
+async def run_scenario(args, http_base: str, user_ids: List[int], query_counter: Optional[QueryCounter]) -> dict:
+    from app.core.security import create_access_token
+
+    ws_base = http_base.replace("https://", "wss://").replace("http://", "ws://")
+    metrics = Metrics()
+    users = [
+        VirtualUser(args, ws_base, uid, user_ids[i ^ 1], create_access_token(uid), metrics)
+        for i, uid in enumerate(user_ids)
+    ]
+
+    stats_before = await fetch_stats(http_base, users[0].token)
+
+    # 1. 연결 램프업
+    print(f"[LoadTest] {len(users)}명 연결 중 ({args.mode}, {args.encoding})...", file=REPORT_OUT)
+    semaphore = asyncio.Semaphore(args.connect_concurrency)
+    queries_before_connect = query_counter.count if query_counter else 0
+
+    async def connect(user: VirtualUser):
+        async with semaphore:
+            try:
+                await user.connect()
+                return user
+            except Exception as e:
+                metrics.connect_failures[type(e).__name__] += 1
+                return None
+
+    ramp_started = time.perf_counter()
+    connected = [u for u in await asyncio.gather(*(connect(u) for u in users)) if u]
+    ramp_seconds = time.perf_counter() - ramp_started
+    # 핸드셰이크 이후 처리되는 연결 초기화 쿼리까지 포함하도록 잠시 대기 후 집계
+    await asyncio.sleep(1)
+    connect_queries = (query_counter.count - queries_before_connect) if query_counter else None
+
+    stats_connected = await fetch_stats(http_base, users[0].token)
+
+    # 2. 메시지 구간 (유저별 포아송 도착)
+    print(f"[LoadTest] {args.duration:.0f}초 동안 메시지 전송...", file=REPORT_OUT)
+    queries_before_messages = query_counter.count if query_counter else 0
+    deadline = time.perf_counter() + args.duration
+
+    async def drive(user: VirtualUser):
+        rng = random.Random(user.user_id)
+        while True:
+            await asyncio.sleep(rng.expovariate(args.rate) if args.rate > 0 else args.duration)
+            if time.perf_counter() >= deadline:
+                return
+            try:
+                if rng.random() < args.chat_ratio:
+                    await user.send_chat()
+                else:
+                    await user.reconnect_presence()
+            except Exception as e:
+                metrics.errors[type(e).__name__] += 1
+
+    await asyncio.gather(*(drive(u) for u in connected))
+    await asyncio.sleep(args.drain)
+    message_queries = (query_counter.count - queries_before_messages) if query_counter else None
+
+    # 3. 정리
+    await asyncio.gather(*(u.close() for u in connected))
+
+    conn_before = (stats_before or {}).get("connections", 0)
+    conn_after = (stats_connected or {}).get("connections", 0)
+    rss_per_socket = None
+    if stats_before and stats_connected and conn_after > conn_before:
+        rss_per_socket = (stats_connected["rss_bytes"] - stats_before["rss_bytes"]) // (conn_after - conn_before)
+
+    def ms(value):
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        "config": {
+            "mode": args.mode,
+            "encoding": args.encoding,
+            "users": args.users,
+            "friends": args.friends,
+            "duration": args.duration,
+            "rate": args.rate,
+            "chat_ratio": args.chat_ratio,
+            "spawned_server": args.spawn_server,
+        },
+        "connections": {
+            "attempted_users": len(users),
+            "connected_users": len(connected),
+            "failures": dict(metrics.connect_failures),
+            "ramp_seconds": round(ramp_seconds, 2),
+            "connect_ms_p50": ms(percentile(metrics.connect_times, 50)),
+            "connect_ms_p99": ms(percentile(metrics.connect_times, 99)),
+            "server_connections": conn_after,
+            "rss_bytes_per_socket": rss_per_socket,
+            "db_queries_per_connection": round(connect_queries / max(1, conn_after - conn_before), 2) if connect_queries is not None else None,
+        },
+        "messages": {
+            "sent": metrics.sent_messages,
+            "delivered": metrics.received_messages,
+            "delivery_ratio": round(metrics.received_messages / metrics.sent_messages, 4) if metrics.sent_messages else None,
+            "throughput_per_second": round(metrics.sent_messages / args.duration, 2) if args.duration else None,
+            "latency_ms_p50": round(percentile(metrics.latencies, 50), 2) if metrics.latencies else None,
+            "latency_ms_p99": round(percentile(metrics.latencies, 99), 2) if metrics.latencies else None,
+            "latency_ms_max": round(max(metrics.latencies), 2) if metrics.latencies else None,
+            "db_queries_per_message": round(message_queries / metrics.sent_messages, 2) if message_queries is not None and metrics.sent_messages else None,
+        },
+        "presence": {
+            "reconnects": metrics.presence_reconnects,
+            "events_received": metrics.presence_events,
+        },
+        "errors": dict(metrics.errors),
+        "server_stats": stats_connected,
+    }
+
+
+def print_report(result: dict):
+    out = REPORT_OUT
+    print("", file=out)
+    print("=" * 60, file=out)
+    print(" WebSocket Load Test Report", file=out)
+    print("=" * 60, file=out)
+    for section in ("config", "connections", "messages", "presence", "errors"):
+        print(f"[{section}]", file=out)
+        for key, value in result[section].items():
+            print(f"  {key:<28} {value}", file=out)
+    print("=" * 60, file=out)
+
+
+def main():
+    args = parse_args()
+    prepare_environment(args)
+
+    server = None
+    server_thread = None
+    query_counter = None
+    if args.spawn_server:
+        from app.db.session import engine
+
+        if not args.show_server_logs:
+            # 엔드포인트의 print 로그가 리포트를 가리지 않도록 (프로세스 종료 시까지 유지)
+            sys.stdout = open(os.devnull, "w")
+        server, server_thread = start_server(args)
+        query_counter = QueryCounter(engine)
+        http_base = f"http://127.0.0.1:{args.port}"
+    else:
+        http_base = args.url.rstrip("/")
+
+    try:
+        user_ids = seed_users(args)
+        result = asyncio.run(run_scenario(args, http_base, user_ids, query_counter))
+    finally:
+        if server is not None:
+            server.should_exit = True
+            server_thread.join(timeout=10)
+
+    print_report(result)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2, default=str)
+        print(f"결과 저장: {args.json_path}", file=REPORT_OUT)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ if current_dir not in sys.path:
 
 from app.db.session import SessionLocal
 from app.models.quest import Quest, QuestTitle, QuestFrequency
+from app.services import quest_catalog
 
 def init_default_quests():
     """기본 퀘스트 데이터 동기화 (Upsert 방식)"""
@@ -83,6 +84,9 @@ def init_default_quests():
                 print(f"  [CREATE] {q_data['title']}")
 
         db.commit()
+
+        # 동기화된 내용으로 프로세스 메모리의 퀘스트 카탈로그 재적재
+        quest_catalog.refresh(db)
         print("✅ Quest synchronization complete!")
 
     except Exception as e:
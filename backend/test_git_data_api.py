@@ -0,0 +1,269 @@
+"""
+Git Data API 배포 백엔드 테스트 (로컬 가짜 GitHub API)
+
+GitDataApiDeployer에 httpx.MockTransport로 만든 프로세스 내 가짜 GitHub를 연결해
+refs / trees / blobs / commits 흐름과 fast-forward 실패(422) 재시도를 검증합니다.
+"""
+import base64
+import hashlib
+import json
+import os
+import sys
+import threading
+import uuid
+from pathlib import Path
+
+import httpx
+import pytest
+
+# backend/app 경로 추가
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "git-data-api-test")
+os.environ.setdefault("GITHUB_CLIENT_ID", "test")
+os.environ.setdefault("GITHUB_CLIENT_SECRET", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ENCRYPTION_KEY", "dGhpcy1pcy1hLXRlc3Qta2V5LWZvci1mZXJuZXQtMzI=")
+# 배포 단계 시간 기록은 Redis가 없으면 건너뜀 (로컬 주소로 바로 실패하도록)
+os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:6379/15")
+
+from app.services.blog.git_data_api import GitDataApiDeployer
+from app.services.blog.template_store import DeployTree
+
+REPO = "owner/site"
+API_URL = "https://github.test"
+
+
+def _blob_sha(content: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+class FakeGitHub:
+    """refs / trees / blobs / commits / contents만 흉내 내는 가짜 GitHub (스레드 안전)"""
+
+    def __init__(self, default_branch: str = "main"):
+        self.default_branch = default_branch
+        self.blobs = {}
+        self.trees = {}
+        self.commits = {}
+        self.refs = {}
+        self.blob_uploads = 0
+        # 다음 ref PATCH 직전에 브랜치를 한 번 움직임 (동시에 다른 커밋이 올라간 상황)
+        self.race_on_next_patch = False
+        self._lock = threading.Lock()
+
+    # --- 헬퍼 ---
+    def _new_commit(self, entries: dict, parents: list) -> str:
+        tree_sha = uuid.uuid4().hex
+        self.trees[tree_sha] = dict(entries)
+        commit_sha = uuid.uuid4().hex
+        self.commits[commit_sha] = {"tree": tree_sha, "parents": parents}
+        return commit_sha
+
+    def files(self, branch: str) -> dict:
+        """브랜치 최신 트리의 {경로: 내용}"""
+        tree = self.trees[self.commits[self.refs[branch]]["tree"]]
+        return {path: self.blobs[sha] for path, (_, sha) in tree.items()}
+
+    def push_external_commit(self, branch: str, path: str, content: bytes):
+        """유저가 직접 올린 커밋 (포스트 등)"""
+        sha = _blob_sha(content)
+        self.blobs[sha] = content
+        head = self.refs[branch]
+        entries = dict(self.trees[self.commits[head]["tree"]])
+        entries[path] = ("100644", sha)
+        self.refs[branch] = self._new_commit(entries, [head])
+
+    # --- HTTP ---
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            return self._route(request)
+
+    def _route(self, request: httpx.Request) -> httpx.Response:
+        method = request.method
+        path = request.url.path
+        body = json.loads(request.content) if request.content else {}
+        prefix = f"/repos/{REPO}"
+        if not path.startswith(prefix):
+            return httpx.Response(404, json={"message": "Not Found"})
+        sub = path[len(prefix):]
+
+        if method == "GET" and sub == "":
+            return httpx.Response(200, json={"default_branch": self.default_branch})
+
+        if method == "PUT" and sub.startswith("/contents/"):
+            content = base64.b64decode(body["content"])
+            sha = _blob_sha(content)
+            self.blobs[sha] = content
+            branch = body.get("branch") or self.default_branch
+            head = self.refs.get(branch)
+            entries = dict(self.trees[self.commits[head]["tree"]]) if head else {}
+            entries[sub[len("/contents/"):]] = ("100644", sha)
+            self.refs[branch] = self._new_commit(entries, [head] if head else [])
+            return httpx.Response(201, json={"content": {"sha": sha}, "commit": {"sha": self.refs[branch]}})
+
+        if sub.startswith("/git/") and not self.refs:
+            return httpx.Response(409, json={"message": "Git Repository is empty."})
+
+        if method == "GET" and sub.startswith("/git/ref/heads/"):
+            branch = sub[len("/git/ref/heads/"):]
+            if branch not in self.refs:
+                return httpx.Response(404, json={"message": "Not Found"})
+            return httpx.Response(200, json={"object": {"sha": self.refs[branch]}})
+
+        if method == "GET" and sub.startswith("/git/commits/"):
+            commit = self.commits[sub.rsplit("/", 1)[1]]
+            return httpx.Response(200, json={"tree": {"sha": commit["tree"]}, "parents": commit["parents"]})
+
+        if method == "GET" and sub.startswith("/git/trees/"):
+            tree = self.trees[sub.rsplit("/", 1)[1]]
+            items = [{"path": p, "mode": mode, "type": "blob", "sha": sha} for p, (mode, sha) in sorted(tree.items())]
+            return httpx.Response(200, json={"tree": items, "truncated": False})
+
+        if method == "POST" and sub == "/git/blobs":
+            content = base64.b64decode(body["content"])
+            sha = _blob_sha(content)
+            self.blobs[sha] = content
+            self.blob_uploads += 1
+            return httpx.Response(201, json={"sha": sha})
+
+        if method == "POST" and sub == "/git/trees":
+            entries = dict(self.trees[body["base_tree"]]) if body.get("base_tree") else {}
+            for item in body["tree"]:
+                if item["sha"] is None:
+                    entries.pop(item["path"], None)
+                elif item["sha"] not in self.blobs:
+                    return httpx.Response(422, json={"message": f"missing blob {item['path']}"})
+                else:
+                    entries[item["path"]] = (item["mode"], item["sha"])
+            tree_sha = uuid.uuid4().hex
+            self.trees[tree_sha] = entries
+            return httpx.Response(201, json={"sha": tree_sha})
+
+        if method == "POST" and sub == "/git/commits":
+            commit_sha = uuid.uuid4().hex
+            self.commits[commit_sha] = {"tree": body["tree"], "parents": body["parents"]}
+            return httpx.Response(201, json={"sha": commit_sha})
+
+        if method == "POST" and sub == "/git/refs":
+            self.refs[body["ref"][len("refs/heads/"):]] = body["sha"]
+            return httpx.Response(201, json={})
+
+        if method == "PATCH" and sub.startswith("/git/refs/heads/"):
+            branch = sub[len("/git/refs/heads/"):]
+            if self.race_on_next_patch:
+                self.race_on_next_patch = False
+                head = self.refs[branch]
+                blob = b"concurrent"
+                self.blobs[_blob_sha(blob)] = blob
+                entries = dict(self.trees[self.commits[head]["tree"]])
+                entries["_posts/concurrent.md"] = ("100644", _blob_sha(blob))
+                self.refs[branch] = self._new_commit(entries, [head])
+            if not body.get("force") and self.commits[body["sha"]]["parents"] != [self.refs[branch]]:
+                return httpx.Response(422, json={"message": "Update is not a fast forward"})
+            self.refs[branch] = body["sha"]
+            return httpx.Response(200, json={})
+
+        return httpx.Response(404, json={"message": "Not Found"})
+
+
+@pytest.fixture
+def github():
+    return FakeGitHub()
+
+
+@pytest.fixture
+def deployer(github):
+    client = httpx.Client(transport=httpx.MockTransport(github.handle))
+    with GitDataApiDeployer("test-token", api_url=API_URL, concurrency=4, client=client) as deployer:
+        yield deployer
+    client.close()
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_text("<h1>theme</h1>")
+    (tmp_path / "_config.yml").write_text("title: template\n")
+    (tmp_path / "assets" / "style.css").write_text("body {}")
+    return str(tmp_path)
+
+
+def _tree(template_dir: str, config: str = "title: template\n") -> DeployTree:
+    tree = DeployTree(template_dir)
+    tree.write("_config.yml", config)
+    return tree
+
+
+def test_deploy_to_empty_repo_creates_only_the_deploy_branch(github, deployer, template_dir):
+    deployer.deploy(_tree(template_dir, "title: mine\n"), REPO, "gh-pages")
+
+    assert set(github.refs) == {"gh-pages"}  # 기본 브랜치(main)는 생기지 않음
+    files = github.files("gh-pages")
+    assert files["_config.yml"] == b"title: mine\n"
+    assert files["assets/style.css"] == b"body {}"
+    assert "README.md" not in files  # 초기화 커밋은 배포 커밋으로 대체
+    assert github.commits[github.refs["gh-pages"]]["parents"] == []
+
+
+def test_redeploy_uploads_only_changed_blobs(github, deployer, template_dir):
+    deployer.deploy(_tree(template_dir, "title: v1\n"), REPO, "main")
+    github.blob_uploads = 0
+
+    deployer.deploy(_tree(template_dir, "title: v2\n"), REPO, "main")
+
+    assert github.blob_uploads == 1
+    assert github.files("main")["_config.yml"] == b"title: v2\n"
+
+
+def test_update_commits_changed_paths_and_keeps_user_files(github, deployer, template_dir):
+    deployer.deploy(_tree(template_dir, "title: v1\n"), REPO, "main")
+    github.push_external_commit("main", "_posts/hello.md", b"my post")
+    head = github.refs["main"]
+
+    commit_sha, paths = deployer.update(_tree(template_dir, "title: v2\n"), REPO, "main")
+
+    assert paths == ["_config.yml"]
+    assert github.refs["main"] == commit_sha
+    assert github.commits[commit_sha]["parents"] == [head]
+    files = github.files("main")
+    assert files["_posts/hello.md"] == b"my post"
+    assert files["_config.yml"] == b"title: v2\n"
+
+    # 바뀐 내용이 없으면 커밋하지 않음
+    assert deployer.update(_tree(template_dir, "title: v2\n"), REPO, "main") == (commit_sha, [])
+
+
+def test_update_returns_none_when_branch_is_missing(github, deployer, template_dir):
+    deployer.deploy(_tree(template_dir), REPO, "main")
+
+    assert deployer.update(_tree(template_dir), REPO, "gh-pages") is None
+
+
+def test_update_retries_when_fast_forward_is_rejected(github, deployer, template_dir):
+    deployer.deploy(_tree(template_dir, "title: v1\n"), REPO, "main")
+    github.race_on_next_patch = True
+
+    commit_sha, paths = deployer.update(_tree(template_dir, "title: v2\n"), REPO, "main")
+
+    assert paths == ["_config.yml"]
+    files = github.files("main")
+    assert files["_posts/concurrent.md"] == b"concurrent"  # 그 사이 올라간 커밋 위에 다시 커밋
+    assert files["_config.yml"] == b"title: v2\n"
+    assert github.commits[commit_sha]["parents"] != []
+
+
+def test_commit_files_adds_files_on_top_of_branch_with_retry(github, deployer, template_dir):
+    deployer.deploy(_tree(template_dir), REPO, "main")
+    github.race_on_next_patch = True
+
+    commit_sha = deployer.commit_files(REPO, {"assets/img/a.png": b"png-a", "assets/img/b.png": b"png-b"})
+
+    assert github.refs["main"] == commit_sha
+    files = github.files("main")
+    assert files["assets/img/a.png"] == b"png-a"
+    assert files["assets/img/b.png"] == b"png-b"
+    assert files["_posts/concurrent.md"] == b"concurrent"
+    assert files["index.html"] == b"<h1>theme</h1>"
@@ -0,0 +1,133 @@
+"""
+목록 API 쿼리 수 테스트 (N+1 회귀 방지)
+
+같은 엔드포인트를 결과 개수만 다르게(소량 / 대량) 호출해서
+실행된 SQL 수가 결과 개수와 무관하게 일정한지 검증합니다.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# backend/app 경로 추가
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+# async 엔드포인트용 SQLite 드라이버 (없으면 건너뛰지 않고 실패해야 CI에서 N+1 회귀를 잡음)
+import aiosqlite  # noqa: F401
+
+# 테스트 전용 SQLite DB (인증 캐시는 꺼서 매 요청의 실제 쿼리 수를 측정)
+_db_path = Path(tempfile.gettempdir()) / "eggit_query_count_test.db"
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["AUTH_CACHE_ENABLED"] = "false"
+os.environ.setdefault("SECRET_KEY", "query-count-test")
+os.environ.setdefault("GITHUB_CLIENT_ID", "test")
+os.environ.setdefault("GITHUB_CLIENT_SECRET", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ENCRYPTION_KEY", "dGhpcy1pcy1hLXRlc3Qta2V5LWZvci1mZXJuZXQtMzI=")
+
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token
+from app.db.query_counter import count_queries
+from app.db.session import engine, SessionLocal
+from app.models import Base, User, Friendship, FriendStatus
+from app.models.guestbook import Guestbook
+from app.models.quest import Quest, UserQuest, QuestStatus
+
+SMALL = 2
+LARGE = 25
+
+# (소량 데이터 유저, 대량 데이터 유저)
+OWNER_SMALL = 1
+OWNER_LARGE = 2
+# 친구/요청/방명록 작성자로 쓰이는 유저는 100번부터
+OTHER_BASE = 100
+
+
+@pytest.fixture(scope="module")
+def client():
+    if _db_path.exists():
+        _db_path.unlink()
+    Base.metadata.create_all(engine)
+
+    from app.main import app
+    with TestClient(app) as test_client:  # lifespan에서 기본 퀘스트 시드
+        _seed()
+        yield test_client
+
+    engine.dispose()
+    if _db_path.exists():
+        _db_path.unlink()
+
+
+def _seed():
+    db = SessionLocal()
+    try:
+        db.add(User(id=OWNER_SMALL, github_id=OWNER_SMALL, username="owner_small"))
+        db.add(User(id=OWNER_LARGE, github_id=OWNER_LARGE, username="owner_large"))
+
+        next_id = OTHER_BASE
+        for owner_id, size in ((OWNER_SMALL, SMALL), (OWNER_LARGE, LARGE)):
+            for i in range(size):
+                friend_id, requester_id, addressee_id = next_id, next_id + 1, next_id + 2
+                next_id += 3
+                for uid in (friend_id, requester_id, addressee_id):
+                    db.add(User(id=uid, github_id=uid, username=f"user_{uid}"))
+
+                db.add(Friendship(requester_id=owner_id, addressee_id=friend_id, status=FriendStatus.ACCEPTED))
+                db.add(Friendship(requester_id=requester_id, addressee_id=owner_id, status=FriendStatus.PENDING))
+                db.add(Friendship(requester_id=owner_id, addressee_id=addressee_id, status=FriendStatus.PENDING))
+                db.add(Guestbook(owner_id=owner_id, author_id=friend_id, content=f"hello {i}"))
+
+        # 퀘스트 진행 상황: 소량 유저는 없음, 대량 유저는 모든 퀘스트에 기록
+        for quest in db.query(Quest).all():
+            db.add(UserQuest(user_id=OWNER_LARGE, quest_id=quest.id, status=QuestStatus.COMPLETED))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _count(client, url: str, user_id: int) -> int:
+    headers = {"Authorization": f"Bearer {create_access_token(user_id)}"}
+    with count_queries() as counter:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    return counter.count
+
+
+@pytest.mark.parametrize("url", [
+    "/api/v1/friends",
+    "/api/v1/friends/pending",
+    "/api/v1/friends/sent",
+])
+def test_friend_lists_do_not_scale_with_result_size(client, url):
+    small = _count(client, url, OWNER_SMALL)
+    large = _count(client, url, OWNER_LARGE)
+
+    headers = {"Authorization": f"Bearer {create_access_token(OWNER_LARGE)}"}
+    assert len(client.get(url, headers=headers).json()) == LARGE
+    assert small == large, f"{url}: {small} queries for {SMALL} rows vs {large} for {LARGE}"
+    assert large <= 2  # 인증 1 + 목록 1
+
+
+def test_guestbook_list_does_not_scale_with_result_size(client):
+    small = _count(client, f"/api/v1/guestbook/{OWNER_SMALL}", OWNER_SMALL)
+    large = _count(client, f"/api/v1/guestbook/{OWNER_LARGE}", OWNER_SMALL)
+
+    entries = client.get(f"/api/v1/guestbook/{OWNER_LARGE}").json()
+    assert len(entries) == LARGE
+    assert all(entry["author_name"].startswith("user_") for entry in entries)
+    assert small == large
+    assert large <= 2
+
+
+def test_quest_list_does_not_scale_with_progress_rows(client):
+    small = _count(client, "/api/v1/quests/", OWNER_SMALL)
+    large = _count(client, "/api/v1/quests/", OWNER_LARGE)
+
+    assert small == large
+    assert large <= 2
@@ -91,6 +91,10 @@ const ChatSidebar = ({ isOpen, onClose, pendingFriendId, onClearPending }) => {
         presenceWebsocket.onmessage = (event) => {
             try {
                 const data = JSON.parse(event.data);
+                if (data.type === 'ping') {
+                    presenceWebsocket.send(JSON.stringify({ type: 'pong' }));
+                    return;
+                }
                 if (data.type === 'initial_status') {
                     setFriendsList(prev => prev.map(friend => ({
                         ...friend,
@@ -143,6 +147,12 @@ const ChatSidebar = ({ isOpen, onClose, pendingFriendId, onClearPending }) => {
             try {
                 const data = JSON.parse(event.data);
 
+                // Server heartbeat - reply so the connection is not reaped as idle
+                if (data.type === 'ping') {
+                    websocket.send(JSON.stringify({ type: 'pong' }));
+                    return;
+                }
+
                 // Validate and parse timestamp
                 let timestamp = null;
                 if (data.timestamp) {
@@ -134,7 +134,7 @@ const RightSidePanel = ({ isMe = true, targetUserId = null }) => {
         confirm('정말로 탈퇴하시겠습니까? \n 모든 데이터가 삭제되며 복구할 수 없습니다.', async () => {
             try {
                 await apiClient.delete('/users/me');
-                notify('회원 탈퇴가 완료되었습니다.', 'success');
+                notify('회원 탈퇴 요청이 접수되었습니다.', 'success');
                 setTimeout(() => {
                     logout();
                     navigate('/login');
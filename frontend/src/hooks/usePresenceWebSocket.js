@@ -34,6 +34,11 @@ const usePresenceWebSocket = () => {
         websocket.onmessage = (event) => {
             try {
                 const data = JSON.parse(event.data);
+                // Server heartbeat - reply so the connection is not reaped as idle
+                if (data.type === 'ping') {
+                    websocket.send(JSON.stringify({ type: 'pong' }));
+                    return;
+                }
                 if (data.type === 'new_message') {
                     // Global message notification received
                     const store = useMessageStore.getState();
@@ -9,6 +9,33 @@ import useNotificationStore from '../../store/useNotificationStore';
 const avatarImages = import.meta.glob('../../assets/images/child/*.png', { eager: true });
 const avatarPaths = Object.values(avatarImages).map(mod => mod.default);
 
+// 로그인 후속 작업(출석 체크 등) 결과 조회 - 완료될 때까지 잠시 간격을 두고 재시도
+const FOLLOWUP_MAX_ATTEMPTS = 5;
+const FOLLOWUP_INTERVAL_MS = 800;
+
+async function pollLoginFollowup(notify) {
+    for (let attempt = 0; attempt < FOLLOWUP_MAX_ATTEMPTS; attempt++) {
+        await new Promise((resolve) => setTimeout(resolve, FOLLOWUP_INTERVAL_MS));
+        try {
+            const { data } = await apiClient.get(`/auth/login/followup`);
+            if (data.status === "PENDING") continue;
+
+            const questResult = data.quest_check_in;
+            if (questResult && !questResult.already_completed) {
+                // 첫 출석: 토스트 알림 표시
+                notify(`${questResult.message} (Lv.${questResult.current_level})`, "success");
+                console.log("✅ 출석 퀘스트 달성 (보상 수령 대기):", questResult);
+            } else if (questResult) {
+                console.log("ℹ️ 오늘 이미 출석했습니다.");
+            }
+            return;
+        } catch (err) {
+            console.error("로그인 후속 작업 조회 실패:", err);
+            return;
+        }
+    }
+}
+
 export default function AuthCallback() {
     const [searchParams] = useSearchParams();
     const navigate = useNavigate();
@@ -64,25 +91,8 @@ export default function AuthCallback() {
                     localStorage.setItem("avatar", JSON.stringify(res.data.avatar));
                 }
 
-                // 3. 🎯 퀘스트 체크인 결과 확인 및 알림
-                if (res.data.quest_check_in) {
-                    const questResult = res.data.quest_check_in;
-
-
-                    if (!questResult.already_completed) {
-                        // 첫 출석: 토스트 알림 표시
-                        const message = `${questResult.message} (Lv.${questResult.current_level})`;
-
-
-                        // 글로벌 토스트 알림
-                        notify(message, "success");
-
-
-                        console.log("✅ 출석 퀘스트 달성 (보상 수령 대기):", questResult);
-                    } else {
-                        console.log("ℹ️ 오늘 이미 출석했습니다.");
-                    }
-                }
+                // 3. 🎯 출석 체크 등 로그인 후속 작업은 백그라운드에서 처리됨 -> 결과를 받아 알림
+                pollLoginFollowup(notify);
 
                 // 4. 백엔드에서 받은 정보로 페이지 결정
                 const hasAvatar = res.data.has_avatar;